@@ -0,0 +1 @@
+default_app_config = 'api_v1.apps.ApiV1Config'
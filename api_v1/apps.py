@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ApiV1Config(AppConfig):
+    name = 'api_v1'
+
+    def ready(self):
+        from . import signals  # noqa: F401 (connects signal receivers)
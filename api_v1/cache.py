@@ -0,0 +1,41 @@
+"""
+Cache of rendered API responses.
+
+Responses are cached under their ETag, which is a hash of their URL, media
+type and the current versions of the groups of resources they show (see
+models.versions and api_v1.views.ConditionalGetMixin). The versions are read
+from the database for every request, in one small query, so a change is
+seen by every process as soon as it's committed, whatever the cache backend:
+responses showing the old versions are simply missed and left to expire.
+
+The cache is the "api_v1" cache in settings.CACHES. It's kept in each
+process by default; a backend shared between processes, such as the file
+based one, lets a response rendered by one process be served by the others.
+"""
+from django.core.cache import caches
+from django.db import connection
+
+CACHE_ALIAS = 'api_v1'
+
+RESPONSE_KEY = 'response:{}'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def is_cacheable(request):
+    """
+    Check whether the response to a request can be cached.
+
+    Browsable API pages include forms for the current user, so aren't
+    cached, and neither is anything read inside a transaction which could
+    still be rolled back.
+    """
+    return (request.accepted_renderer.format != 'api'
+            and not connection.in_atomic_block)
+
+
+def get_response_key(etag):
+    """Get the key of the response with the given ETag."""
+    return RESPONSE_KEY.format(etag)
@@ -0,0 +1,67 @@
+"""
+Compression of cached API responses.
+
+Responses stored in the API response cache (see api_v1.cache) are stored
+along with their Brotli and gzip compressed content, so a hot response is
+compressed once when it's cached rather than on every request. Each encoding
+gets its own ETag, as the content sent for it differs.
+"""
+from collections import OrderedDict
+import gzip
+
+import brotli
+
+# Responses shorter than this aren't worth compressing.
+MIN_LENGTH = 200
+
+# Supported encodings, in order of preference.
+ENCODINGS = OrderedDict((
+    ('br', brotli.compress),
+    ('gzip', gzip.compress),
+))
+
+
+def compress(content):
+    """
+    Compress content with each supported encoding, keeping those which make
+    it smaller.
+    """
+    if len(content) < MIN_LENGTH:
+        return {}
+    encodings = {}
+    for encoding, compress_content in ENCODINGS.items():
+        compressed = compress_content(content)
+        if len(compressed) < len(content):
+            encodings[encoding] = compressed
+    return encodings
+
+
+def get_encoding(request):
+    """
+    Get the preferred supported encoding accepted by a request, or None if
+    it accepts none of them.
+    """
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, *params = [part.strip() for part in item.split(';')]
+        quality = 1
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    pass
+        if quality > 0:
+            accepted.add(encoding.lower())
+    for encoding in ENCODINGS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def get_etag(etag, encoding):
+    """Get the ETag of a response's content in the given encoding."""
+    if encoding is None:
+        return etag
+    return '{};{}'.format(etag, encoding)
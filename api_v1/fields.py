@@ -0,0 +1,24 @@
+from rest_framework import relations
+
+from api_v1 import links
+
+
+class URLTemplateMixin:
+    """
+    Build hyperlinks from URL templates compiled once per request (see
+    api_v1.links), rather than reversing every URL.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reverse = links.reverse
+
+
+class HyperlinkedRelatedField(URLTemplateMixin,
+                              relations.HyperlinkedRelatedField):
+    pass
+
+
+class HyperlinkedIdentityField(URLTemplateMixin,
+                               relations.HyperlinkedIdentityField):
+    pass
@@ -0,0 +1,15 @@
+from django_filters import rest_framework as filters
+
+from models import models
+
+
+class GameFilter(filters.FilterSet):
+    team = filters.CharFilter(method='filter_team')
+
+    class Meta:
+        model = models.Game
+        fields = ('team_1', 'team_2')
+
+    def filter_team(self, queryset, name, value):
+        """Filter to games where the given team is on either side."""
+        return queryset.involving_team(value)
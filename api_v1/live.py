@@ -0,0 +1,325 @@
+"""
+Live game updates, pushed to clients as server-sent events.
+
+Whenever games change, an event with their new scores is published on the
+channel of each game and of its season. Within a process, events are fanned
+out to every client streaming a channel by one Broadcaster, so a change is
+loaded and formatted once however many clients are watching.
+
+On Postgres, events are sent between processes with NOTIFY. Each process
+LISTENs on a connection of its own, in a background thread started when its
+first client subscribes, and hands what it hears to its broadcaster, along
+with any changes it missed while not listening, read from the change log.
+Elsewhere, such as in development with SQLite, events only reach clients of
+the process which made the change.
+"""
+from collections import defaultdict
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from models import changes, export
+from models.models import Game
+
+logger = logging.getLogger(__name__)
+
+SEASON_CHANNEL = 'season:{season_id}'
+GAME_CHANNEL = 'game:{game_id}'
+
+# Postgres NOTIFY channel events are sent between processes on.
+NOTIFY_CHANNEL = 'api_v1_live'
+
+# Seconds between comments sent to keep idle streams open.
+KEEPALIVE_INTERVAL = 15
+
+# Seconds to wait for the listening connection before streaming anyway,
+# between reading the change log while listening, and before reconnecting
+# after the connection fails.
+LISTEN_TIMEOUT = 5
+
+# Changes read from the change log at a time.
+CATCH_UP_LIMIT = 1000
+
+
+def format_event(event, data):
+    """Format a server-sent event with JSON data."""
+    return 'event: {}\ndata: {}\n\n'.format(
+        event, json.dumps(data, separators=(',', ':')))
+
+
+class Broadcaster:
+    """Fans events out to every subscriber to their channels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        """Subscribe to a channel, returning a queue of its events."""
+        subscriber = queue.Queue()
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, channel, subscriber):
+        with self._lock:
+            self._subscribers[channel].discard(subscriber)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, channels, message):
+        """Send a formatted event to every subscriber to any channel."""
+        with self._lock:
+            subscribers = set()
+            for channel in channels:
+                subscribers.update(self._subscribers.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+
+broadcaster = Broadcaster()
+
+
+class Listener(threading.Thread):
+    """
+    Hands events NOTIFY'd by any process to this process's broadcaster.
+
+    Notifications sent while not listening, before the first connection or
+    while reconnecting, are lost, so on connecting the changes to games made
+    since the last change seen are read from the change log (see
+    models.changes) and their events handed over too.
+    """
+    daemon = True
+
+    def __init__(self):
+        super().__init__()
+        self.cursor = None
+        self.listening = threading.Event()
+        self._stopping = threading.Event()
+        # Written to by stop, to wake the thread from waiting on events.
+        self._wake_reader, self._wake_writer = os.pipe()
+
+    def run(self):
+        try:
+            while not self._stopping.is_set():
+                try:
+                    self.listen()
+                except Exception:
+                    logger.exception('Listening for live game events failed')
+                    self._stopping.wait(LISTEN_TIMEOUT)
+        finally:
+            connections.close_all()
+
+    def listen(self):
+        database = connections[DEFAULT_DB_ALIAS]
+        connection = database.get_new_connection(
+            database.get_connection_params())
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute('LISTEN {}'.format(NOTIFY_CHANNEL))
+            # Read here rather than by whoever started the listener, so as
+            # not to add to the queries of the request which did.
+            if self.cursor is None:
+                self.cursor = changes.get_latest_cursor()
+            self.catch_up()
+            self.listening.set()
+            caught_up_at = time.monotonic()
+            while True:
+                readable = select.select([connection, self._wake_reader],
+                                         [], [], LISTEN_TIMEOUT)[0]
+                if self._wake_reader in readable:
+                    return
+                if readable:
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        channels, message = json.loads(notification.payload)
+                        broadcaster.publish(channels, message)
+                # Keep up with the change log, so that there's less to catch
+                # up on after reconnecting.
+                if time.monotonic() - caught_up_at >= LISTEN_TIMEOUT:
+                    for change in self.read_changes():
+                        pass
+                    caught_up_at = time.monotonic()
+        finally:
+            self.listening.clear()
+            connection.close()
+
+    def read_changes(self):
+        """Generate the changes after the cursor, moving it past them."""
+        while True:
+            rows = changes.get_changes(self.cursor, limit=CATCH_UP_LIMIT)
+            if not rows:
+                return
+            yield from rows
+            self.cursor = rows[-1]['id']
+
+    def catch_up(self):
+        """
+        Hand over events for changes to games since the cursor. The change
+        log doesn't say which seasons games were deleted from or moved out
+        of, so those seasons' streams aren't told.
+        """
+        game_ids = {}
+        for change in self.read_changes():
+            if change['object_type'] == changes.OBJECT_TYPES[Game]:
+                game_ids[int(change['object_id'])] = change['action']
+        deleted = [game_id for game_id, action in game_ids.items()
+                   if action == changes.DELETED]
+        events = get_current_events([
+            game_id for game_id, action in game_ids.items()
+            if action != changes.DELETED])
+        events.extend(get_deleted_events(deleted))
+        for channels, message in events:
+            broadcaster.publish(channels, message)
+
+    def stop(self):
+        """Stop listening, closing the listening connection."""
+        self._stopping.set()
+        os.write(self._wake_writer, b'\0')
+        self.join()
+        os.close(self._wake_reader)
+        os.close(self._wake_writer)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def uses_notify():
+    return connections[DEFAULT_DB_ALIAS].vendor == 'postgresql'
+
+
+def start_listener():
+    """
+    Start listening for other processes' events, if not already, returning
+    the listener (or None if events aren't sent between processes).
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None and uses_notify():
+            _listener = Listener()
+            _listener.start()
+        return _listener
+
+
+def stop_listener():
+    """
+    Stop listening for other processes' events, if listening, so that the
+    database can be closed or dropped.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def publish(events):
+    """
+    Publish a list of (channels, formatted event) pairs, to every process if
+    possible.
+    """
+    if not events:
+        return
+    if uses_notify():
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.executemany('SELECT pg_notify(%s, %s)', [
+                (NOTIFY_CHANNEL, json.dumps(event)) for event in events])
+    else:
+        for channels, message in events:
+            broadcaster.publish(channels, message)
+
+
+def get_game_events(games):
+    """
+    Get the events giving the current scores of a queryset of games, as
+    (channels, formatted event) pairs.
+    """
+    return [([SEASON_CHANNEL.format(season_id=row['season']),
+              GAME_CHANNEL.format(game_id=row['id'])],
+             format_event('game', row))
+            for row in map(export.get_row, games.values_list(
+                *export.VALUE_FIELDS))]
+
+
+def get_current_events(game_ids, season_ids=()):
+    """
+    Get the events giving the current scores of games, by their IDs, also
+    sent on the channels of the given seasons (such as ones they've been
+    moved out of).
+    """
+    season_channels = [SEASON_CHANNEL.format(season_id=season_id)
+                       for season_id in season_ids]
+    return [(channels + [channel for channel in season_channels
+                         if channel not in channels], message)
+            for channels, message in get_game_events(
+                Game.objects.filter(pk__in=game_ids))]
+
+
+def get_deleted_events(game_ids, season_ids=()):
+    """
+    Get the events announcing that games have been deleted, sent on the
+    channels of the games and of the given seasons they were in.
+    """
+    season_channels = [SEASON_CHANNEL.format(season_id=season_id)
+                       for season_id in season_ids]
+    return [([GAME_CHANNEL.format(game_id=game_id)] + season_channels,
+             format_event('deleted', {'id': game_id}))
+            for game_id in game_ids]
+
+
+def publish_games(game_ids, deleted=False, season_ids=()):
+    """
+    Publish the current scores of games, or that they've been deleted, also
+    on the channels of the given seasons they were in.
+    """
+    if not uses_notify() and not broadcaster.has_subscribers():
+        return
+    if deleted:
+        publish(get_deleted_events(game_ids, season_ids))
+    else:
+        publish(get_current_events(game_ids, season_ids))
+
+
+def stream(channel, games):
+    """
+    Generate the server-sent events of a channel, starting with the current
+    scores of the given queryset of games.
+    """
+    subscriber = broadcaster.subscribe(channel)
+    try:
+        listener = start_listener()
+        if listener is not None and not listener.listening.wait(
+                LISTEN_TIMEOUT):
+            logger.warning('Streaming live game events before listening '
+                           'for them; they\'ll be caught up on once it is')
+        # Having subscribed and started listening, nothing is missed between
+        # loading the current scores and waiting for changes to them, and
+        # anything heard before loading them is already in them.
+        while not subscriber.empty():
+            subscriber.get_nowait()
+        yield 'retry: {}\n\n'.format(KEEPALIVE_INTERVAL * 1000)
+        for channels, message in get_game_events(games):
+            yield message
+        # Don't hold a database connection for as long as the stream lasts.
+        connection = connections[DEFAULT_DB_ALIAS]
+        if not connection.in_atomic_block:
+            connection.close()
+        while True:
+            try:
+                yield subscriber.get(timeout=KEEPALIVE_INTERVAL)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+    finally:
+        broadcaster.unsubscribe(channel, subscriber)
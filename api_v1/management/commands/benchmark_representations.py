@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+import pytz
+
+from models.models import Game, League, Season, Team, Venue
+from api_v1 import representations, serializers
+
+
+class Command(BaseCommand):
+    help = ('Compare how quickly pages of games, teams and venues are '
+            'rendered by their serializers and by their fast '
+            'representations, using generated data which is rolled back '
+            'afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100,
+                            help='Number of rows per page.')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Number of times to render each page.')
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/v1/'))
+        with transaction.atomic():
+            self.generate_data(options['rows'])
+            benchmarks = (
+                ('Games', serializers.GameSerializer,
+                 representations.GameRepresentation,
+                 Game.objects.select_related('season', 'team_1', 'team_2')),
+                ('Teams', serializers.TeamSerializer,
+                 representations.TeamRepresentation,
+                 Team.objects.prefetch_related('alternative_names')),
+                ('Venues', serializers.VenueSerializer,
+                 representations.VenueRepresentation,
+                 Venue.objects.prefetch_related('alternative_names')),
+            )
+            for name, serializer_class, representation_class, queryset \
+                    in benchmarks:
+                queryset = queryset.order_by('pk')
+                serializer_time = self.time(options['repeat'], lambda: (
+                    serializer_class(queryset.all(), many=True,
+                                     context={'request': request}).data))
+                representation_time = self.time(options['repeat'], lambda: (
+                    self.represent(representation_class(request),
+                                   queryset.all())))
+                self.stdout.write(
+                    '{}: serializer {:.0f} rows/s, representation {:.0f} '
+                    'rows/s, {:.1f}x faster'.format(
+                        name,
+                        options['rows'] * options['repeat'] / serializer_time,
+                        options['rows'] * options['repeat']
+                        / representation_time,
+                        serializer_time / representation_time))
+            transaction.set_rollback(True)
+
+    def represent(self, representation, queryset):
+        return representation.represent(representation.get_rows(queryset))
+
+    def time(self, repeat, get_data):
+        """Time getting and rendering data as JSON a number of times."""
+        renderer = JSONRenderer()
+        start = time.perf_counter()
+        for i in range(0, repeat):
+            renderer.render(get_data())
+        return time.perf_counter() - start
+
+    def generate_data(self, num_rows):
+        """Generate a page of games, teams and venues."""
+        league = League.objects.create(id='benchmark', name='Benchmark')
+        season = Season.objects.create(id='benchmark', league=league,
+                                       name='Benchmark')
+        teams = Team.objects.bulk_create(
+            Team(id='benchmark_{}'.format(i), league=league,
+                 name='Team {}'.format(i), primary_colour='#000000')
+            for i in range(0, num_rows))
+        venues = Venue.objects.bulk_create(
+            Venue(id='benchmark_{}'.format(i), name='Venue {}'.format(i),
+                  latitude=-37.819967, longitude=144.983449,
+                  timezone='Australia/Melbourne')
+            for i in range(0, num_rows))
+        first_start = datetime(1897, 5, 8, 14, 30, tzinfo=pytz.utc)
+        Game.objects.bulk_create(
+            Game(start=first_start + timedelta(days=i),
+                 season=season,
+                 venue=venues[i],
+                 team_1=teams[i],
+                 team_1_goals=i % 20,
+                 team_1_behinds=i % 15,
+                 team_2=teams[(i + 1) % num_rows],
+                 team_2_goals=i % 18,
+                 team_2_behinds=i % 12)
+            for i in range(0, num_rows))
+        # Plan the queries for the data generated, as they would be for data
+        # already there, rather than for empty tables.
+        with connection.cursor() as cursor:
+            for model in (Season, Team, Venue, Game):
+                cursor.execute('ANALYZE {}'.format(
+                    connection.ops.quote_name(model._meta.db_table)))
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from models.models import Season
+from api_v1 import prerender
+
+
+class Command(BaseCommand):
+    help = ('Finalise seasons, optionally pre-rendering their responses, or '
+            'reopen them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('season_ids', nargs='+',
+                            help='IDs of seasons to finalise.')
+        parser.add_argument('--base-url',
+                            default=settings.API_V1_PRERENDER_BASE_URL,
+                            help='Pre-render responses as requested from '
+                                 'this URL, such as https://example.com. '
+                                 'Defaults to API_V1_PRERENDER_BASE_URL.')
+        parser.add_argument('--reopen', action='store_true',
+                            help='Reopen the seasons instead, removing their '
+                                 'pre-rendered responses.')
+
+    def handle(self, *args, **options):
+        seasons = Season.objects.filter(
+            pk__in=options['season_ids']).order_by('pk')
+        missing = set(options['season_ids']) - {season.pk
+                                                 for season in seasons}
+        if missing:
+            raise CommandError('No such seasons: {}'.format(
+                ', '.join(sorted(missing))))
+        for season in seasons:
+            season.finalised = not options['reopen']
+            season.save()
+            if options['reopen']:
+                self.stdout.write('Reopened {}'.format(season.pk))
+                continue
+            self.stdout.write('Finalised {}'.format(season.pk))
+            if options['base_url']:
+                num_responses = prerender.render_season(season,
+                                                        options['base_url'])
+                self.stdout.write('Pre-rendered {} responses for {}'.format(
+                    num_responses, season.pk))
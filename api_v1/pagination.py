@@ -0,0 +1,89 @@
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class GameCursorPagination(CursorPagination):
+    """
+    Paginate games by their position in (start, id) order rather than by
+    offset, so that every page costs the same regardless of its depth.
+
+    DRF's cursor pagination positions on the first field of the ordering
+    alone, stepping over ties with an offset. Here the position is the start
+    and ID together, which no two games share, so there's never an offset.
+    """
+    ordering = ('start', 'id')
+
+    def get_ordering(self, request, queryset, view):
+        """Always page through games in start order."""
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        self.position = None if self.cursor is None else self.cursor.position
+        if reverse:
+            queryset = queryset.order_by('-start', '-id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.position is not None:
+            queryset = queryset.from_position(
+                *self.parse_position(self.position), reverse=reverse)
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.position is not None
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def parse_position(self, position):
+        """Parse a position into the start and ID of a game."""
+        start, separator, pk = position.rpartition(' ')
+        try:
+            start = parse_datetime(start)
+            pk = int(pk)
+        except ValueError:
+            start = None
+        if start is None:
+            raise NotFound(self.invalid_cursor_message)
+        return start, pk
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            start, pk = instance['start'], instance['id']
+        else:
+            start, pk = instance.start, instance.id
+        return '{} {}'.format(start.isoformat(), pk)
+
+    def get_link(self, reverse, item):
+        """
+        Get the link to the page before or after the given game, or the
+        cursor's position if there's no game on this page.
+        """
+        if item is None:
+            position = self.position
+        else:
+            position = self._get_position_from_instance(item, self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=reverse,
+                                         position=position))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.get_link(False, self.page[-1] if self.page else None)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.get_link(True, self.page[0] if self.page else None)
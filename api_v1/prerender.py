@@ -0,0 +1,97 @@
+"""
+Pre-rendered responses for finalised seasons.
+
+A finalised season's games can't change until it's reopened, so the JSON
+responses for its game list, games and ladder are written to disk under
+settings.API_V1_PRERENDER_ROOT by the finalise_season command, and served
+from there with long-lived cache headers. Reopening a season removes its
+files, as does anything changing its games or ladder (which the models
+refuse to do while it's finalised).
+
+Only requests without a query string for plain application/json are served
+this way. Each response is stored under a hash of its path, and its absolute
+URLs are those of the base URL it was rendered for, whichever host it's
+requested from.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.urlresolvers import resolve, reverse
+from django.test.client import RequestFactory
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+
+MEDIA_TYPE = 'application/json'
+
+MAX_AGE = 365 * 24 * 60 * 60
+
+
+def get_season_directory(season_id):
+    return os.path.join(settings.API_V1_PRERENDER_ROOT, season_id)
+
+
+def get_file_path(season_id, path):
+    """Get the file of the pre-rendered response at a path in a season."""
+    name = hashlib.sha1(path.encode()).hexdigest()
+    return os.path.join(get_season_directory(season_id), name + '.json')
+
+
+def get_path(request, season_id):
+    """
+    Get the file of the pre-rendered response to a request for something in
+    the given season, or None if the request can't be pre-rendered.
+    """
+    if request.query_params or request.accepted_media_type != MEDIA_TYPE:
+        return None
+    return get_file_path(season_id, request.path)
+
+
+def write(path, content):
+    """Write a pre-rendered response, replacing any existing one whole."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        file.write(content)
+    os.replace(file.name, path)
+
+
+def remove(season_id):
+    """Remove every pre-rendered response for a season."""
+    shutil.rmtree(get_season_directory(season_id), ignore_errors=True)
+
+
+def patch_response(response):
+    """Add long-lived cache headers to a pre-rendered response."""
+    patch_cache_control(response, public=True, max_age=MAX_AGE,
+                        immutable=True)
+    return response
+
+
+def render_season(season, base_url):
+    """
+    Pre-render the responses for a finalised season, as requested from the
+    given base URL (such as https://example.com), replacing any already
+    rendered.
+    """
+    remove(season.id)
+    base_url = urlsplit(base_url)
+    factory = RequestFactory(HTTP_HOST=base_url.netloc,
+                             HTTP_ACCEPT=MEDIA_TYPE)
+    kwargs = {'league_id': season.league_id, 'season_id': season.id}
+    paths = [reverse('api_v1:game_list', kwargs=kwargs),
+             reverse('api_v1:season_ladder', kwargs=kwargs)]
+    for game_id in season.game_set.values_list('id', flat=True):
+        paths.append(reverse('api_v1:game_detail',
+                             kwargs=dict(kwargs, pk=game_id)))
+    for path in paths:
+        match = resolve(path)
+        request = factory.get(path, secure=base_url.scheme == 'https')
+        response = match.func(request, *match.args, **match.kwargs)
+        response.render()
+        if response.status_code == status.HTTP_200_OK:
+            write(get_file_path(season.id, path), response.content)
+    return len(paths)
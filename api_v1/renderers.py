@@ -0,0 +1,31 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+import msgpack
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    JSON for lists of games arranged as columns (see
+    models.export.get_compact), requested with the .compact suffix,
+    ?format=compact or by media type.
+    """
+    media_type = 'application/vnd.openfootydata.compact+json'
+    format = 'compact'
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack, requested with the .msgpack suffix, ?format=msgpack or by
+    media type. Anything MessagePack has no type for is given the same
+    value as in JSON.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True,
+                             default=JSONEncoder().default)
@@ -0,0 +1,380 @@
+"""
+Fast read-only representations of games, teams and venues, of the seasons
+and leagues they can embed, and of the change log.
+
+These build exactly the same output as the serializers in
+api_v1.serializers, but straight from .values() rows and with hyperlinks
+filled into URL templates (see api_v1.links), skipping the per-field
+machinery of DRF serializers and the per-link cost of reversing URLs. Like
+the serializers, they leave out fields not wanted by the request. They only
+read; writes still go through the serializers.
+"""
+from collections import OrderedDict
+from operator import itemgetter
+
+from rest_framework.fields import DateTimeField
+from rest_framework.settings import ISO_8601, api_settings
+
+from models import changes, export, models
+from api_v1 import links, serializers
+
+
+def get_datetime_field():
+    """
+    Get a function representing datetimes as DateTimeField does, formatting
+    them straight into ISO 8601 if that's the format, as by default.
+    """
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None or output_format.lower() != ISO_8601:
+        return DateTimeField().to_representation
+
+    def to_representation(value):
+        if value is None:
+            return None
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            return value[:-6] + 'Z'
+        return value
+    return to_representation
+
+
+class Representation:
+    """
+    Base for fast representations of a model, made for one request.
+
+    Subclasses list their output fields in order in field_names. A field
+    with a get_<name>_field method is set up by calling it, which returns
+    the values the field needs from each row and a function turning a row
+    into the field's output; any other field is copied from the value named
+    in value_names, or of the same name. Only the fields the request wants
+    (see serializers.get_field_names) are set up, so the rest cost nothing,
+    not even a column in the query.
+    """
+    model = None
+    field_names = ()
+    value_names = {}
+    required_values = ('id',)
+
+    def __init__(self, request, format=None, nested=False):
+        self.request = request
+        self.format = format
+        if nested:
+            self.field_names = list(self.field_names)
+            expanded_field_names = []
+        else:
+            self.field_names = serializers.get_field_names(request,
+                                                           self.field_names)
+            expanded_field_names = serializers.get_expanded_field_names(
+                request, self.get_expandable_fields())
+        self.expansions = OrderedDict()
+        value_fields = list(self.required_values)
+        self.fields = []
+        for name in self.field_names:
+            method = getattr(self, 'get_{}_field'.format(name), None)
+            if name in expanded_field_names:
+                values, getter = self.get_expanded_field(name)
+            elif method is None:
+                value = self.value_names.get(name, name)
+                values, getter = (value,), itemgetter(value)
+            else:
+                values, getter = method()
+            value_fields.extend(value for value in values
+                                if value not in value_fields)
+            self.fields.append((name, getter))
+        self.value_fields = tuple(value_fields)
+
+    def get_expandable_fields(self):
+        """
+        Representations of the related objects that can be embedded, by the
+        field linking to them. The related object's ID is the value named in
+        value_names.
+        """
+        return {}
+
+    def get_expanded_field(self, name):
+        representation_class = self.get_expandable_fields()[name]
+        value = self.value_names[name]
+        values, related = self.expansions.setdefault(representation_class,
+                                                     ([], {}))
+        values.append(value)
+        return (value,), lambda row: related.get(row[value])
+
+    def url_template(self, view_name, *arguments):
+        return links.get_template(view_name, arguments, request=self.request,
+                                  format=self.format)
+
+    def get_rows(self, queryset):
+        """Get the rows of values needed to represent a queryset."""
+        return queryset.prefetch_related(None).values(*self.value_fields)
+
+    def prepare(self, rows):
+        """
+        Load anything else needed to represent the given rows. Related
+        objects being embedded are loaded with one query for each related
+        model.
+        """
+        for representation_class, (values, related) \
+                in self.expansions.items():
+            related.clear()
+            ids = {row[value] for row in rows for value in values}
+            ids.discard(None)
+            if not ids:
+                continue
+            representation = representation_class(self.request, self.format,
+                                                   nested=True)
+            related.update((item['id'], item)
+                           for item in representation.represent(
+                               representation.get_rows(
+                                   representation.model.objects.filter(
+                                       pk__in=ids))))
+
+    def represent(self, rows):
+        """Represent a list of rows."""
+        rows = list(rows)
+        self.prepare(rows)
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        return OrderedDict([(name, getter(row))
+                            for name, getter in self.fields])
+
+
+class AlternativeNamesRepresentation(Representation):
+    """Base for representations of models with alternative names."""
+    alternative_name_model = None
+    alternative_name_key = None
+
+    def get_alternative_names_field(self):
+        return ('id',), lambda row: self.alternative_names[row['id']]
+
+    def prepare(self, rows):
+        """Also load the alternative names of every row in one query."""
+        super().prepare(rows)
+        if 'alternative_names' not in self.field_names:
+            return
+        self.alternative_names = {row['id']: [] for row in rows}
+        if not rows:
+            return
+        for key, name in self.alternative_name_model.objects.filter(**{
+                self.alternative_name_key + '__in': list(
+                    self.alternative_names)}).values_list(
+                        self.alternative_name_key, 'name'):
+            self.alternative_names[key].append(name)
+
+
+class GameRepresentation(Representation):
+    field_names = ('id', 'url', 'venue', 'team_1', 'team_2', 'team_1_score',
+                   'team_2_score', 'start', 'team_1_goals', 'team_1_behinds',
+                   'team_2_goals', 'team_2_behinds', 'season')
+    model = models.Game
+    value_names = {'venue': 'venue_id', 'team_1': 'team_1_id',
+                   'team_2': 'team_2_id', 'season': 'season_id'}
+    # Cursor pagination reads each page's position from these.
+    required_values = ('id', 'start')
+
+    def get_expandable_fields(self):
+        return {'venue': VenueRepresentation,
+                'team_1': TeamRepresentation,
+                'team_2': TeamRepresentation,
+                'season': SeasonRepresentation}
+
+    def get_url_field(self):
+        url = self.url_template('api_v1:game_detail',
+                                'league_id', 'season_id', 'pk')
+        return (('season__league_id', 'season_id', 'id'),
+                lambda row: url(row['season__league_id'], row['season_id'],
+                                row['id']))
+
+    def get_venue_field(self):
+        url = self.url_template('api_v1:venue_detail', 'pk')
+        return (('venue_id',),
+                lambda row: (None if row['venue_id'] is None
+                             else url(row['venue_id'])))
+
+    def get_team_field(self, team):
+        url = self.url_template('api_v1:team_detail', 'league_id', 'pk')
+        league_id = team + '__league_id'
+        team_id = team + '_id'
+        return ((league_id, team_id),
+                lambda row: url(row[league_id], row[team_id]))
+
+    def get_team_1_field(self):
+        return self.get_team_field('team_1')
+
+    def get_team_2_field(self):
+        return self.get_team_field('team_2')
+
+    def get_score_field(self, team):
+        goals = team + '_goals'
+        behinds = team + '_behinds'
+        return ((goals, behinds),
+                lambda row: row[goals] * 6 + row[behinds])
+
+    def get_team_1_score_field(self):
+        return self.get_score_field('team_1')
+
+    def get_team_2_score_field(self):
+        return self.get_score_field('team_2')
+
+    def get_start_field(self):
+        start = get_datetime_field()
+        return ('start',), lambda row: start(row['start'])
+
+
+class CompactGameRepresentation(Representation):
+    """
+    Games arranged as columns with lookup tables, as in the compact export
+    format (see models.export.get_compact).
+    """
+    model = models.Game
+    required_values = export.VALUE_FIELDS
+
+    def represent(self, rows):
+        values = itemgetter(*export.VALUE_FIELDS)
+        return export.get_compact([values(row) for row in rows])
+
+
+class TeamRepresentation(AlternativeNamesRepresentation):
+    field_names = ('id', 'url', 'games', 'alternative_names', 'name',
+                   'primary_colour', 'secondary_colour', 'tertiary_colour',
+                   'league')
+    model = models.Team
+    value_names = {'league': 'league_id'}
+    alternative_name_model = models.TeamAlternativeName
+    alternative_name_key = 'team_id'
+
+    def get_expandable_fields(self):
+        return {'league': LeagueRepresentation}
+
+    def get_url_field(self):
+        url = self.url_template('api_v1:team_detail', 'league_id', 'pk')
+        return (('league_id', 'id'),
+                lambda row: url(row['league_id'], row['id']))
+
+    def get_games_field(self):
+        url = self.url_template('api_v1:team_game_list',
+                                'league_id', 'team_id')
+        return (('league_id', 'id'),
+                lambda row: url(row['league_id'], row['id']))
+
+
+class VenueRepresentation(AlternativeNamesRepresentation):
+    field_names = ('id', 'url', 'alternative_names', 'timezone', 'name',
+                   'latitude', 'longitude')
+    model = models.Venue
+    alternative_name_model = models.VenueAlternativeName
+    alternative_name_key = 'venue_id'
+
+    def get_url_field(self):
+        url = self.url_template('api_v1:venue_detail', 'pk')
+        return ('id',), lambda row: url(row['id'])
+
+    def get_decimal_field(self, name):
+        field = serializers.VenueSerializer().fields[name].to_representation
+        return (name,), lambda row: field(row[name])
+
+    def get_latitude_field(self):
+        return self.get_decimal_field('latitude')
+
+    def get_longitude_field(self):
+        return self.get_decimal_field('longitude')
+
+
+class SeasonRepresentation(Representation):
+    model = models.Season
+    field_names = ('id', 'url', 'games', 'ladder', 'name', 'finalised',
+                   'league')
+    value_names = {'league': 'league_id'}
+
+    def get_link_field(self, view_name, argument):
+        url = self.url_template(view_name, 'league_id', argument)
+        return (('league_id', 'id'),
+                lambda row: url(row['league_id'], row['id']))
+
+    def get_url_field(self):
+        return self.get_link_field('api_v1:season_detail', 'pk')
+
+    def get_games_field(self):
+        return self.get_link_field('api_v1:game_list', 'season_id')
+
+    def get_ladder_field(self):
+        return self.get_link_field('api_v1:season_ladder', 'season_id')
+
+
+class LeagueRepresentation(Representation):
+    model = models.League
+    field_names = ('id', 'url', 'seasons', 'name')
+
+    def get_url_field(self):
+        url = self.url_template('api_v1:league_detail', 'pk')
+        return ('id',), lambda row: url(row['id'])
+
+    def get_seasons_field(self):
+        url = self.url_template('api_v1:season_list', 'league_id')
+        return ('id',), lambda row: url(row['id'])
+
+
+class ChangeRepresentation(Representation):
+    """
+    Changes from the change log (see models.changes), linking to the objects
+    changed if they still exist.
+    """
+    field_names = ('cursor', 'type', 'id', 'action', 'changed_at', 'url')
+    value_names = {'cursor': 'id', 'type': 'object_type'}
+    # Routes to each type of object, with their arguments and the values
+    # filling them in.
+    routes = {
+        'league': ('api_v1:league_detail', ('pk',), ('id',)),
+        'team': ('api_v1:team_detail', ('league_id', 'pk'),
+                 ('league_id', 'id')),
+        'team_alternative_name': (
+            'api_v1:team_alternative_name_detail',
+            ('league_id', 'team_id', 'pk'),
+            ('team__league_id', 'team_id', 'id')),
+        'season': ('api_v1:season_detail', ('league_id', 'pk'),
+                   ('league_id', 'id')),
+        'venue': ('api_v1:venue_detail', ('pk',), ('id',)),
+        'venue_alternative_name': (
+            'api_v1:venue_alternative_name_detail',
+            ('venue_id', 'pk'),
+            ('venue_id', 'id')),
+        'game': ('api_v1:game_detail', ('league_id', 'season_id', 'pk'),
+                 ('season__league_id', 'season_id', 'id')),
+    }
+
+    def get_id_field(self):
+        def get_id(row):
+            model = changes.MODELS[row['object_type']]
+            return model._meta.pk.to_python(row['object_id'])
+        return ('object_type', 'object_id'), get_id
+
+    def get_changed_at_field(self):
+        changed_at = get_datetime_field()
+        return ('changed_at',), lambda row: changed_at(row['changed_at'])
+
+    def get_url_field(self):
+        self.urls = {}
+        return (('object_type', 'object_id'),
+                lambda row: self.urls.get((row['object_type'],
+                                           row['object_id'])))
+
+    def prepare(self, rows):
+        """
+        Build links to the changed objects which still exist, loading each
+        type of object in one query.
+        """
+        super().prepare(rows)
+        if 'url' not in self.field_names:
+            return
+        object_ids = {}
+        for row in rows:
+            object_ids.setdefault(row['object_type'], set()).add(
+                row['object_id'])
+        self.urls.clear()
+        for object_type, ids in object_ids.items():
+            view_name, arguments, values = self.routes[object_type]
+            url = self.url_template(view_name, *arguments)
+            for object_values in changes.MODELS[object_type].objects.filter(
+                    pk__in=ids).values_list(*values):
+                self.urls[object_type, str(object_values[-1])] = url(
+                    *object_values)
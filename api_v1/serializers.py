@@ -1,14 +1,101 @@
-from rest_framework.serializers import (HyperlinkedIdentityField,
-                                        HyperlinkedRelatedField,
-                                        SlugRelatedField,
+from urllib.parse import urlparse
+
+from django.core.urlresolvers import Resolver404, get_script_prefix, resolve
+from django.db import transaction
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import (SlugRelatedField,
                                         ModelSerializer,
+                                        Serializer,
                                         IntegerField,
-                                        CharField)
-
-from models import models
-
-
-class LeagueSerializer(ModelSerializer):
+                                        FloatField,
+                                        CharField,
+                                        ChoiceField,
+                                        DateTimeField,
+                                        ValidationError)
+
+from models import changes, ladder, models, scoring, versions
+from api_v1.fields import HyperlinkedIdentityField, HyperlinkedRelatedField
+
+FINALISED_SEASON = 'Games can\'t be changed in a finalised season.'
+
+
+def include_alternative_names(request):
+    """
+    Whether alternative names should be included in responses to the given
+    request. Clients can leave them out with ?alternative_names=false.
+    """
+    if request is None:
+        return True
+    value = request.query_params.get('alternative_names', '')
+    return value.lower() not in ('false', '0')
+
+
+def get_list_param(request, name):
+    """Get the set of comma-separated values of a query parameter."""
+    return {value for value in request.query_params.get(name, '').split(',')
+            if value}
+
+
+def get_field_names(request, field_names):
+    """
+    Filter a list of field names down to those a read wants: only those
+    listed in ?fields= (if given), less any listed in ?omit=. Writes always
+    get every field.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return list(field_names)
+    fields = get_list_param(request, 'fields')
+    omit = get_list_param(request, 'omit')
+    if not include_alternative_names(request):
+        omit.add('alternative_names')
+    return [name for name in field_names
+            if (not fields or name in fields) and name not in omit]
+
+
+def include_field(request, field_name):
+    """Whether a field is wanted in responses to the given request."""
+    return bool(get_field_names(request, [field_name]))
+
+
+def get_expanded_field_names(request, field_names):
+    """
+    Filter a list of field names down to those a read wants to embed rather
+    than link to, as listed in ?expand=.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return []
+    expand = get_list_param(request, 'expand')
+    return [name for name in get_field_names(request, field_names)
+            if name in expand]
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Drop the fields a request doesn't want (see get_field_names), so that
+    they're never computed, and embed related objects the request wants
+    expanded.
+
+    Only the top-level serializer looks at the request; serializers nested
+    by expanding a field always have all their fields.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        field_names = get_field_names(request, self.fields)
+        for name in list(self.fields):
+            if name not in field_names:
+                self.fields.pop(name)
+        expandable_fields = self.get_expandable_fields()
+        for name in get_expanded_field_names(request, expandable_fields):
+            self.fields[name] = expandable_fields[name](read_only=True)
+
+    def get_expandable_fields(self):
+        """Serializers of the related objects that can be embedded."""
+        return {}
+
+
+class LeagueSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     url = HyperlinkedIdentityField(view_name='api_v1:league_detail')
     seasons = HyperlinkedIdentityField(view_name='api_v1:season_list',
                                        lookup_url_kwarg='league_id')
@@ -37,9 +124,12 @@ class SeasonRelatedHyperlinkedIdentityField(HyperlinkedIdentityField):
                             format=format)
 
 
-class TeamSerializer(ModelSerializer):
+class TeamSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     url = LeagueRelatedHyperlinkedIdentityField(
         view_name='api_v1:team_detail')
+    games = LeagueRelatedHyperlinkedIdentityField(
+        view_name='api_v1:team_game_list',
+        lookup_url_kwarg='team_id')
     alternative_names = SlugRelatedField(many=True,
                                          read_only=True,
                                          slug_field='name')
@@ -48,16 +138,23 @@ class TeamSerializer(ModelSerializer):
         model = models.Team
         fields = '__all__'
 
+    def get_expandable_fields(self):
+        return {'league': LeagueSerializer}
+
 
 class TeamHyperlink(HyperlinkedRelatedField):
     view_name = 'api_v1:team_detail'
     queryset = models.Team.objects.all()
 
+    def use_pk_only_optimization(self):
+        # Team URLs need the league ID, so work with the team instance
+        # (select_related by the view) rather than a primary key stub.
+        return False
+
     def get_url(self, obj, view_name, request, format):
-        team = models.Team.objects.get(pk=obj.pk)
         return self.reverse(view_name,
-                            kwargs={self.lookup_url_kwarg: team.id,
-                                    'league_id': team.league_id},
+                            kwargs={self.lookup_url_kwarg: obj.id,
+                                    'league_id': obj.league_id},
                             request=request,
                             format=format)
 
@@ -77,7 +174,8 @@ class TeamRelatedHyperlinkedIdentityField(HyperlinkedIdentityField):
                             format=format)
 
 
-class TeamAlternativeNameSerializer(ModelSerializer):
+class TeamAlternativeNameSerializer(SparseFieldsSerializerMixin,
+                                    ModelSerializer):
     url = TeamRelatedHyperlinkedIdentityField(
         view_name='api_v1:team_alternative_name_detail')
 
@@ -86,18 +184,21 @@ class TeamAlternativeNameSerializer(ModelSerializer):
         fields = '__all__'
 
 
-class SeasonSerializer(ModelSerializer):
+class SeasonSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     url = LeagueRelatedHyperlinkedIdentityField(
         view_name='api_v1:season_detail')
     games = LeagueRelatedHyperlinkedIdentityField(view_name='api_v1:game_list',
                                                   lookup_url_kwarg='season_id')
+    ladder = LeagueRelatedHyperlinkedIdentityField(
+        view_name='api_v1:season_ladder',
+        lookup_url_kwarg='season_id')
 
     class Meta:
         model = models.Season
         fields = '__all__'
 
 
-class GameSerializer(ModelSerializer):
+class GameSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     url = SeasonRelatedHyperlinkedIdentityField(view_name='api_v1:game_detail')
     venue = HyperlinkedRelatedField(view_name='api_v1:venue_detail',
                                     required=False,
@@ -111,8 +212,192 @@ class GameSerializer(ModelSerializer):
         model = models.Game
         fields = '__all__'
 
+    def get_expandable_fields(self):
+        return {'venue': VenueSerializer,
+                'team_1': TeamSerializer,
+                'team_2': TeamSerializer,
+                'season': SeasonSerializer}
+
+    def validate(self, attrs):
+        seasons = [attrs.get('season')]
+        if self.instance is not None:
+            seasons.append(self.instance.season)
+        if any(season is not None and season.finalised
+               for season in seasons):
+            raise ValidationError(FINALISED_SEASON)
+        return super().validate(attrs)
 
-class VenueSerializer(ModelSerializer):
+
+class LadderEntrySerializer(SparseFieldsSerializerMixin, ModelSerializer):
+    team = TeamHyperlink()
+    percentage = FloatField(read_only=True)
+    premiership_points = IntegerField(read_only=True)
+
+    class Meta:
+        model = models.LadderEntry
+        fields = ('team', 'played', 'wins', 'losses', 'draws', 'points_for',
+                  'points_against', 'percentage', 'premiership_points')
+
+
+def resolve_hyperlink(url, view_name):
+    """
+    Get the URL keyword arguments of a hyperlink to the given view, or None if
+    it isn't one.
+    """
+    path = urlparse(url).path
+    prefix = get_script_prefix()
+    if path.startswith(prefix):
+        path = '/' + path[len(prefix):]
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    if match.view_name != view_name:
+        return None
+    return match.kwargs
+
+
+class GameBatchItemSerializer(Serializer):
+    """Validates the fields of one game in a batch, without any queries."""
+    start = DateTimeField()
+    venue = CharField(required=False, allow_null=True)
+    team_1 = CharField()
+    team_1_goals = IntegerField(min_value=0, default=0)
+    team_1_behinds = IntegerField(min_value=0, default=0)
+    team_2 = CharField()
+    team_2_goals = IntegerField(min_value=0, default=0)
+    team_2_behinds = IntegerField(min_value=0, default=0)
+
+
+class GameBatchSerializer:
+    """
+    Validates and creates a batch of games in a season.
+
+    Teams and venues referenced by the whole batch are each fetched in one
+    query, and duplicates are checked for in one query, before all of the
+    games are inserted together.
+    """
+    invalid_hyperlink = 'Invalid hyperlink - Object does not exist.'
+    duplicate = 'A game with this start, season, team_1 and team_2 ' \
+                'already exists.'
+
+    def __init__(self, season, data):
+        self.season = season
+        self.data = data
+
+    def is_valid(self):
+        """Validate every game in the batch, collecting errors per game."""
+        if not isinstance(self.data, list):
+            self.errors = {'non_field_errors': ['Expected a list of games.']}
+            return False
+        if self.season.finalised:
+            self.errors = {'non_field_errors': [FINALISED_SEASON]}
+            return False
+        self.validated_data = []
+        self.errors = []
+        for item in self.data:
+            serializer = GameBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                self.validated_data.append(serializer.validated_data)
+                self.errors.append({})
+            else:
+                self.validated_data.append(None)
+                self.errors.append(dict(serializer.errors))
+        self._resolve_relations()
+        self._check_duplicates()
+        return not any(self.errors)
+
+    def _resolve_relations(self):
+        team_links = {}
+        venue_links = {}
+        for data, errors in zip(self.validated_data, self.errors):
+            if data is None:
+                continue
+            for field in ('team_1', 'team_2'):
+                kwargs = resolve_hyperlink(data[field], 'api_v1:team_detail')
+                if kwargs is None:
+                    errors[field] = [self.invalid_hyperlink]
+                else:
+                    team_links[data[field]] = (kwargs['league_id'],
+                                               kwargs['pk'])
+            if data.get('venue'):
+                kwargs = resolve_hyperlink(data['venue'],
+                                           'api_v1:venue_detail')
+                if kwargs is None:
+                    errors['venue'] = [self.invalid_hyperlink]
+                else:
+                    venue_links[data['venue']] = kwargs['pk']
+        teams = models.Team.objects.in_bulk(
+            {team_id for league_id, team_id in team_links.values()})
+        venues = models.Venue.objects.in_bulk(set(venue_links.values()))
+        for data, errors in zip(self.validated_data, self.errors):
+            if data is None:
+                continue
+            for field in ('team_1', 'team_2'):
+                if data[field] not in team_links:
+                    continue
+                league_id, team_id = team_links[data[field]]
+                team = teams.get(team_id)
+                if team is None or team.league_id != league_id:
+                    errors[field] = [self.invalid_hyperlink]
+                data[field] = team
+            if data.get('venue'):
+                data['venue'] = venues.get(venue_links.get(data['venue']))
+                if data['venue'] is None:
+                    errors['venue'] = [self.invalid_hyperlink]
+
+    def _check_duplicates(self):
+        valid = [data for data, errors in zip(self.validated_data, self.errors)
+                 if data is not None and not errors]
+        existing = set(models.Game.objects.filter(
+            season=self.season,
+            start__in={data['start'] for data in valid}).values_list(
+                'start', 'team_1_id', 'team_2_id'))
+        for data, errors in zip(self.validated_data, self.errors):
+            if data is None or errors:
+                continue
+            key = (data['start'], data['team_1'].pk, data['team_2'].pk)
+            if key in existing:
+                errors['non_field_errors'] = [self.duplicate]
+            existing.add(key)
+
+    def save(self):
+        """Create every game in the batch, returning a queryset of them."""
+        games = [models.Game(season=self.season, **data)
+                 for data in self.validated_data]
+        keys = {(game.start, game.team_1_id, game.team_2_id) for game in games}
+        with transaction.atomic():
+            models.Game.objects.bulk_create(games)
+            ladder.add_games([ladder.get_game_values(game) for game in games])
+            versions.bump_games([self.season.id], [self.season.league_id])
+            created = [game for game in models.Game.objects.filter(
+                season=self.season,
+                start__in={game.start for game in games}).select_related(
+                    'season', 'team_1', 'team_2').order_by('start', 'id')
+                if (game.start, game.team_1_id, game.team_2_id) in keys]
+            changes.record(models.Game, [game.id for game in created],
+                           changes.CREATED)
+        return created
+
+
+class ScoreSerializer(Serializer):
+    """
+    Validates a change to one team's score in a game, without any queries.
+    Goals and behinds are added to the score, or taken away if negative.
+    """
+    team = ChoiceField(choices=scoring.TEAMS)
+    goals = IntegerField(default=0, min_value=-scoring.MAX_CHANGE,
+                         max_value=scoring.MAX_CHANGE)
+    behinds = IntegerField(default=0, min_value=-scoring.MAX_CHANGE,
+                           max_value=scoring.MAX_CHANGE)
+
+    def validate(self, attrs):
+        if not (attrs['goals'] or attrs['behinds']):
+            raise ValidationError('Expected goals or behinds.')
+        return attrs
+
+
+class VenueSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     url = HyperlinkedIdentityField(view_name='api_v1:venue_detail')
     alternative_names = SlugRelatedField(many=True,
                                          read_only=True,
@@ -132,7 +417,8 @@ class VenueRelatedHyperlinkedIdentityField(HyperlinkedIdentityField):
                             request=request,
                             format=format)
 
-class VenueAlternativeNameSerializer(ModelSerializer):
+class VenueAlternativeNameSerializer(SparseFieldsSerializerMixin,
+                                     ModelSerializer):
     url = VenueRelatedHyperlinkedIdentityField(
         view_name='api_v1:venue_alternative_name_detail')
 
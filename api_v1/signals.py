@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from models import changes
+from models.models import Game, LadderEntry, Season
+from models.signals import get_game_season_ids
+from . import live, prerender
+
+
+@receiver(post_save, sender=Season)
+def remove_reopened_season_responses(sender, instance, **kwargs):
+    """Remove a season's pre-rendered responses when it's reopened."""
+    if not instance.finalised:
+        prerender.remove(instance.id)
+
+
+@receiver(post_delete, sender=Season)
+def remove_deleted_season_responses(sender, instance, **kwargs):
+    """Remove a season's pre-rendered responses when it's deleted."""
+    prerender.remove(instance.id)
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+def remove_changed_game_responses(sender, instance, **kwargs):
+    """
+    Remove the pre-rendered responses of a changed game's seasons, before
+    and after. Finalised seasons' games can't normally change, but these
+    are never to be served stale.
+    """
+    for season_id in get_game_season_ids(instance):
+        prerender.remove(season_id)
+
+
+@receiver(post_save, sender=LadderEntry)
+@receiver(post_delete, sender=LadderEntry)
+def remove_changed_ladder_responses(sender, instance, **kwargs):
+    """Remove the pre-rendered responses of a changed ladder's season."""
+    prerender.remove(instance.season_id)
+
+
+@receiver(changes.recorded, sender=Game)
+def publish_live_games(sender, object_ids, action, season_ids=(), **kwargs):
+    """
+    Push changes to games to live streams once they're committed, including
+    the streams of any seasons they've been deleted from or moved out of.
+    """
+    transaction.on_commit(lambda: live.publish_games(
+        object_ids, deleted=action == changes.DELETED,
+        season_ids=season_ids))
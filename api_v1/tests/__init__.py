@@ -132,6 +132,14 @@ def normalise_path(path):
     return '/v1/' + '/'.join(str(x) for x in path)
 
 
+def close_stream(response):
+    """
+    Close a streaming response's content. Closing the response itself sends
+    request_finished, which would close the test's database connection.
+    """
+    response._iterator.close()
+
+
 class TestCase(DjangoTestCase):
     """Base for API v1 tests."""
     def send_request(self, *args, **kwargs):
@@ -0,0 +1,217 @@
+import gzip
+import tempfile
+
+import brotli
+
+from django.db import connection
+from django.db.models import F
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from models.models import ResourceVersion
+from api_v1 import cache
+from . import (create_game,
+               create_league,
+               create_season,
+               create_venue,
+               normalise_path)
+
+
+class ResponseCacheTestCase(TransactionTestCase):
+    """
+    Base for response cache tests.
+
+    Responses aren't cached inside transactions, so these tests commit.
+    """
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.league = create_league()
+        self.seasons = [create_season(league=self.league)
+                        for i in range(0, 2)]
+        self.games = [create_game(league=self.league, season=season)
+                      for season in self.seasons]
+
+    def games_path(self, season):
+        return ('leagues', self.league.id, 'seasons', season.id, 'games')
+
+    def get(self, *path, **headers):
+        self.response = self.client.get(normalise_path(path), **headers)
+        return self.response
+
+    def assertCached(self, *path, **headers):
+        """
+        Assert that a request is answered from the cache, with only the
+        query checking the versions of what it shows.
+        """
+        with self.assertNumQueries(1):
+            self.get(*path, **headers)
+
+    def assertNotCached(self, *path):
+        """
+        Assert that a request isn't answered from the cache, but that the
+        next one is.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.get(*path)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(context.captured_queries)
+        self.assertCached(*path)
+        self.assertEqual(self.response.content, response.content)
+
+
+class ResponseCacheTest(ResponseCacheTestCase):
+    def test_cached(self):
+        """Get a cached list of games."""
+        path = self.games_path(self.seasons[0])
+        content = self.get(*path).content
+        self.assertCached(*path)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertEqual(self.response.content, content)
+        self.assertEqual(self.response['Content-Type'], 'application/json')
+
+    def test_cached_not_modified(self):
+        """Get an unchanged list of games from the cache."""
+        path = self.games_path(self.seasons[0])
+        etag = self.get(*path)['ETag']
+        self.assertCached(*path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+        self.assertEqual(self.response['ETag'], etag)
+
+    def test_query(self):
+        """Get a differently filtered list of games."""
+        path = self.games_path(self.seasons[0])
+        self.get(*path)
+        self.assertNotCached(*path[:-1] + ('games?limit=1',))
+
+    def test_format(self):
+        """Get a list of games in different formats."""
+        path = self.games_path(self.seasons[0])
+        self.get(*path)
+        self.assertNotCached(*path[:-1] + ('games.json',))
+
+    def test_browsable_api(self):
+        """Get a list of games in the browsable API, which isn't cached."""
+        path = self.games_path(self.seasons[0])[:-1] + ('games.api',)
+        self.get(*path)
+        with CaptureQueriesContext(connection) as context:
+            self.get(*path)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertTrue(context.captured_queries)
+
+    def test_game_edited(self):
+        """Get lists after a game is edited."""
+        paths = [self.games_path(season) for season in self.seasons]
+        ladder_path = paths[0][:-1] + ('ladder',)
+        for path in paths + [ladder_path]:
+            self.get(*path)
+        self.games[0].team_1_goals += 1
+        self.games[0].save()
+        self.assertNotCached(*paths[0])
+        self.assertNotCached(*ladder_path)
+        self.assertCached(*paths[1])
+
+    def test_game_batch_created(self):
+        """Get a list of games after a batch is created."""
+        path = self.games_path(self.seasons[0])
+        self.get(*path)
+        game = self.games[0]
+        team_urls = ['/v1/leagues/{}/teams/{}'.format(self.league.id, team_id)
+                     for team_id in (game.team_2_id, game.team_1_id)]
+        response = self.client.post(
+            normalise_path(path + ('batch',)),
+            '[{{"start": "{}", "team_1": "{}", "team_2": "{}"}}]'.format(
+                game.start.isoformat(), *team_urls),
+            content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotCached(*path)
+
+    def test_venue_created(self):
+        """Get lists after a venue is created."""
+        self.get('venues')
+        self.get('leagues')
+        create_venue(num_alternative_names=0)
+        self.assertNotCached('venues')
+        self.assertCached('leagues')
+
+    def test_changed_elsewhere(self):
+        """
+        Get a list of games after its version is bumped without any signal
+        reaching this process, as when another process changes it.
+        """
+        path = self.games_path(self.seasons[0])
+        self.get(*path)
+        ResourceVersion.objects.filter(
+            key='season:{}:games'.format(self.seasons[0].id)).update(
+                version=F('version') + 1)
+        self.assertNotCached(*path)
+
+    def test_league_deleted(self):
+        """Get a list of leagues after one is deleted."""
+        self.get('leagues')
+        create_league().delete()
+        self.assertNotCached('leagues')
+
+
+class CompressedResponseCacheTest(ResponseCacheTestCase):
+    def assertEncoded(self, encoding, decompress, content, response=None):
+        """Assert that a response is the given content, encoded."""
+        response = response or self.response
+        self.assertEqual(response['Content-Encoding'], encoding)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(decompress(response.content), content)
+
+    def test_compressed(self):
+        """Get compressed lists of games, from the cache and not."""
+        path = self.games_path(self.seasons[0])
+        content = self.get(*path).content
+        self.assertNotIn('Content-Encoding', self.response)
+        self.assertIn('Accept-Encoding', self.response['Vary'])
+        limited_path = path[:-1] + ('games?limit=2',)
+        response = self.get(*limited_path, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEncoded('gzip', gzip.decompress,
+                           self.get(*limited_path).content, response)
+        for encoding, decompress in (('gzip', gzip.decompress),
+                                     ('br', brotli.decompress)):
+            self.assertCached(*path, HTTP_ACCEPT_ENCODING=encoding)
+            self.assertEncoded(encoding, decompress, content)
+        self.assertCached(*path, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(self.response['Content-Encoding'], 'br')
+        self.assertCached(*path, HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+        self.assertEqual(self.response['Content-Encoding'], 'gzip')
+
+    def test_etags(self):
+        """Test that each encoding has its own ETag."""
+        path = self.games_path(self.seasons[0])
+        etag = self.get(*path)['ETag']
+        gzip_etag = self.get(*path, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        self.assertNotEqual(etag, gzip_etag)
+        self.assertCached(*path, HTTP_ACCEPT_ENCODING='gzip',
+                          HTTP_IF_NONE_MATCH=gzip_etag)
+        self.assertEqual(self.response.status_code, 304)
+        self.assertCached(*path, HTTP_ACCEPT_ENCODING='br',
+                          HTTP_IF_NONE_MATCH=gzip_etag)
+        self.assertEqual(self.response.status_code, 200)
+
+    def test_short(self):
+        """Test that short responses aren't compressed."""
+        self.get('leagues?fields=id', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertCached('leagues?fields=id', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', self.response)
+
+
+@override_settings(CACHES={
+    'api_v1': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(),
+    },
+})
+class FileBasedResponseCacheTest(ResponseCacheTestCase):
+    def test_cached(self):
+        """Get a list of games cached in files, then edit one."""
+        path = self.games_path(self.seasons[0])
+        self.get(*path)
+        self.assertCached(*path)
+        self.games[0].team_1_goals += 1
+        self.games[0].save()
+        self.assertNotCached(*path)
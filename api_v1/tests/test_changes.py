@@ -0,0 +1,96 @@
+import json
+
+from models.models import Change, Game
+from . import (create_game,
+               create_team,
+               create_venue,
+               normalise_path,
+               GetTestCase)
+
+
+class ChangeListTest(GetTestCase):
+    def get_changes(self, query=''):
+        self.assertSuccess('changes' + query)
+        return self.assertJson()
+
+    def test_changes(self):
+        """Get the changes since a cursor, with links to what changed."""
+        cursor = self.get_changes()['cursor']
+        game = create_game()
+        team = game.team_1
+        team.name = 'Richmond'
+        team.save()
+        venue = create_venue(num_alternative_names=0)
+        venue_id = venue.id
+        venue.delete()
+        data = self.get_changes('?since={}'.format(cursor))
+        changes = [(change['type'], change['id'], change['action'])
+                   for change in data['results']]
+        self.assertIn(('game', game.id, 'created'), changes)
+        self.assertIn(('team', team.id, 'updated'), changes)
+        self.assertIn(('venue', venue_id, 'created'), changes)
+        self.assertEqual(changes[-1], ('venue', venue_id, 'deleted'))
+        self.assertEqual(data['cursor'], data['results'][-1]['cursor'])
+        self.assertTrue(data['next'].endswith(
+            '/v1/changes?since={}'.format(data['cursor'])))
+        urls = {(change['type'], change['id']): change['url']
+                for change in data['results']}
+        self.assertRegex(urls['game', game.id], '/v1/leagues/{}/seasons/{}/'
+                         'games/{}$'.format(game.season.league_id,
+                                            game.season_id, game.id))
+        self.assertRegex(urls['team', team.id],
+                         '/v1/leagues/{}/teams/{}$'.format(team.league_id,
+                                                           team.id))
+        self.assertIsNone(urls['venue', venue_id])
+        self.assertEqual(
+            self.get_changes('?since={}'.format(data['cursor']))['results'],
+            [])
+
+    def test_limit(self):
+        """Test reading changes a page at a time."""
+        create_team(num_alternative_names=2)
+        change_ids = list(Change.objects.order_by('pk').values_list(
+            'pk', flat=True))
+        cursor, read = 0, []
+        while True:
+            data = self.get_changes('?since={}&limit=2'.format(cursor))
+            if not data['results']:
+                break
+            self.assertLessEqual(len(data['results']), 2)
+            read.extend(change['cursor'] for change in data['results'])
+            cursor = data['cursor']
+        self.assertEqual(read, change_ids)
+
+    def test_game_batch(self):
+        """Test that games created in a batch are recorded."""
+        game = create_game()
+        cursor = self.get_changes()['cursor']
+        team_urls = ['/v1/leagues/{}/teams/{}'.format(
+            game.season.league_id, team_id)
+            for team_id in (game.team_2_id, game.team_1_id)]
+        response = self.client.post(
+            normalise_path(('leagues', game.season.league_id, 'seasons',
+                            game.season_id, 'games', 'batch')),
+            json.dumps([{'start': game.start.isoformat(),
+                         'team_1': team_urls[0],
+                         'team_2': team_urls[1]}]),
+            content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        created = Game.objects.exclude(pk=game.pk).get()
+        self.assertEqual(
+            [('game', created.id, 'created')],
+            [(change['type'], change['id'], change['action']) for change
+             in self.get_changes('?since={}'.format(cursor))['results']])
+
+    def test_invalid_cursor(self):
+        """Test asking for changes since an invalid cursor."""
+        self.assertStatusCode(400, ('changes?since=yesterday',))
+        self.assertStatusCode(400, ('changes?since=-1',))
+
+    def test_browsable_api(self):
+        """Get changes in the browsable API."""
+        create_team()
+        response = self.client.get(normalise_path(('changes',)),
+                                   HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
@@ -0,0 +1,260 @@
+from datetime import timedelta
+import json
+from unittest import mock
+
+from django.utils import timezone
+from django.utils.http import http_date
+
+from models.models import ResourceVersion, Team
+
+from . import (create_game,
+               create_league,
+               create_season,
+               create_team,
+               create_team_alternative_name,
+               create_venue,
+               normalise_path,
+               random_datetime,
+               TestCase)
+
+
+class ConditionalGetTestCase(TestCase):
+    """Base for conditional GET tests."""
+
+    def get(self, *path, **headers):
+        self.response = self.client.get(normalise_path(path), **headers)
+        return self.response
+
+    def assertNotModified(self, *path, **headers):
+        """
+        Assert that a conditional request gets a 304 response after one
+        query.
+        """
+        with self.assertNumQueries(1):
+            self.get(*path, **headers)
+        self.assertEqual(self.response.status_code, 304)
+        self.assertEqual(self.response.content, b'')
+
+    def assertModified(self, etag, *path):
+        """
+        Assert that a request conditional on the given ETag gets a full
+        response with a new ETag.
+        """
+        self.get(*path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertNotEqual(self.response['ETag'], etag)
+
+
+class GameConditionalGetTest(ConditionalGetTestCase):
+    def setUp(self):
+        self.league = create_league()
+        self.season = create_season(league=self.league)
+        self.games = [create_game(league=self.league, season=self.season)
+                      for i in range(0, 3)]
+        self.path = ('leagues', self.league.id, 'seasons', self.season.id,
+                     'games')
+
+    def later(self, **kwargs):
+        """Pretend it's some time after the latest change."""
+        updated_at = ResourceVersion.objects.latest('updated_at').updated_at
+        return mock.patch('api_v1.views.timezone.now',
+                          return_value=updated_at + timedelta(**kwargs))
+
+    def test_validators(self):
+        """Get a list of games with an ETag and Last-Modified time."""
+        with self.later(seconds=1):
+            self.get(*self.path)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertTrue(self.response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', self.response)
+
+    def test_modified_this_second(self):
+        """Get a list of games changed in the current second."""
+        with self.later():
+            self.get(*self.path,
+                     HTTP_IF_MODIFIED_SINCE=http_date(
+                         timezone.now().timestamp() + 60))
+        self.assertEqual(self.response.status_code, 200)
+        self.assertNotIn('Last-Modified', self.response)
+
+    def test_not_modified(self):
+        """Get an unchanged list of games."""
+        etag = self.get(*self.path)['ETag']
+        self.assertNotModified(*self.path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response['ETag'], etag)
+
+    def test_not_modified_since(self):
+        """Get an unchanged list of games by its Last-Modified time."""
+        with self.later(seconds=1):
+            last_modified = self.get(*self.path)['Last-Modified']
+            self.assertNotModified(*self.path,
+                                   HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    def test_modified_since(self):
+        """Get a list of games modified after the given time."""
+        self.get(*self.path, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(self.response.status_code, 200)
+
+    def test_game_detail_not_modified(self):
+        """Get an unchanged game."""
+        path = self.path + (self.games[0].id,)
+        etag = self.get(*path)['ETag']
+        self.assertNotModified(*path, HTTP_IF_NONE_MATCH=etag)
+
+    def test_ladder_not_modified(self):
+        """Get an unchanged ladder."""
+        path = self.path[:-1] + ('ladder',)
+        etag = self.get(*path)['ETag']
+        self.assertNotModified(*path, HTTP_IF_NONE_MATCH=etag)
+
+    def test_game_edited(self):
+        """Get a list of games after one is edited."""
+        etag = self.get(*self.path)['ETag']
+        self.games[0].team_1_goals += 1
+        self.games[0].save()
+        self.assertModified(etag, *self.path)
+        self.assertModified(etag, *self.path[:-1] + ('ladder',))
+
+    def test_game_created(self):
+        """Get a list of games after one is created."""
+        etag = self.get(*self.path)['ETag']
+        create_game(league=self.league, season=self.season)
+        self.assertModified(etag, *self.path)
+
+    def test_game_deleted(self):
+        """Get a list of games after one is deleted."""
+        etag = self.get(*self.path)['ETag']
+        self.games[0].delete()
+        self.assertModified(etag, *self.path)
+
+    def test_game_moved(self):
+        """Get a list of games after one is moved to another season."""
+        etag = self.get(*self.path)['ETag']
+        self.games[0].season = create_season(league=self.league)
+        self.games[0].save()
+        self.assertModified(etag, *self.path)
+
+    def test_other_season_edited(self):
+        """Get a list of games after a game in another season is edited."""
+        game = create_game(league=self.league)
+        etag = self.get(*self.path)['ETag']
+        game.team_1_goals += 1
+        game.save()
+        self.assertNotModified(*self.path, HTTP_IF_NONE_MATCH=etag)
+
+    def test_batch_created(self):
+        """Get a list of games after a batch is created."""
+        etag = self.get(*self.path)['ETag']
+        teams = [create_team(league=self.league) for i in range(0, 2)]
+        team_urls = ['/v1/leagues/{}/teams/{}'.format(self.league.id, team.id)
+                     for team in teams]
+        response = self.client.post(
+            normalise_path(self.path + ('batch',)),
+            json.dumps([{'start': random_datetime().isoformat(),
+                         'team_1': team_urls[0],
+                         'team_2': team_urls[1]}]),
+            content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertModified(etag, *self.path)
+
+    def test_team_game_list_not_modified(self):
+        """Get an unchanged list of a team's games, then edit one."""
+        path = ('leagues', self.league.id, 'teams', self.games[0].team_1_id,
+                'games')
+        etag = self.get(*path)['ETag']
+        self.assertNotModified(*path, HTTP_IF_NONE_MATCH=etag)
+        self.games[0].team_2_goals += 1
+        self.games[0].save()
+        self.assertModified(etag, *path)
+
+    def test_export_not_modified(self):
+        """Export an unchanged league's games, then edit one."""
+        path = ('leagues', self.league.id, 'games.csv')
+        etag = self.get(*path)['ETag']
+        self.assertNotModified(*path, HTTP_IF_NONE_MATCH=etag)
+        self.games[0].team_2_goals += 1
+        self.games[0].save()
+        self.assertModified(etag, *path)
+
+    def test_formats(self):
+        """Get different ETags for different formats of a list of games."""
+        etag = self.get(*self.path)['ETag']
+        self.get(*self.path, HTTP_ACCEPT='text/html')
+        self.assertNotEqual(self.response['ETag'], etag)
+        self.get(*self.path[:-1] + ('games.api',))
+        self.assertNotEqual(self.response['ETag'], etag)
+
+    def test_query(self):
+        """Get different ETags for different pages of a list of games."""
+        etag = self.get(*self.path)['ETag']
+        self.get(*self.path[:-1] + ('games?limit=1',))
+        self.assertNotEqual(self.response['ETag'], etag)
+
+    def test_not_found(self):
+        """Get no validators with a missing season."""
+        self.get('leagues', self.league.id, 'seasons', 'missing', 'games')
+        self.assertEqual(self.response.status_code, 404)
+        self.assertNotIn('ETag', self.response)
+
+
+class OtherConditionalGetTest(ConditionalGetTestCase):
+    def test_league_not_modified(self):
+        """Get an unchanged league, then edit it."""
+        league = create_league()
+        etag = self.get('leagues', league.id)['ETag']
+        self.assertNotModified('leagues', league.id, HTTP_IF_NONE_MATCH=etag)
+        league.name = 'Renamed'
+        league.save()
+        self.assertModified(etag, 'leagues', league.id)
+
+    def test_team_alternative_name_created(self):
+        """Get a list of teams after an alternative name is added."""
+        team = create_team()
+        path = ('leagues', team.league_id, 'teams')
+        etag = self.get(*path)['ETag']
+        self.assertNotModified(*path, HTTP_IF_NONE_MATCH=etag)
+        create_team_alternative_name(team=team)
+        self.assertModified(etag, *path)
+
+    def test_venue_deleted(self):
+        """Get a list of venues after one is deleted."""
+        venue = create_venue()
+        etag = self.get('venues')['ETag']
+        self.assertNotModified('venues', HTTP_IF_NONE_MATCH=etag)
+        venue.delete()
+        self.assertModified(etag, 'venues')
+
+    def test_season_created(self):
+        """Get a list of seasons after one is created."""
+        league = create_league()
+        create_season(league=league)
+        path = ('leagues', league.id, 'seasons')
+        etag = self.get(*path)['ETag']
+        self.assertNotModified(*path, HTTP_IF_NONE_MATCH=etag)
+        create_season(league=league)
+        self.assertModified(etag, *path)
+
+    def test_team_other_league(self):
+        """Get a list of teams after teams in other leagues change."""
+        team = create_team()
+        other_team = create_team()
+        path = ('leagues', team.league_id, 'teams')
+        etag = self.get(*path)['ETag']
+        other_team.name = 'Renamed'
+        other_team.save()
+        create_team_alternative_name(team=other_team)
+        create_season(league=other_team.league)
+        self.assertNotModified(*path, HTTP_IF_NONE_MATCH=etag)
+        other_team.league = team.league
+        other_team.save()
+        self.assertModified(etag, *path)
+
+    def test_team_moved(self):
+        """Get a list of teams after one moves to another league."""
+        team = create_team()
+        path = ('leagues', team.league_id, 'teams')
+        etag = self.get(*path)['ETag']
+        team = Team.objects.get(pk=team.pk)
+        team.league = create_league()
+        team.save()
+        self.assertModified(etag, *path)
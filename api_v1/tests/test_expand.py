@@ -0,0 +1,70 @@
+from models.models import Venue
+from . import (create_game,
+               create_league,
+               create_season,
+               create_team,
+               GetTestCase)
+
+
+class ExpandTest(GetTestCase):
+    def test_expand_games(self):
+        """Test embedding the related objects of games."""
+        game = create_game()
+        self.assertSuccess('leagues', game.season.league_id, 'seasons',
+                           game.season_id,
+                           'games?expand=team_1,team_2,venue,season')
+        json = self.assertJson()['results'][0]
+        self.assertEqual(json['team_1']['id'], game.team_1_id)
+        self.assertEqual(json['team_1']['name'], game.team_1.name)
+        self.assertEqual(json['team_2']['primary_colour'],
+                         game.team_2.primary_colour)
+        self.assertEqual(json['venue']['name'], game.venue.name)
+        self.assertEqual(json['season']['name'], game.season.name)
+        self.assertRegex(json['url'], '/games/{}$'.format(game.id))
+
+    def test_expand_game(self):
+        """Test embedding the related objects of a game."""
+        game = create_game()
+        self.assertSuccess('leagues', game.season.league_id, 'seasons',
+                           game.season_id, 'games',
+                           '{}?expand=venue'.format(game.id))
+        json = self.assertJson()
+        self.assertEqual(json['venue']['id'], game.venue_id)
+        self.assertRegex(json['team_1'], '/teams/{}$'.format(game.team_1_id))
+
+    def test_expand_teams(self):
+        """Test embedding the leagues of teams."""
+        league = create_league()
+        team = create_team(league)
+        self.assertSuccess('leagues', league.id, 'teams',
+                           '{}?expand=league'.format(team.id))
+        json = self.assertJson()
+        self.assertEqual(json['league']['id'], league.id)
+        self.assertEqual(json['league']['name'], league.name)
+
+    def test_batched_queries(self):
+        """Test that each related model is loaded in one query per page."""
+        league = create_league()
+        season = create_season(league)
+        path = ('leagues', league.id, 'seasons', season.id,
+                'games?expand=team_1,team_2,venue,season')
+        create_game(league=league, season=season)
+        with self.assertNumQueries(8):
+            self.assertSuccess(*path)
+        for i in range(0, 5):
+            create_game(league=league, season=season)
+        with self.assertNumQueries(8):
+            self.assertSuccess(*path)
+        self.assertEqual(len(self.assertJson()['results']), 6)
+
+    def test_expanded_versions(self):
+        """Test that changing an embedded venue changes a game's ETag."""
+        game = create_game()
+        url = '/v1/leagues/{}/seasons/{}/games/{}?expand=venue'.format(
+            game.season.league_id, game.season_id, game.id)
+        etag = self.client.get(url)['ETag']
+        Venue.objects.get(pk=game.venue_id).save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
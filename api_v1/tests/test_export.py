@@ -0,0 +1,89 @@
+import csv
+import json
+
+from django.test import TestCase
+import dateutil.parser
+
+from models import export
+from . import create_game, create_league, create_season
+
+
+class LeagueGameExportTest(TestCase):
+    def setUp(self):
+        self.league = create_league()
+        season = create_season(league=self.league)
+        self.games = [create_game(league=self.league, season=season)
+                      for i in range(0, 3)]
+        self.games.append(create_game(league=self.league))
+        create_game()
+
+    def get_export(self, export_format):
+        response = self.client.get('/v1/leagues/{}/games.{}'.format(
+            self.league.id, export_format))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertExportedGame(self, row, game):
+        """Assert that the given exported row is the same as the given game."""
+        self.assertEqual(int(row['id']), game.id)
+        self.assertEqual(row['season'], game.season_id)
+        self.assertEqual(dateutil.parser.parse(row['start']), game.start)
+        self.assertEqual(row['venue'], game.venue_id)
+        self.assertEqual(row['team_1'], game.team_1_id)
+        self.assertEqual(int(row['team_1_goals']), game.team_1_goals)
+        self.assertEqual(int(row['team_1_behinds']), game.team_1_behinds)
+        self.assertEqual(int(row['team_1_score']), game.team_1_score)
+        self.assertEqual(row['team_2'], game.team_2_id)
+        self.assertEqual(int(row['team_2_goals']), game.team_2_goals)
+        self.assertEqual(int(row['team_2_behinds']), game.team_2_behinds)
+        self.assertEqual(int(row['team_2_score']), game.team_2_score)
+
+    def test_export_ndjson(self):
+        """Export a league's games as newline delimited JSON."""
+        response = self.get_export('ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), len(self.games))
+        for row, game in zip(rows, self.games):
+            self.assertExportedGame(row, game)
+
+    def test_export_csv(self):
+        """Export a league's games as CSV."""
+        response = self.get_export('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual(len(rows), len(self.games))
+        for row, game in zip(rows, self.games):
+            self.assertExportedGame(row, game)
+
+    def test_export_compact(self):
+        """Export a league's games as blocks of columns."""
+        response = self.get_export('compact')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        blocks = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(blocks), 1)
+        columns = blocks[0]['columns']
+        self.assertEqual(columns['id'], [game.id for game in self.games])
+        self.assertEqual(
+            [blocks[0]['seasons'][i] for i in columns['season']],
+            [game.season_id for game in self.games])
+        self.assertEqual([blocks[0]['teams'][i] for i in columns['team_1']],
+                         [game.team_1_id for game in self.games])
+        self.assertEqual(columns['team_1_behinds'],
+                         [game.team_1_behinds for game in self.games])
+
+    def test_export_compact_blocks(self):
+        """Test that each chunk of games is exported as its own block."""
+        lines = list(export.iter_compact(
+            export.iter_game_values(self.league.id, chunk_size=2),
+            chunk_size=2))
+        self.assertEqual([len(json.loads(line)['columns']['id'])
+                          for line in lines], [2, 2])
+
+    def test_no_such_league(self):
+        """Test when no matching league exists."""
+        response = self.client.get('/v1/leagues/no_such_league/games.csv')
+        self.assertEqual(response.status_code, 404)
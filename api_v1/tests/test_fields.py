@@ -0,0 +1,118 @@
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from models.models import Game
+from api_v1 import links
+from . import (create_game,
+               create_league,
+               create_season,
+               create_team,
+               create_team_alternative_name,
+               create_venue,
+               GetTestCase)
+
+
+class SparseFieldsTest(GetTestCase):
+    def test_fields(self):
+        """Test getting only the requested fields of games."""
+        game = create_game()
+        self.assertSuccess(
+            'leagues', game.season.league_id, 'seasons', game.season_id,
+            'games?fields=start,team_1,team_2,team_1_score,team_2_score')
+        json = self.assertJson()
+        self.assertEqual(list(json['results'][0]),
+                         ['team_1', 'team_2', 'team_1_score', 'team_2_score',
+                          'start'])
+        self.assertEqual(json['results'][0]['team_1_score'],
+                         game.team_1_score)
+
+    def test_omit(self):
+        """Test leaving out fields of a game."""
+        game = create_game()
+        self.assertSuccess('leagues', game.season.league_id, 'seasons',
+                           game.season_id, 'games',
+                           '{}?omit=url,venue,season'.format(game.id))
+        json = self.assertJson()
+        self.assertEqual(json['id'], game.id)
+        for field in ('url', 'venue', 'season'):
+            self.assertNotIn(field, json)
+        self.assertIn('start', json)
+
+    def test_serializers(self):
+        """Test leaving out fields served by serializers."""
+        league = create_league()
+        season = create_season(league)
+        team = create_team(league)
+        alternative_name = create_team_alternative_name(team)
+        self.assertSuccess('leagues?fields=id,name')
+        self.assertEqual(list(self.assertJson()['results'][0]),
+                         ['id', 'name'])
+        self.assertSuccess('leagues', league.id, 'seasons',
+                           '{}?omit=url,games,ladder'.format(season.id))
+        self.assertEqual(set(self.assertJson()),
+                         {'id', 'name', 'league', 'finalised'})
+        self.assertSuccess('leagues', league.id, 'teams', team.id,
+                           'alternative_names',
+                           '{}?fields=name'.format(alternative_name.id))
+        self.assertEqual(self.assertJson(), {'name': alternative_name.name})
+
+    def test_unrequested_links(self):
+        """Test that links which aren't requested aren't built."""
+        game = create_game()
+        with mock.patch('api_v1.links.URLTemplate',
+                        wraps=links.URLTemplate) as template:
+            self.assertSuccess('leagues', game.season.league_id, 'seasons',
+                               game.season_id, 'games?fields=id,start')
+        self.assertEqual(list(self.assertJson()['results'][0]),
+                         ['id', 'start'])
+        self.assertEqual(template.call_count, 0)
+
+    def test_unrequested_columns(self):
+        """Test that values which aren't requested aren't queried."""
+        game = create_game()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertSuccess('leagues', game.season.league_id, 'seasons',
+                               game.season_id, 'games?fields=start')
+        game_queries = [query['sql'] for query in queries
+                        if 'FROM "models_game"' in query['sql']]
+        self.assertTrue(game_queries)
+        for sql in game_queries:
+            self.assertNotIn('"models_team"', sql)
+            self.assertNotIn('"team_1_goals"', sql)
+
+    def test_unrequested_alternative_names(self):
+        """Test that alternative names aren't loaded unless requested."""
+        league = create_league()
+        create_team(league)
+        create_venue()
+        with self.assertNumQueries(3):
+            self.assertSuccess('leagues', league.id,
+                               'teams?fields=id,name')
+        self.assertEqual(list(self.assertJson()['results'][0]),
+                         ['id', 'name'])
+        with self.assertNumQueries(3):
+            self.assertSuccess('venues?omit=alternative_names')
+        self.assertNotIn('alternative_names',
+                         self.assertJson()['results'][0])
+
+    def test_writes(self):
+        """Test that writes ignore the requested fields."""
+        game = create_game()
+        url = '/v1/leagues/{}/seasons/{}/games/{}?fields=id'.format(
+            game.season.league_id, game.season_id, game.id)
+        response = self.client.get(url)
+        data = json.loads(response.content.decode())
+        self.assertEqual(data, {'id': game.id})
+        response = self.client.get(url.replace('?fields=id', ''))
+        data = json.loads(response.content.decode())
+        data['team_1_goals'] += 1
+        response = self.client.put(url, json.dumps(data),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode())
+        self.assertIn('url', data)
+        self.assertEqual(Game.objects.get(pk=game.id).team_1_goals,
+                         data['team_1_goals'])
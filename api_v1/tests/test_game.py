@@ -1,5 +1,6 @@
 import json
 import re
+from unittest import mock
 from random import randint
 from urllib.parse import quote as urlencode
 from datetime import datetime, timedelta
@@ -8,6 +9,7 @@ from django.test import TestCase
 import dateutil.parser
 import pytz
 
+from api_v1.pagination import GameCursorPagination
 from models.models import Game
 from . import (create_game,
                create_season,
@@ -135,6 +137,140 @@ class GameListTest(GetTestCase, GameTestCase):
         self.assertEquals(1, len(json['results']))
         self.assertGame(json['results'][0], game_2)
 
+    def test_list_games_query_count(self):
+        """Test that the number of queries doesn't grow with the games."""
+        league = create_league()
+        season = create_season(league=league)
+        for i in range(0, 10):
+            create_game(season=season, league=league)
+        with self.assertNumQueries(3):
+            self.assertSuccess('leagues', season.league_id,
+                               'seasons', season.id,
+                               'games')
+        json = self.assertJson()
+        self.assertEquals(10, len(json['results']))
+        for game_json in json['results']:
+            self.assertGame(game_json, Game.objects.get(pk=game_json['id']))
+
+    def test_filter_by_either_team(self):
+        """Test filtering by a team on either side."""
+        league = create_league()
+        season = create_season(league=league)
+        now = datetime.now(pytz.utc)
+        game_1 = create_game(season=season, league=league, start=now)
+        team = game_1.team_1
+        game_2 = create_game(season=season,
+                             league=league,
+                             team_2=team,
+                             start=now - timedelta(days=1))
+        game_3 = create_game(season=season, league=league)
+        game_4 = create_game(league=league, team_1=team)
+        self.assertSuccess('leagues', season.league_id,
+                           'seasons', season.id,
+                           'games?team=' + team.id)
+        json = self.assertJson()
+        self.assertEquals(2, len(json['results']))
+        self.assertGame(json['results'][0], game_2)
+        self.assertGame(json['results'][1], game_1)
+
+    def test_cursor_pagination(self):
+        """Test paging through games with a cursor."""
+        league = create_league()
+        season = create_season(league=league)
+        now = datetime.now(pytz.utc)
+        games = [create_game(season=season,
+                             league=league,
+                             start=now + timedelta(days=i))
+                 for i in range(0, 5)]
+        games.append(create_game(season=season, league=league, start=now))
+        games.sort(key=lambda game: (game.start, game.id))
+        results = []
+        url = '/v1/leagues/{}/seasons/{}/games?pagination=cursor'.format(
+            season.league_id, season.id)
+        with mock.patch.object(GameCursorPagination, 'page_size', 2):
+            while url:
+                self.response = self.client.get(url)
+                self.assertStatusCode(200)
+                json = self.assertJson()
+                self.assertNotIn('count', json)
+                self.assertLessEqual(len(json['results']), 2)
+                results.extend(json['results'])
+                url = json['next']
+        self.assertEqual(len(games), len(results))
+        for game_json, game in zip(results, games):
+            self.assertGame(game_json, game)
+
+    def test_cursor_pagination_ties(self):
+        """Test paging both ways through games starting at the same time."""
+        league = create_league()
+        season = create_season(league=league)
+        now = datetime.now(pytz.utc)
+        game_ids = sorted(create_game(season=season, league=league,
+                                      start=now).id
+                          for i in range(0, 5))
+        url = '/v1/leagues/{}/seasons/{}/games?pagination=cursor'.format(
+            season.league_id, season.id)
+        pages = []
+        with mock.patch.object(GameCursorPagination, 'page_size', 2):
+            while url:
+                self.response = self.client.get(url)
+                self.assertStatusCode(200)
+                json = self.assertJson()
+                pages.append([game['id'] for game in json['results']])
+                url = json['next']
+            self.assertEqual(sum(pages, []), game_ids)
+            url = json['previous']
+            for page in reversed(pages[:-1]):
+                self.response = self.client.get(url)
+                json = self.assertJson()
+                self.assertEqual([game['id'] for game in json['results']],
+                                 page)
+                url = json['previous']
+        self.assertIsNone(url)
+        self.assertStatusCode(404, ('leagues', season.league_id, 'seasons',
+                                    season.id, 'games?pagination=cursor'
+                                    '&cursor=cD1ub3QrYStwb3NpdGlvbg%3D%3D'))
+
+    def test_compact(self):
+        """Get a list of games arranged as columns."""
+        league = create_league()
+        season = create_season(league=league)
+        now = datetime.now(pytz.utc).replace(microsecond=0)
+        games = [create_game(season=season,
+                             league=league,
+                             start=now + timedelta(days=i))
+                 for i in range(0, 3)]
+        games[1].venue = None
+        games[1].save()
+        self.assertSuccess('leagues', season.league_id,
+                           'seasons', season.id,
+                           'games.compact')
+        self.assertContentType('application/vnd.openfootydata.compact+json')
+        compact = json.loads(self.response.content.decode())
+        self.assertEqual(compact['count'], len(games))
+        columns = compact['results']['columns']
+        teams = compact['results']['teams']
+        venues = compact['results']['venues']
+        self.assertEqual(compact['results']['seasons'], [season.id])
+        self.assertEqual(columns['id'], [game.id for game in games])
+        self.assertEqual(columns['start'],
+                         [int(game.start.timestamp()) for game in games])
+        self.assertEqual([teams[i] for i in columns['team_1']],
+                         [game.team_1_id for game in games])
+        self.assertEqual([teams[i] for i in columns['team_2']],
+                         [game.team_2_id for game in games])
+        self.assertEqual(columns['team_1_goals'],
+                         [game.team_1_goals for game in games])
+        self.assertEqual(columns['team_2_behinds'],
+                         [game.team_2_behinds for game in games])
+        self.assertEqual(columns['venue'][1], None)
+        self.assertEqual(venues[columns['venue'][2]], games[2].venue_id)
+        self.assertSuccess('leagues', season.league_id,
+                           'seasons', season.id,
+                           'games?format=compact&pagination=cursor')
+        self.assertEqual(json.loads(self.response.content.decode())[
+            'results']['columns'], columns)
+
     def test_no_games_in_season(self):
         """Get a list of games when none exist in the given season."""
         season = create_season()
@@ -160,6 +296,54 @@ class GameListTest(GetTestCase, GameTestCase):
                             'seasons', season.id,
                             'games')
 
+class TeamGameListTest(GetTestCase, GameTestCase):
+    def test_list_team_games(self):
+        """Get a list of a team's games across seasons."""
+        league = create_league()
+        team = create_team(league=league)
+        now = datetime.now(pytz.utc)
+        game_home = create_game(league=league,
+                                team_1=team,
+                                start=now - timedelta(days=365))
+        game_away = create_game(league=league, team_2=team, start=now)
+        game_next_season = create_game(league=league,
+                                       team_1=team,
+                                       start=now + timedelta(days=365))
+        game_other_team = create_game(league=league)
+        self.assertSuccess('leagues', league.id,
+                           'teams', team.id,
+                           'games')
+        json = self.assertJson()
+        self.assertEquals(3, len(json['results']))
+        self.assertGame(json['results'][0], game_home)
+        self.assertGame(json['results'][1], game_away)
+        self.assertGame(json['results'][2], game_next_season)
+
+    def test_no_team_games(self):
+        """Get a list of games when the team hasn't played any."""
+        team = create_team()
+        game = create_game(league=team.league)
+        self.assertSuccess('leagues', team.league_id,
+                           'teams', team.id,
+                           'games')
+        json = self.assertJson()
+        self.assertEquals(0, len(json['results']))
+
+    def test_no_such_team(self):
+        """Test when no matching team exists."""
+        game = create_game()
+        other_league = create_league()
+        self.assertNotFound('leagues', game.season.league_id,
+                            'teams', 'no_such_team',
+                            'games')
+        self.assertNotFound('leagues', 'no_such_league',
+                            'teams', game.team_1_id,
+                            'games')
+        self.assertNotFound('leagues', other_league.id,
+                            'teams', game.team_1_id,
+                            'games')
+
+
 class GameCreateTest(TestCase):
     def test_create_game(self):
         """Create a game."""
@@ -468,6 +652,213 @@ class GameCreateTest(TestCase):
             response = self.client.post(url, post_data)
             self.assertEqual(response.status_code, 400)
 
+class GameBatchCreateTest(TestCase):
+    def setUp(self):
+        self.season = create_season()
+        self.teams = [create_team(league=self.season.league,
+                                  num_alternative_names=0)
+                      for i in range(0, 4)]
+        self.venue = create_venue(num_alternative_names=0)
+        self.url = '/v1/leagues/{}/seasons/{}/games/batch'.format(
+            self.season.league_id, self.season.id)
+
+    def team_url(self, team):
+        return '/v1/leagues/{}/teams/{}'.format(team.league_id, team.id)
+
+    def game_data(self, team_1, team_2, **kwargs):
+        data = {'start': random_datetime().isoformat(),
+                'venue': '/v1/venues/{}'.format(self.venue.id),
+                'team_1': self.team_url(team_1),
+                'team_1_goals': randint(0, 100),
+                'team_1_behinds': randint(0, 100),
+                'team_2': self.team_url(team_2),
+                'team_2_goals': randint(0, 100),
+                'team_2_behinds': randint(0, 100)}
+        data.update(kwargs)
+        return data
+
+    def post(self, data):
+        return self.client.post(self.url,
+                                json.dumps(data),
+                                content_type='application/json')
+
+    def test_create_games(self):
+        """Create a batch of games."""
+        post_data = [self.game_data(self.teams[0], self.teams[1]),
+                     self.game_data(self.teams[2], self.teams[3]),
+                     self.game_data(self.teams[1], self.teams[2],
+                                    venue=None)]
+        response = self.post(post_data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        response_data = json.loads(response.content.decode(response.charset))
+        self.assertEqual(len(response_data), len(post_data))
+        games = Game.objects.filter(season=self.season)
+        self.assertEqual(games.count(), len(post_data))
+        for game_data in post_data:
+            game = games.get(start=dateutil.parser.parse(game_data['start']))
+            self.assertRegex(game_data['team_1'], game.team_1_id + '$')
+            self.assertRegex(game_data['team_2'], game.team_2_id + '$')
+            self.assertEqual(game.team_1_goals, game_data['team_1_goals'])
+            self.assertEqual(game.team_2_behinds, game_data['team_2_behinds'])
+            if game_data['venue'] is None:
+                self.assertIsNone(game.venue)
+            else:
+                self.assertEqual(game.venue, self.venue)
+            game_json = [item for item in response_data
+                         if item['id'] == game.id][0]
+            self.assertEqual(dateutil.parser.parse(game_json['start']),
+                             game.start)
+        self.assertEqual(
+            self.season.ladder.get(team=self.teams[1]).played, 2)
+
+    def test_errors_per_game(self):
+        """Test that errors are reported for each game in a batch."""
+        existing_game = create_game(season=self.season,
+                                    team_1=self.teams[0],
+                                    team_2=self.teams[1])
+        other_league_team = create_team(num_alternative_names=0)
+        duplicate = self.game_data(self.teams[2], self.teams[3])
+        post_data = [self.game_data(self.teams[0], self.teams[1],
+                                    start=existing_game.start.isoformat()),
+                     dict(self.game_data(self.teams[0], self.teams[1]),
+                          team_2='/v1/leagues/{}/teams/{}'.format(
+                              self.season.league_id, other_league_team.id)),
+                     self.game_data(self.teams[0], self.teams[1],
+                                    team_1_goals=-1),
+                     self.game_data(self.teams[0], self.teams[1],
+                                    venue='/v1/venues/no_such_venue'),
+                     self.game_data(self.teams[1], self.teams[2]),
+                     duplicate,
+                     duplicate]
+        response = self.post(post_data)
+        self.assertEqual(response.status_code, 400)
+        errors = json.loads(response.content.decode(response.charset))
+        self.assertEqual(len(errors), len(post_data))
+        self.assertIn('non_field_errors', errors[0])
+        self.assertIn('team_2', errors[1])
+        self.assertIn('team_1_goals', errors[2])
+        self.assertIn('venue', errors[3])
+        self.assertEqual(errors[4], {})
+        self.assertEqual(errors[5], {})
+        self.assertIn('non_field_errors', errors[6])
+        self.assertEqual(Game.objects.filter(season=self.season).count(), 1)
+
+    def test_duplicate_race(self):
+        """Test a duplicate created after the batch was checked."""
+        existing_game = create_game(season=self.season,
+                                    team_1=self.teams[0],
+                                    team_2=self.teams[1])
+        post_data = [self.game_data(self.teams[2], self.teams[3]),
+                     self.game_data(self.teams[0], self.teams[1],
+                                    start=existing_game.start.isoformat())]
+        with mock.patch('api_v1.serializers.GameBatchSerializer.'
+                        '_check_duplicates'):
+            response = self.post(post_data)
+        self.assertEqual(response.status_code, 400)
+        errors = json.loads(response.content.decode(response.charset))
+        self.assertIn('non_field_errors', errors)
+        self.assertEqual(Game.objects.filter(season=self.season).count(), 1)
+
+    def test_not_a_list(self):
+        """Test posting something other than a list of games."""
+        response = self.post(self.game_data(self.teams[0], self.teams[1]))
+        self.assertEqual(response.status_code, 400)
+
+    def test_no_such_season(self):
+        """Test creating games in a season which doesn't exist."""
+        other_league = create_league()
+        for league_id, season_id in ((self.season.league_id, 'no_such_season'),
+                                     ('no_such_league', self.season.id),
+                                     (other_league.id, self.season.id)):
+            url = '/v1/leagues/{}/seasons/{}/games/batch'.format(league_id,
+                                                                 season_id)
+            response = self.client.post(url, '[]',
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 404)
+
+
+class GameScoreTest(TestCase):
+    def setUp(self):
+        self.game = create_game()
+        self.url = '/v1/leagues/{}/seasons/{}/games/{}/score'.format(
+            self.game.season.league_id, self.game.season_id, self.game.id)
+
+    def post(self, data, url=None):
+        return self.client.post(url or self.url,
+                                json.dumps(data),
+                                content_type='application/json')
+
+    def test_add_score(self):
+        """Add goals and behinds to a game's score."""
+        response = self.post({'team': 1, 'goals': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        totals = json.loads(response.content.decode(response.charset))
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertEqual(game.team_1_goals, self.game.team_1_goals + 1)
+        self.assertEqual(game.team_1_behinds, self.game.team_1_behinds)
+        self.assertEqual(totals, {'id': game.id,
+                                  'team_1_goals': game.team_1_goals,
+                                  'team_1_behinds': game.team_1_behinds,
+                                  'team_1_score': game.team_1_score,
+                                  'team_2_goals': game.team_2_goals,
+                                  'team_2_behinds': game.team_2_behinds,
+                                  'team_2_score': game.team_2_score})
+        response = self.post({'team': '2', 'goals': 1, 'behinds': -1})
+        self.assertEqual(response.status_code, 200)
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertEqual(game.team_2_goals, self.game.team_2_goals + 1)
+        self.assertEqual(game.team_2_behinds, self.game.team_2_behinds - 1)
+        detail = self.client.get(self.url[:-len('/score')])
+        detail = json.loads(detail.content.decode(detail.charset))
+        self.assertEqual(detail['team_2_score'], game.team_2_score)
+        ladder = {entry.team_id: entry.points_for
+                  for entry in game.season.ladder.all()}
+        self.assertEqual(ladder, {game.team_1_id: game.team_1_score,
+                                  game.team_2_id: game.team_2_score})
+
+    def test_invalid_score(self):
+        """Test changes to scores which aren't allowed."""
+        for data in ({'team': 3, 'goals': 1},
+                     {'goals': 1},
+                     {'team': 1},
+                     {'team': 1, 'goals': 'one'},
+                     {'team': 1, 'goals': 101},
+                     {'team': 2, 'behinds': -10 ** 12},
+                     {'team': 1, 'goals': -(self.game.team_1_goals + 1)}):
+            self.assertEqual(self.post(data).status_code, 400)
+        self.game.season.finalised = True
+        self.game.season.save()
+        response = self.post({'team': 1, 'goals': 1})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('finalised', response.content.decode())
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertEqual((game.team_1_goals, game.team_2_goals),
+                         (self.game.team_1_goals, self.game.team_2_goals))
+
+    def test_league_games_modified(self):
+        """Test that views of a league's games see scores added."""
+        league_id = self.game.season.league_id
+        urls = ['/v1/leagues/{}/teams/{}/games'.format(league_id,
+                                                       self.game.team_1_id),
+                '/v1/leagues/{}/games.csv'.format(league_id)]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.assertEqual(self.post({'team': 1, 'goals': 1}).status_code, 200)
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_no_such_game(self):
+        """Test scoring games which don't exist."""
+        other_game = create_game()
+        for url in (self.url.replace(str(self.game.id), str(other_game.id)),
+                    self.url.replace(self.game.season_id, 'no_such_season'),
+                    re.sub('/\\d+/score$', '/0/score', self.url)):
+            self.assertEqual(self.post({'team': 1, 'goals': 1}, url=url)
+                             .status_code, 404)
+
+
 class GameEditTest(TestCase):
     def test_edit_game(self):
         """Edit a game"""
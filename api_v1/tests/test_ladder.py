@@ -0,0 +1,84 @@
+from django.test import TestCase
+
+from . import (create_game,
+               create_league,
+               create_season,
+               create_team,
+               GetTestCase)
+from .test_team import TeamTestCase
+
+
+class LadderTestCase(TeamTestCase):
+    """Base class for ladder tests."""
+
+    def assertLadderEntry(self, json, team, played, wins, losses, draws,
+                          points_for, points_against):
+        """
+        Assert that the given parsed ladder entry JSON data has the given
+        team and record.
+        """
+        self.assertTeamUrl(json['team'], team)
+        self.assertEqual(json['played'], played)
+        self.assertEqual(json['wins'], wins)
+        self.assertEqual(json['losses'], losses)
+        self.assertEqual(json['draws'], draws)
+        self.assertEqual(json['points_for'], points_for)
+        self.assertEqual(json['points_against'], points_against)
+        self.assertAlmostEqual(json['percentage'],
+                               points_for * 100 / points_against)
+        self.assertEqual(json['premiership_points'], wins * 4 + draws * 2)
+
+
+class LadderTest(GetTestCase, LadderTestCase):
+    def test_ladder(self):
+        """Get a season's ladder."""
+        league = create_league()
+        season = create_season(league=league)
+        teams = [create_team(league=league, num_alternative_names=0)
+                 for i in range(0, 3)]
+        scores = ((teams[0], 10, 10, teams[1], 5, 5),
+                  (teams[1], 12, 6, teams[2], 11, 10),
+                  (teams[2], 8, 8, teams[0], 8, 8))
+        for team_1, goals_1, behinds_1, team_2, goals_2, behinds_2 in scores:
+            game = create_game(league=league,
+                               season=season,
+                               team_1=team_1,
+                               team_2=team_2)
+            game.team_1_goals = goals_1
+            game.team_1_behinds = behinds_1
+            game.team_2_goals = goals_2
+            game.team_2_behinds = behinds_2
+            game.save()
+        create_game(league=league, team_1=teams[2])
+        self.assertSuccess('leagues', league.id,
+                           'seasons', season.id,
+                           'ladder')
+        json = self.assertJson()
+        self.assertEqual(len(json), 3)
+        self.assertLadderEntry(json[0], teams[0], 2, 1, 0, 1, 126, 91)
+        self.assertLadderEntry(json[1], teams[1], 2, 1, 1, 0, 113, 146)
+        self.assertLadderEntry(json[2], teams[2], 2, 0, 1, 1, 132, 134)
+
+    def test_empty_ladder(self):
+        """Get a ladder for a season without any games."""
+        season = create_season()
+        create_game(league=season.league)
+        self.assertSuccess('leagues', season.league_id,
+                           'seasons', season.id,
+                           'ladder')
+        json = self.assertJson()
+        self.assertEqual(json, [])
+
+    def test_no_such_season(self):
+        """Test when no matching season exists."""
+        season = create_season()
+        other_league = create_league()
+        self.assertNotFound('leagues', season.league_id,
+                            'seasons', 'no_such_season',
+                            'ladder')
+        self.assertNotFound('leagues', 'no_such_league',
+                            'seasons', season.id,
+                            'ladder')
+        self.assertNotFound('leagues', other_league.id,
+                            'seasons', season.id,
+                            'ladder')
@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.reverse import reverse as drf_reverse
+from rest_framework.test import APIRequestFactory
+
+from models import models
+from api_v1 import links, serializers
+from . import create_game
+
+
+class URLTemplateTest(TestCase):
+    def get_request(self, query='', **kwargs):
+        return Request(APIRequestFactory().get('/v1/' + query, **kwargs))
+
+    def assertSameUrl(self, view_name, kwargs, request=None, format=None):
+        self.assertEqual(
+            links.reverse(view_name, kwargs=kwargs, request=request,
+                          format=format),
+            drf_reverse(view_name, kwargs=kwargs, request=request,
+                        format=format))
+
+    def test_reverse(self):
+        """Test filling in URL templates."""
+        kwargs = {'league_id': 'afl', 'season_id': '2016', 'pk': 12}
+        self.assertSameUrl('api_v1:game_detail', kwargs)
+        self.assertSameUrl('api_v1:game_detail', kwargs, self.get_request())
+        self.assertSameUrl('api_v1:game_detail', kwargs, self.get_request(),
+                           format='json')
+        self.assertSameUrl('api_v1:game_detail', kwargs,
+                           self.get_request('?format=json'))
+        self.assertSameUrl('api_v1:game_detail', kwargs,
+                           self.get_request(secure=True,
+                                            HTTP_HOST='example.com:8443'))
+
+    def test_quoting(self):
+        """Test filling in URL templates with non-ASCII arguments."""
+        self.assertSameUrl('api_v1:venue_detail', {'pk': 'Mélbourne_1'},
+                           self.get_request())
+
+    def test_compiled_once(self):
+        """Test that each route is compiled once per request."""
+        games = [create_game() for i in range(0, 3)]
+        request = self.get_request()
+        queryset = models.Game.objects.select_related(
+            'season', 'team_1', 'team_2').order_by('id')
+        with mock.patch('api_v1.links.URLTemplate',
+                        wraps=links.URLTemplate) as template:
+            data = serializers.GameSerializer(
+                queryset, many=True, context={'request': request}).data
+        self.assertEqual(len(data), len(games))
+        self.assertEqual(template.call_count, 3)
+        self.assertEqual(data[0]['url'], drf_reverse(
+            'api_v1:game_detail',
+            kwargs={'league_id': games[0].season.league_id,
+                    'season_id': games[0].season_id,
+                    'pk': games[0].id},
+            request=request))
@@ -0,0 +1,311 @@
+from collections import namedtuple
+import json
+import socket
+import time
+from unittest import mock
+
+from django.db import OperationalError, connections
+from django.test import TestCase, TransactionTestCase
+
+from models import changes
+from models.models import Game
+from api_v1 import live
+from . import (close_stream,
+               create_game,
+               create_league,
+               create_season,
+               normalise_path)
+
+
+def parse_event(message):
+    """Parse a server-sent event into its name and data."""
+    fields = dict(line.split(': ', 1) for line in message.splitlines() if line)
+    return fields['event'], json.loads(fields['data'])
+
+
+class LiveStreamTestCase:
+    """Base for tests of live streams of games."""
+
+    def tearDown(self):
+        # The listener's connection would stop the test database being
+        # dropped.
+        live.stop_listener()
+
+    def open_stream(self, *path):
+        """Open a stream, returning an iterator over its events."""
+        response = self.client.get(normalise_path(path))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.addCleanup(close_stream, response)
+        messages = (message.decode() for message
+                    in response.streaming_content)
+        self.assertTrue(next(messages).startswith('retry: '))
+        return messages
+
+    def stream_path(self, game, *path):
+        return ('leagues', game.season.league_id, 'seasons',
+                game.season_id, 'games') + path
+
+
+class LiveStreamTest(LiveStreamTestCase, TestCase):
+    def test_current_scores(self):
+        """Test that streams start with the current scores."""
+        league = create_league()
+        season = create_season(league=league)
+        games = [create_game(league=league, season=season)
+                 for i in range(0, 2)]
+        games.sort(key=lambda game: (game.start, game.id))
+        messages = self.open_stream(*self.stream_path(games[0], 'live'))
+        for game in games:
+            event, data = parse_event(next(messages))
+            self.assertEqual(event, 'game')
+            self.assertEqual(data['id'], game.id)
+            self.assertEqual(data['team_1_score'], game.team_1_score)
+        messages = self.open_stream(*self.stream_path(
+            games[1], str(games[1].id), 'live'))
+        self.assertEqual(parse_event(next(messages))[1]['id'], games[1].id)
+
+    def test_not_found(self):
+        """Test streaming games which don't exist."""
+        game = create_game()
+        path = self.stream_path(game)
+        for missing_path in (('leagues', 'nobody', 'seasons',
+                              game.season_id, 'games', 'live'),
+                             path[:3] + ('nothing', 'games', 'live'),
+                             path + (str(game.id + 1), 'live')):
+            self.assertEqual(
+                self.client.get(normalise_path(missing_path)).status_code,
+                404)
+        # A season without any games is still there to stream.
+        empty_season = create_season(league=game.season.league)
+        self.open_stream('leagues', game.season.league_id, 'seasons',
+                         empty_season.id, 'games', 'live')
+
+
+class LiveUpdateTest(LiveStreamTestCase, TransactionTestCase):
+    """Updates are pushed once committed, so these tests commit."""
+
+    def test_updates(self):
+        """Test that saved scores are pushed to season and game streams."""
+        game = create_game()
+        season_messages = self.open_stream(*self.stream_path(game, 'live'))
+        game_messages = self.open_stream(*self.stream_path(
+            game, str(game.id), 'live'))
+        next(season_messages)
+        next(game_messages)
+        game.team_1_goals += 1
+        game.save()
+        for messages in (season_messages, game_messages):
+            event, data = parse_event(next(messages))
+            self.assertEqual(event, 'game')
+            self.assertEqual(data['team_1_goals'], game.team_1_goals)
+            self.assertEqual(data['team_1_score'], game.team_1_score)
+        game_id = game.id
+        game.delete()
+        self.assertEqual(parse_event(next(game_messages)),
+                         ('deleted', {'id': game_id}))
+
+    def test_moved_and_deleted(self):
+        """Test that seasons' streams hear of games moved out or deleted."""
+        game = create_game()
+        other_season = create_season(league=game.season.league)
+        messages = self.open_stream(*self.stream_path(game, 'live'))
+        next(messages)
+        game.season = other_season
+        game.save()
+        event, data = parse_event(next(messages))
+        self.assertEqual(event, 'game')
+        self.assertEqual(data['id'], game.id)
+        messages = self.open_stream(*self.stream_path(game, 'live'))
+        next(messages)
+        game_id = game.id
+        game.delete()
+        self.assertEqual(parse_event(next(messages)),
+                         ('deleted', {'id': game_id}))
+
+    def test_scoring(self):
+        """Test that scores added with the scoring endpoint are pushed."""
+        game = create_game()
+        path = self.stream_path(game, str(game.id))
+        messages = self.open_stream(*path + ('live',))
+        next(messages)
+        response = self.client.post(normalise_path(path + ('score',)),
+                                    json.dumps({'team': 2, 'behinds': 1}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(parse_event(next(messages))[1]['team_2_behinds'],
+                         game.team_2_behinds + 1)
+
+    def test_other_games(self):
+        """Test that streams only get updates to their own games."""
+        game = create_game()
+        other_game = create_game()
+        messages = self.open_stream(*self.stream_path(
+            game, str(game.id), 'live'))
+        next(messages)
+        other_game.team_2_behinds += 1
+        other_game.save()
+        game.team_2_behinds += 1
+        game.save()
+        self.assertEqual(parse_event(next(messages))[1]['team_2_behinds'],
+                         game.team_2_behinds)
+
+    def test_keepalive(self):
+        """Test that idle streams are kept open."""
+        game = create_game()
+        with mock.patch('api_v1.live.KEEPALIVE_INTERVAL', 0):
+            messages = self.open_stream(*self.stream_path(
+                game, str(game.id), 'live'))
+            next(messages)
+            self.assertEqual(next(messages), ': keepalive\n\n')
+
+    def test_unsubscribe(self):
+        """Test that closed streams stop getting updates."""
+        game = create_game()
+        response = self.client.get(normalise_path(self.stream_path(
+            game, str(game.id), 'live')))
+        next(iter(response.streaming_content))
+        self.assertTrue(live.broadcaster.has_subscribers())
+        close_stream(response)
+        self.assertFalse(live.broadcaster.has_subscribers())
+        # With nobody listening, and no other processes to tell, changes
+        # aren't even looked up.
+        with mock.patch('api_v1.live.uses_notify', return_value=False):
+            with mock.patch('api_v1.live.get_current_events') as mock_events:
+                with mock.patch.object(live.broadcaster,
+                                       'publish') as mock_publish:
+                    Game.objects.get(pk=game.pk).save()
+        mock_events.assert_not_called()
+        mock_publish.assert_not_called()
+
+
+Notify = namedtuple('Notify', ('channel', 'payload'))
+
+
+class FakeListenConnection:
+    """
+    Stands in for a Postgres connection listening for notifications, which
+    become readable once sent.
+    """
+
+    def __init__(self):
+        self.socket, self.sender = socket.socketpair()
+        self.notifies = []
+        self.cursor = mock.MagicMock()
+        self.closed = False
+        self.failed = False
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def notify(self, channels, message):
+        self.notifies.append(Notify(live.NOTIFY_CHANNEL,
+                                    json.dumps([channels, message])))
+        self.sender.send(b'\0')
+
+    def fail(self):
+        self.failed = True
+        self.sender.send(b'\0')
+
+    def poll(self):
+        self.socket.recv(1024)
+        if self.failed:
+            raise OperationalError('Connection lost')
+
+    def close(self):
+        self.closed = True
+        self.socket.close()
+        self.sender.close()
+
+
+class ListenerTest(TestCase):
+    """
+    The listener runs in a thread of its own, so the change log and games it
+    reads are stood in for too.
+    """
+
+    def setUp(self):
+        self.connections = [FakeListenConnection() for i in range(0, 2)]
+        self.changes = []
+        for patcher in (
+                mock.patch('api_v1.live.uses_notify', return_value=True),
+                mock.patch('api_v1.live.LISTEN_TIMEOUT', 0.01),
+                mock.patch.object(type(connections['default']),
+                                  'get_new_connection',
+                                  side_effect=self.connections),
+                mock.patch('api_v1.live.changes.get_latest_cursor',
+                           return_value=1),
+                mock.patch('api_v1.live.changes.get_changes',
+                           side_effect=self.get_changes),
+                mock.patch('api_v1.live.get_current_events',
+                           side_effect=self.get_current_events),
+                mock.patch('api_v1.live.connections.close_all')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(live.stop_listener)
+
+    def get_changes(self, since=0, limit=100):
+        return [change for change in self.changes
+                if change['id'] > since][:limit]
+
+    def get_current_events(self, game_ids):
+        return [([live.GAME_CHANNEL.format(game_id=game_id)],
+                 'event: game\n\n')
+                for game_id in game_ids]
+
+    def subscribe(self, game_id):
+        channel = live.GAME_CHANNEL.format(game_id=game_id)
+        subscriber = live.broadcaster.subscribe(channel)
+        self.addCleanup(live.broadcaster.unsubscribe, channel, subscriber)
+        return subscriber
+
+    def start(self):
+        listener = live.start_listener()
+        self.assertTrue(listener.listening.wait(5))
+        return listener
+
+    def test_listen(self):
+        """Test handing notifications to the broadcaster, then stopping."""
+        subscriber = self.subscribe(1)
+        listener = self.start()
+        self.connections[0].notify([live.GAME_CHANNEL.format(game_id=1)],
+                                   'event: game\n\n')
+        self.assertEqual(subscriber.get(timeout=5), 'event: game\n\n')
+        live.stop_listener()
+        self.assertFalse(listener.is_alive())
+        self.assertTrue(self.connections[0].closed)
+        self.assertIsNone(live._listener)
+
+    def test_stream_waits(self):
+        """Test that streams don't start until the listener is listening."""
+        connect = type(connections['default']).get_new_connection
+        connect.side_effect = lambda params: (time.sleep(0.1),
+                                              self.connections[0])[1]
+        with mock.patch('api_v1.live.LISTEN_TIMEOUT', 5):
+            messages = live.stream(live.GAME_CHANNEL.format(game_id=1),
+                                   Game.objects.none())
+            self.addCleanup(messages.close)
+            self.assertTrue(next(messages).startswith('retry: '))
+            self.assertTrue(live._listener.listening.is_set())
+
+    def test_catch_up(self):
+        """Test catching up on changes made while reconnecting."""
+        subscribers = [self.subscribe(game_id) for game_id in (2, 3)]
+        listener = self.start()
+        self.assertEqual(listener.cursor, 1)
+        self.changes.extend([
+            {'id': 2, 'object_type': 'game', 'object_id': '2',
+             'action': changes.UPDATED},
+            {'id': 3, 'object_type': 'team', 'object_id': 'richmond',
+             'action': changes.UPDATED},
+            {'id': 4, 'object_type': 'game', 'object_id': '3',
+             'action': changes.DELETED},
+        ])
+        with self.assertLogs('api_v1.live', 'ERROR'):
+            self.connections[0].fail()
+            self.assertEqual(subscribers[0].get(timeout=5),
+                             'event: game\n\n')
+            self.assertEqual(subscribers[1].get(timeout=5),
+                             live.format_event('deleted', {'id': 3}))
+        self.assertTrue(self.connections[0].closed)
+        self.assertEqual(listener.cursor, 4)
@@ -0,0 +1,187 @@
+from io import StringIO
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+
+from . import (create_game,
+               create_league,
+               create_season,
+               normalise_path,
+               TestCase)
+
+
+class PrerenderTestCase(TestCase):
+    """Base for tests of pre-rendered responses for finalised seasons."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        settings = self.settings(API_V1_PRERENDER_ROOT=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.league = create_league()
+        self.season = create_season(league=self.league)
+        self.games = [create_game(league=self.league, season=self.season)
+                      for i in range(0, 3)]
+        self.season_path = ('leagues', self.league.id,
+                            'seasons', self.season.id)
+
+    def finalise(self, **options):
+        call_command('finalise_season', self.season.id,
+                     base_url='http://testserver', stdout=StringIO(),
+                     **options)
+
+    def get(self, *path, **headers):
+        self.response = self.client.get(normalise_path(path), **headers)
+        return self.response
+
+    def content(self):
+        return b''.join(self.response.streaming_content)
+
+    def assertPrerendered(self, *path, **headers):
+        """
+        Assert that a request is answered from a pre-rendered file with
+        long-lived cache headers.
+        """
+        with self.assertNumQueries(0):
+            self.get(*path, **headers)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertEqual(self.response['Content-Type'], 'application/json')
+        self.assertIn('max-age=31536000', self.response['Cache-Control'])
+
+    def assertNotPrerendered(self, *path, **headers):
+        """Assert that a request is answered without a pre-rendered file."""
+        self.get(*path, **headers)
+        self.get(*path, **headers)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertFalse(self.response.streaming)
+
+
+class PrerenderTest(PrerenderTestCase):
+    def test_game_list(self):
+        """Get a finalised season's games from a pre-rendered file."""
+        path = self.season_path + ('games',)
+        content = self.get(*path).content
+        self.finalise()
+        self.assertPrerendered(*path)
+        self.assertEqual(self.content(), content)
+        self.assertEqual(len(json.loads(content.decode())['results']),
+                         len(self.games))
+
+    def test_game_detail(self):
+        """Get a finalised season's game from a pre-rendered file."""
+        path = self.season_path + ('games', self.games[0].id)
+        content = self.get(*path).content
+        self.finalise()
+        self.assertPrerendered(*path)
+        self.assertEqual(self.content(), content)
+
+    def test_ladder(self):
+        """Get a finalised season's ladder from a pre-rendered file."""
+        path = self.season_path + ('ladder',)
+        content = self.get(*path).content
+        self.finalise()
+        self.assertPrerendered(*path)
+        self.assertEqual(self.content(), content)
+
+    def test_other_host(self):
+        """Test that every host is served the same pre-rendered files."""
+        self.finalise()
+        directory = os.path.join(self.root, self.season.id)
+        files = os.listdir(directory)
+        self.assertPrerendered(*self.season_path + ('games',),
+                               HTTP_HOST='example.com')
+        self.assertIn('http://testserver/v1/', self.content().decode())
+        self.assertEqual(os.listdir(directory), files)
+
+    def test_not_rendered(self):
+        """Test that requests never write pre-rendered files themselves."""
+        self.season.finalised = True
+        self.season.save()
+        self.assertNotPrerendered(*self.season_path + ('games',))
+        self.assertFalse(os.path.exists(os.path.join(self.root,
+                                                     self.season.id)))
+
+    def test_not_finalised(self):
+        """Get games in a season which isn't finalised."""
+        self.assertNotPrerendered(*self.season_path + ('games',))
+        self.assertFalse(os.path.exists(os.path.join(self.root,
+                                                     self.season.id)))
+
+    def test_query(self):
+        """Get a filtered list of games in a finalised season."""
+        self.finalise()
+        self.assertNotPrerendered(*self.season_path + ('games?limit=1',))
+
+    def test_other_format(self):
+        """Get games in a finalised season in the browsable API."""
+        self.finalise()
+        self.assertNotPrerendered(*self.season_path + ('games',),
+                                  HTTP_ACCEPT='text/html')
+
+    def test_reopen(self):
+        """Get games in a season which has been finalised and reopened."""
+        self.finalise()
+        self.finalise(reopen=True)
+        self.assertFalse(os.path.exists(os.path.join(self.root,
+                                                     self.season.id)))
+        self.assertNotPrerendered(*self.season_path + ('games',))
+
+    def test_ladder_changed(self):
+        """Test that changing a season's ladder removes its responses."""
+        self.finalise()
+        self.assertTrue(os.path.exists(os.path.join(self.root,
+                                                    self.season.id)))
+        self.season.ladder.first().save()
+        self.assertFalse(os.path.exists(os.path.join(self.root,
+                                                     self.season.id)))
+        self.assertNotPrerendered(*self.season_path + ('games',))
+
+    def test_edit_game(self):
+        """Try to change games in a finalised season."""
+        self.finalise()
+        game_path = normalise_path(self.season_path + ('games',
+                                                       self.games[0].id))
+        response = self.client.delete(game_path)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            normalise_path(self.season_path + ('games', 'batch')),
+            json.dumps([]), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.get(*self.season_path + ('games', self.games[0].id))
+        game = json.loads(self.content().decode())
+        game['team_1_goals'] += 1
+        response = self.client.put(game_path, json.dumps(game),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'],
+                         ['Games can\'t be changed in a finalised season.'])
+
+
+class FinaliseSeasonCommandTest(PrerenderTestCase):
+    def test_finalise(self):
+        """Test finalising a season and pre-rendering its responses."""
+        call_command('finalise_season', self.season.id,
+                     base_url='https://example.com', stdout=StringIO())
+        self.season.refresh_from_db()
+        self.assertTrue(self.season.finalised)
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.root, self.season.id))),
+            len(self.games) + 2)
+        self.assertPrerendered(*self.season_path + ('games',),
+                               HTTP_HOST='example.com', secure=True)
+        self.assertIn('https://example.com/v1/', self.content().decode())
+
+    def test_reopen(self):
+        """Test reopening a season."""
+        call_command('finalise_season', self.season.id,
+                     base_url='https://example.com', stdout=StringIO())
+        call_command('finalise_season', self.season.id, reopen=True,
+                     stdout=StringIO())
+        self.season.refresh_from_db()
+        self.assertFalse(self.season.finalised)
+        self.assertFalse(os.path.exists(os.path.join(self.root,
+                                                     self.season.id)))
@@ -0,0 +1,327 @@
+import json
+
+from django.core.urlresolvers import reverse as url_reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api_v1 import live, urls
+from . import (close_stream,
+               create_game,
+               create_league,
+               create_season,
+               create_team,
+               create_team_alternative_name,
+               create_venue,
+               create_venue_alternative_name,
+               random_datetime)
+
+
+# The maximum number of queries each route may run, regardless of the number
+# of rows it returns.
+QUERY_BUDGETS = {
+    'league_list': 3,
+    'league_detail': 2,
+    'league_game_export': 3,
+    'team_list': 4,
+    'team_detail': 3,
+    'team_alternative_name_list': 3,
+    'team_alternative_name_detail': 2,
+    'team_game_list': 3,
+    'season_list': 3,
+    'season_detail': 2,
+    'game_list': 3,
+    'game_detail': 2,
+    'game_batch': 13,
+    'game_score': 8,
+    'season_game_stream': 2,
+    'game_stream': 2,
+    'season_ladder': 2,
+    'venue_list': 4,
+    'venue_detail': 3,
+    'venue_alternative_name_list': 3,
+    'venue_alternative_name_detail': 2,
+    'change_list': 8,
+}
+
+PAGE_SIZES = (1, 5, 20)
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Base for tests which check the number of queries run by each route.
+
+    Enough data is loaded for every list route to return a full page at the
+    largest page size.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        num_rows = max(PAGE_SIZES)
+        cls.league = create_league()
+        for i in range(0, num_rows):
+            create_league()
+        cls.team = create_team(league=cls.league, num_alternative_names=0)
+        cls.teams = [create_team(league=cls.league)
+                     for i in range(0, num_rows)]
+        cls.team_alternative_names = [
+            create_team_alternative_name(team=cls.team)
+            for i in range(0, num_rows)]
+        cls.season = create_season(league=cls.league)
+        for i in range(0, num_rows):
+            create_season(league=cls.league)
+        cls.venue = create_venue(num_alternative_names=0)
+        cls.venues = [create_venue() for i in range(0, num_rows)]
+        cls.venue_alternative_names = [
+            create_venue_alternative_name(venue=cls.venue)
+            for i in range(0, num_rows)]
+        cls.games = [create_game(league=cls.league,
+                                 season=cls.season,
+                                 venue=cls.venues[i],
+                                 team_1=(cls.team, cls.teams[i])[i % 2],
+                                 team_2=(cls.teams[i], cls.team)[i % 2])
+                     for i in range(0, num_rows)]
+
+    def count_queries(self, route, **kwargs):
+        """
+        Request the given route, asserting that it succeeds and returning the
+        number of queries run and the parsed response.
+        """
+        query = kwargs.pop('query', '')
+        url = url_reverse('api_v1:' + route, kwargs=kwargs) + query
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode(response.charset))
+        return len(context.captured_queries), data
+
+    def team_url(self, team):
+        return url_reverse('api_v1:team_detail',
+                           kwargs={'league_id': team.league_id, 'pk': team.id})
+
+    def venue_url(self, venue):
+        return url_reverse('api_v1:venue_detail', kwargs={'pk': venue.id})
+
+    def assertDetailBudget(self, route, **kwargs):
+        """Assert that a detail route runs within its query budget."""
+        num_queries, data = self.count_queries(route, **kwargs)
+        self.assertEqual(data['id'], kwargs['pk'])
+        self.assertLessEqual(num_queries, QUERY_BUDGETS[route])
+
+    def assertListBudget(self, route, **kwargs):
+        """
+        Assert that a list route runs within its query budget at every page
+        size, and that the number of queries doesn't grow with the page size.
+        """
+        counts = set()
+        for page_size in PAGE_SIZES:
+            query = '?limit={}'.format(page_size)
+            num_queries, data = self.count_queries(route, query=query,
+                                                   **kwargs)
+            self.assertEqual(len(data['results']), page_size)
+            self.assertLessEqual(num_queries, QUERY_BUDGETS[route])
+            counts.add(num_queries)
+        self.assertEqual(len(counts), 1)
+
+
+class QueryBudgetCoverageTest(TestCase):
+    def test_all_routes_have_budgets(self):
+        """Test that every API route has a declared query budget."""
+        route_names = set(pattern.name for pattern in urls.urlpatterns)
+        self.assertEqual(route_names, set(QUERY_BUDGETS))
+
+
+class LeagueQueryBudgetTest(QueryBudgetTestCase):
+    def test_league_list(self):
+        """Test the number of queries run getting a list of leagues."""
+        self.assertListBudget('league_list')
+
+    def test_league_detail(self):
+        """Test the number of queries run getting a league detail."""
+        self.assertDetailBudget('league_detail', pk=self.league.id)
+
+    def test_league_game_export(self):
+        """Test the number of queries run exporting a league's games."""
+        url = url_reverse('api_v1:league_game_export',
+                          kwargs={'league_id': self.league.id,
+                                  'export_format': 'ndjson'})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+            content = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(content.splitlines()), len(self.games))
+        self.assertLessEqual(len(context.captured_queries),
+                             QUERY_BUDGETS['league_game_export'])
+
+
+class TeamQueryBudgetTest(QueryBudgetTestCase):
+    def test_team_list(self):
+        """Test the number of queries run getting a list of teams."""
+        self.assertListBudget('team_list', league_id=self.league.id)
+
+    def test_team_detail(self):
+        """Test the number of queries run getting a team detail."""
+        self.assertDetailBudget('team_detail',
+                                league_id=self.league.id,
+                                pk=self.teams[0].id)
+
+    def test_team_alternative_name_list(self):
+        """Test the number of queries run listing team alternative names."""
+        self.assertListBudget('team_alternative_name_list',
+                              league_id=self.league.id,
+                              team_id=self.team.id)
+
+    def test_team_alternative_name_detail(self):
+        """Test the number of queries run getting team alt. name detail."""
+        self.assertDetailBudget('team_alternative_name_detail',
+                                league_id=self.league.id,
+                                team_id=self.team.id,
+                                pk=self.team_alternative_names[0].id)
+
+
+class SeasonQueryBudgetTest(QueryBudgetTestCase):
+    def test_season_list(self):
+        """Test the number of queries run getting a list of seasons."""
+        self.assertListBudget('season_list', league_id=self.league.id)
+
+    def test_season_detail(self):
+        """Test the number of queries run getting a season detail."""
+        self.assertDetailBudget('season_detail',
+                                league_id=self.league.id,
+                                pk=self.season.id)
+
+
+class GameQueryBudgetTest(QueryBudgetTestCase):
+    def test_game_list(self):
+        """Test the number of queries run getting a list of games."""
+        self.assertListBudget('game_list',
+                              league_id=self.league.id,
+                              season_id=self.season.id)
+
+    def test_game_detail(self):
+        """Test the number of queries run getting a game detail."""
+        self.assertDetailBudget('game_detail',
+                                league_id=self.league.id,
+                                season_id=self.season.id,
+                                pk=self.games[0].id)
+
+    def test_team_game_list(self):
+        """Test the number of queries run getting a list of team games."""
+        self.assertListBudget('team_game_list',
+                              league_id=self.league.id,
+                              team_id=self.team.id)
+
+    def test_game_batch(self):
+        """Test the number of queries run creating a batch of games."""
+        url = url_reverse('api_v1:game_batch',
+                          kwargs={'league_id': self.league.id,
+                                  'season_id': self.season.id})
+        counts = set()
+        for batch_size in PAGE_SIZES:
+            # Scored games update the ladder, too.
+            post_data = [{'start': random_datetime().isoformat(),
+                          'venue': self.venue_url(venue),
+                          'team_1': self.team_url(team_1),
+                          'team_1_goals': 10,
+                          'team_1_behinds': 12,
+                          'team_2': self.team_url(team_2),
+                          'team_2_goals': 9,
+                          'team_2_behinds': 8}
+                         for venue, team_1, team_2
+                         in zip(self.venues[:batch_size],
+                                self.teams,
+                                reversed(self.teams))]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(url,
+                                            json.dumps(post_data),
+                                            content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+            self.assertLessEqual(len(context.captured_queries),
+                                 QUERY_BUDGETS['game_batch'])
+            counts.add(len(context.captured_queries))
+        self.assertEqual(len(counts), 1)
+
+    def test_game_score(self):
+        """Test the number of queries run adding to a game's score."""
+        url = url_reverse('api_v1:game_score',
+                          kwargs={'league_id': self.league.id,
+                                  'season_id': self.season.id,
+                                  'pk': self.games[0].id})
+        counts = set()
+        for goals in (1, 1, -1):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    url, json.dumps({'team': 1, 'goals': goals}),
+                    content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(context.captured_queries),
+                                 QUERY_BUDGETS['game_score'])
+            counts.add(len(context.captured_queries))
+        self.assertEqual(len(counts), 1)
+
+    def assertStreamBudget(self, route, num_games, **kwargs):
+        """
+        Assert that a live stream runs within its query budget sending the
+        current scores of its games.
+        """
+        url = url_reverse('api_v1:' + route, kwargs=kwargs)
+        # Streams start the listener, if it isn't already, which would stop
+        # the test database being dropped.
+        self.addCleanup(live.stop_listener)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            messages = iter(response.streaming_content)
+            events = [next(messages) for i in range(0, num_games + 1)]
+        close_stream(response)
+        self.assertTrue(events[-1].startswith(b'event: game'))
+        self.assertLessEqual(len(context.captured_queries),
+                             QUERY_BUDGETS[route])
+
+    def test_season_game_stream(self):
+        """Test the number of queries run streaming a season's games."""
+        self.assertStreamBudget('season_game_stream', len(self.games),
+                                league_id=self.league.id,
+                                season_id=self.season.id)
+
+    def test_game_stream(self):
+        """Test the number of queries run streaming a game."""
+        self.assertStreamBudget('game_stream', 1,
+                                league_id=self.league.id,
+                                season_id=self.season.id,
+                                pk=self.games[0].id)
+
+    def test_season_ladder(self):
+        """Test the number of queries run getting a season ladder."""
+        num_queries, data = self.count_queries('season_ladder',
+                                               league_id=self.league.id,
+                                               season_id=self.season.id)
+        self.assertEqual(len(data), len(self.teams) + 1)
+        self.assertLessEqual(num_queries, QUERY_BUDGETS['season_ladder'])
+
+
+class VenueQueryBudgetTest(QueryBudgetTestCase):
+    def test_venue_list(self):
+        """Test the number of queries run getting a list of venues."""
+        self.assertListBudget('venue_list')
+
+    def test_venue_detail(self):
+        """Test the number of queries run getting a venue detail."""
+        self.assertDetailBudget('venue_detail', pk=self.venues[0].id)
+
+    def test_venue_alternative_name_list(self):
+        """Test the number of queries run listing venue alternative names."""
+        self.assertListBudget('venue_alternative_name_list',
+                              venue_id=self.venue.id)
+
+    def test_venue_alternative_name_detail(self):
+        """Test the number of queries run getting venue alt. name detail."""
+        self.assertDetailBudget('venue_alternative_name_detail',
+                                venue_id=self.venue.id,
+                                pk=self.venue_alternative_names[0].id)
+
+
+class ChangeQueryBudgetTest(QueryBudgetTestCase):
+    def test_change_list(self):
+        """Test the number of queries run getting a list of changes."""
+        self.assertListBudget('change_list')
@@ -0,0 +1,39 @@
+import json
+
+import msgpack
+
+from . import create_game, create_venue, GetTestCase
+
+
+class MessagePackTest(GetTestCase):
+    def assertMessagePack(self, response):
+        """Assert that a response is MessagePack, returning its data."""
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        return msgpack.unpackb(response.content, raw=False)
+
+    def test_media_type(self):
+        """Get the same list of games as MessagePack as in JSON."""
+        game = create_game()
+        url = '/v1/leagues/{}/seasons/{}/games'.format(
+            game.season.league_id, game.season_id)
+        data = self.assertMessagePack(
+            self.client.get(url, HTTP_ACCEPT='application/msgpack'))
+        self.assertEqual(data, json.loads(
+            self.client.get(url).content.decode()))
+
+    def test_suffix(self):
+        """Get a venue as MessagePack with the .msgpack suffix."""
+        venue = create_venue()
+        data = self.assertMessagePack(
+            self.client.get('/v1/venues/{}.msgpack'.format(venue.id)))
+        self.assertEqual(data['name'], venue.name)
+        self.assertEqual(data['latitude'], str(venue.latitude))
+        self.assertRegex(data['url'], '/venues/{}.msgpack$'.format(venue.id))
+
+    def test_format_parameter(self):
+        """Get a list of leagues as MessagePack with ?format=msgpack."""
+        create_game()
+        data = self.assertMessagePack(
+            self.client.get('/v1/leagues?format=msgpack'))
+        self.assertEqual(data['count'], 1)
@@ -0,0 +1,211 @@
+from unittest import mock
+
+from django.core.urlresolvers import reverse as url_reverse
+from django.test import TestCase
+from rest_framework import mixins
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from models import models
+from api_v1 import cache, representations, serializers, urls, views
+from . import create_game, create_team, create_venue
+
+
+class RepresentationTestCase(TestCase):
+    """
+    Base for tests that fast representations render exactly the same JSON
+    as their serializers.
+    """
+
+    def get_request(self, query=''):
+        return Request(APIRequestFactory().get('/v1/' + query))
+
+    def assertSameJson(self, serializer_class, representation_class,
+                       queryset, query='', format=None):
+        request = self.get_request(query)
+        serializer = serializer_class(
+            queryset, many=True, context={'request': request,
+                                          'format': format})
+        representation = representation_class(request, format=format)
+        data = representation.represent(representation.get_rows(queryset))
+        self.assertEqual(JSONRenderer().render(data),
+                         JSONRenderer().render(serializer.data))
+
+
+class GameRepresentationTest(RepresentationTestCase):
+    def test_games(self):
+        """Test representing games."""
+        games = [create_game() for i in range(0, 3)]
+        games[0].venue = None
+        games[0].save()
+        queryset = models.Game.objects.select_related(
+            'season', 'team_1', 'team_2').order_by('id')
+        self.assertSameJson(serializers.GameSerializer,
+                            representations.GameRepresentation,
+                            queryset)
+
+    def test_format(self):
+        """Test representing games requested in a given format."""
+        create_game()
+        queryset = models.Game.objects.select_related(
+            'season', 'team_1', 'team_2')
+        self.assertSameJson(serializers.GameSerializer,
+                            representations.GameRepresentation,
+                            queryset, format='json')
+        self.assertSameJson(serializers.GameSerializer,
+                            representations.GameRepresentation,
+                            queryset, query='?format=json')
+
+    def test_fields(self):
+        """Test representing only some fields of games."""
+        create_game()
+        queryset = models.Game.objects.select_related(
+            'season', 'team_1', 'team_2')
+        self.assertSameJson(serializers.GameSerializer,
+                            representations.GameRepresentation,
+                            queryset, query='?fields=start,team_1,season')
+        self.assertSameJson(serializers.GameSerializer,
+                            representations.GameRepresentation,
+                            queryset, query='?omit=url,venue,team_1_score')
+
+    def test_expand(self):
+        """Test representing games with their related objects embedded."""
+        games = [create_game() for i in range(0, 3)]
+        games[0].venue = None
+        games[0].save()
+        queryset = models.Game.objects.select_related(
+            'season', 'team_1', 'team_2').order_by('id')
+        self.assertSameJson(serializers.GameSerializer,
+                            representations.GameRepresentation,
+                            queryset,
+                            query='?expand=team_1,team_2,venue,season')
+        self.assertSameJson(serializers.GameSerializer,
+                            representations.GameRepresentation,
+                            queryset,
+                            query='?expand=team_1,venue&omit=venue'
+                                  '&alternative_names=false')
+
+
+class TeamRepresentationTest(RepresentationTestCase):
+    def test_teams(self):
+        """Test representing teams."""
+        for i in range(0, 3):
+            create_team()
+        team = create_team(num_alternative_names=0)
+        team.secondary_colour = team.tertiary_colour = None
+        team.save()
+        queryset = models.Team.objects.prefetch_related(
+            'alternative_names').order_by('id')
+        self.assertSameJson(serializers.TeamSerializer,
+                            representations.TeamRepresentation,
+                            queryset)
+
+    def test_without_alternative_names(self):
+        """Test representing teams without their alternative names."""
+        create_team()
+        self.assertSameJson(serializers.TeamSerializer,
+                            representations.TeamRepresentation,
+                            models.Team.objects.all(),
+                            query='?alternative_names=false')
+
+    def test_fields(self):
+        """Test representing only some fields of teams."""
+        create_team()
+        self.assertSameJson(serializers.TeamSerializer,
+                            representations.TeamRepresentation,
+                            models.Team.objects.all(),
+                            query='?fields=name,alternative_names,games')
+
+    def test_expand(self):
+        """Test representing teams with their leagues embedded."""
+        create_team()
+        create_team()
+        self.assertSameJson(serializers.TeamSerializer,
+                            representations.TeamRepresentation,
+                            models.Team.objects.order_by('id'),
+                            query='?expand=league')
+
+
+class VenueRepresentationTest(RepresentationTestCase):
+    def test_venues(self):
+        """Test representing venues."""
+        for i in range(0, 3):
+            create_venue()
+        venue = create_venue(num_alternative_names=0)
+        venue.timezone = 'Australia/Melbourne'
+        models.Venue.objects.filter(pk=venue.pk).update(
+            timezone=venue.timezone)
+        queryset = models.Venue.objects.prefetch_related(
+            'alternative_names').order_by('id')
+        self.assertSameJson(serializers.VenueSerializer,
+                            representations.VenueRepresentation,
+                            queryset)
+
+    def test_without_alternative_names(self):
+        """Test representing venues without their alternative names."""
+        create_venue()
+        self.assertSameJson(serializers.VenueSerializer,
+                            representations.VenueRepresentation,
+                            models.Venue.objects.all(),
+                            query='?alternative_names=false')
+
+    def test_fields(self):
+        """Test representing only some fields of venues."""
+        create_venue()
+        self.assertSameJson(serializers.VenueSerializer,
+                            representations.VenueRepresentation,
+                            models.Venue.objects.all(),
+                            query='?omit=url,timezone&fields=latitude,url')
+
+
+class RouteRepresentationTest(TestCase):
+    """
+    Test that every route read through a representation responds exactly as
+    it would through its serializer.
+    """
+    queries = ('', '?fields=id,name,start,team_1',
+               '?omit=url&alternative_names=false',
+               '?expand=league,team_1,team_2,venue,season')
+
+    def setUp(self):
+        game = create_game()
+        self.route_kwargs = {
+            'team_list': {'league_id': game.season.league_id},
+            'team_detail': {'league_id': game.season.league_id,
+                            'pk': game.team_1_id},
+            'team_game_list': {'league_id': game.season.league_id,
+                               'team_id': game.team_1_id},
+            'game_list': {'league_id': game.season.league_id,
+                          'season_id': game.season_id},
+            'game_detail': {'league_id': game.season.league_id,
+                            'season_id': game.season_id,
+                            'pk': game.id},
+            'venue_list': {},
+            'venue_detail': {'pk': game.venue_id},
+        }
+
+    def get(self, url):
+        # Responses must not be served from the cache.
+        cache.get_cache().clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_routes(self):
+        """Test every route read through a representation."""
+        routes = {pattern.name for pattern in urls.urlpatterns
+                  if issubclass(getattr(pattern.callback, 'view_class',
+                                        object),
+                                views.RepresentationViewMixin)}
+        self.assertEqual(routes, set(self.route_kwargs))
+        for route, kwargs in self.route_kwargs.items():
+            for query in self.queries:
+                url = url_reverse('api_v1:' + route, kwargs=kwargs) + query
+                represented = self.get(url)
+                with mock.patch.multiple(
+                        views.RepresentationViewMixin,
+                        list=mixins.ListModelMixin.list,
+                        retrieve=mixins.RetrieveModelMixin.retrieve):
+                    serialized = self.get(url)
+                self.assertEqual(represented, serialized, url)
@@ -22,6 +22,7 @@ class SeasonTestCase:
         self.assertEqual(json['name'], season.name)
         self.assertSeasonUrl(json['url'], season)
         self.assertGamesUrl(json['games'], season)
+        self.assertLadderUrl(json['ladder'], season)
         self.assertEqual(json['league'], season.league_id)
 
     def assertSeasons(self, json, seasons):
@@ -48,6 +49,12 @@ class SeasonTestCase:
                                                               season.id)
         self.assertRegex(url, url_regex)
 
+    def assertLadderUrl(self, url, season):
+        """Assert that the given URL relates to the given season's ladder."""
+        url_regex = '/v1/leagues/{}/seasons/{}/ladder$'.format(
+            season.league_id, season.id)
+        self.assertRegex(url, url_regex)
+
 
 class SeasonDetailTest(GetTestCase, SeasonTestCase):
     def test_season_detail(self):
@@ -25,6 +25,9 @@ class TeamTestCase(TestCase):
         self.assertEqual(json['secondary_colour'], team.secondary_colour)
         self.assertEqual(json['tertiary_colour'], team.tertiary_colour)
         self.assertTeamUrl(json['url'], team)
+        self.assertRegex(json['games'],
+                         '/v1/leagues/{}/teams/{}/games$'.format(
+                             team.league_id, team.id))
         self.assertEqual(json['league'], team.league_id)
         self.assertEqual(set(json['alternative_names']),
                          {n.name for n in team.alternative_names.all()})
@@ -94,6 +97,18 @@ class TeamListTest(GetTestCase, TeamTestCase):
                 json = self.assertJson()
                 self.assertTeams(json['results'], (team,))
 
+    def test_list_teams_without_alternative_names(self):
+        """Get a list of teams without their alternative names."""
+        league = create_league()
+        teams = (create_team(league), create_team(league))
+        with self.assertNumQueries(3):
+            self.assertSuccess('leagues', league.id,
+                               'teams?alternative_names=false')
+        json = self.assertJson()
+        self.assertEqual(len(json['results']), len(teams))
+        for json_item in json['results']:
+            self.assertNotIn('alternative_names', json_item)
+
     def test_no_teams_in_league(self):
         """Get a list of teams when none exist in the given league."""
         league = create_league()
@@ -82,6 +82,16 @@ class VenueListTest(GetTestCase, VenueTestCase):
                 json = self.assertJson()
                 self.assertVenues(json['results'], (venue,))
 
+    def test_list_venues_without_alternative_names(self):
+        """Get a list of venues without their alternative names."""
+        venues = (create_venue(), create_venue())
+        with self.assertNumQueries(3):
+            self.assertSuccess('venues?alternative_names=false')
+        json = self.assertJson()
+        self.assertEqual(len(json['results']), len(venues))
+        for json_item in json['results']:
+            self.assertNotIn('alternative_names', json_item)
+
     def test_no_venues(self):
         """Get a list of venues when none exist."""
         self.assertSuccess('venues')
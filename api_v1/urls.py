@@ -8,6 +8,10 @@ urlpatterns = [
     url(r'^leagues$', views.LeagueList.as_view(), name='league_list'),
     url(r'^leagues/(?P<pk>\w+)$', views.LeagueDetail.as_view(),
         name='league_detail'),
+    url(r'^leagues/(?P<league_id>\w+)/games\.'
+        r'(?P<export_format>ndjson|csv|compact)$',
+        views.LeagueGameExport.as_view(),
+        name='league_game_export'),
     url(r'^leagues/(?P<league_id>\w+)/teams$',
         views.TeamList.as_view(),
         name='team_list'),
@@ -22,6 +26,9 @@ urlpatterns = [
         '/alternative_names/(?P<pk>\d+)$',
         views.TeamAlternativeNameDetail.as_view(),
         name='team_alternative_name_detail'),
+    url(r'^leagues/(?P<league_id>\w+)/teams/(?P<team_id>\w+)/games$',
+        views.TeamGameList.as_view(),
+        name='team_game_list'),
     url(r'^leagues/(?P<league_id>\w+)/seasons$',
         views.SeasonList.as_view(),
         name='season_list'),
@@ -31,10 +38,29 @@ urlpatterns = [
     url(r'^leagues/(?P<league_id>\w+)/seasons/(?P<season_id>\w+)/games$',
         views.GameList.as_view(),
         name='game_list'),
+    url(r'^leagues/(?P<league_id>\w+)/seasons/(?P<season_id>\w+)'
+        '/games/batch$',
+        views.GameBatchCreate.as_view(),
+        name='game_batch'),
     url(r'^leagues/(?P<league_id>\w+)/seasons/(?P<season_id>\w+)'
         '/games/(?P<pk>\d+)$',
         views.GameDetail.as_view(),
         name='game_detail'),
+    url(r'^leagues/(?P<league_id>\w+)/seasons/(?P<season_id>\w+)'
+        '/games/(?P<pk>\d+)/score$',
+        views.GameScore.as_view(),
+        name='game_score'),
+    url(r'^leagues/(?P<league_id>\w+)/seasons/(?P<season_id>\w+)'
+        '/games/live$',
+        views.SeasonGameStream.as_view(),
+        name='season_game_stream'),
+    url(r'^leagues/(?P<league_id>\w+)/seasons/(?P<season_id>\w+)'
+        '/games/(?P<pk>\d+)/live$',
+        views.GameStream.as_view(),
+        name='game_stream'),
+    url(r'^leagues/(?P<league_id>\w+)/seasons/(?P<season_id>\w+)/ladder$',
+        views.SeasonLadder.as_view(),
+        name='season_ladder'),
     url(r'^venues$', views.VenueList.as_view(), name='venue_list'),
     url(r'^venues/(?P<pk>\w+)$',
         views.VenueDetail.as_view(),
@@ -45,6 +71,7 @@ urlpatterns = [
     url(r'^venues/(?P<venue_id>\w+)/alternative_names/(?P<pk>\d+)$',
         views.VenueAlternativeNameDetail.as_view(),
         name='venue_alternative_name_detail'),
+    url(r'^changes$', views.ChangeList.as_view(), name='change_list'),
 ]
 
 urlpatterns = format_suffix_patterns(urlpatterns)
@@ -1,19 +1,242 @@
-from django.http import Http404
-from rest_framework import generics
-
-from models import models
-from api_v1 import serializers
+from collections import OrderedDict
+import calendar
+import hashlib
+
+from django.db import IntegrityError
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.views.generic import View
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from models import changes, export, models, scoring, versions
+from api_v1 import (cache, compression, filters, live, pagination,
+                    prerender, renderers, representations, serializers)
+
+
+class ConditionalGetMixin:
+    """
+    Answer conditional GETs using the versions of the resources a view
+    serves (see models.versions).
+
+    The ETag is a hash of those versions and of the requested URL and media
+    type, so checking whether a client's copy is current takes one small
+    query, and a 304 Not Modified response is sent without loading or
+    serializing anything.
+    """
+    version_keys = ()
+    # Version keys of related resources, by the field which can embed them
+    # with ?expand=.
+    expanded_version_keys = {}
+
+    def get_version_keys(self):
+        """Version keys of the resources served, filled in from the URL."""
+        keys = list(self.version_keys)
+        if self.expanded_version_keys:
+            keys.extend(
+                self.expanded_version_keys[name]
+                for name in serializers.get_expanded_field_names(
+                    self.request, self.expanded_version_keys))
+        return [key.format(**self.kwargs) for key in keys]
+
+    def get_version_key_querysets(self):
+        """Querysets of further version keys of the resources served."""
+        return ()
+
+    def get_validators(self, request):
+        """
+        Get the ETag and last modified timestamp of the response.
+
+        HTTP dates are only precise to the second, so the last modified
+        timestamp is the end of the second of the latest change, and is left
+        out until that second is over; otherwise a change later in the same
+        second would look like no change at all.
+        """
+        resource_versions = versions.get_versions(
+            self.get_version_keys(), self.get_version_key_querysets())
+        etag = hashlib.sha1(repr((
+            [(key, version) for key, version, updated_at in resource_versions],
+            request.build_absolute_uri(),
+            getattr(request, 'accepted_media_type', None),
+        )).encode()).hexdigest()
+        last_modified = None
+        if resource_versions:
+            last_modified = calendar.timegm(max(
+                updated_at for key, version, updated_at
+                in resource_versions).utctimetuple()) + 1
+            if last_modified > calendar.timegm(
+                    timezone.now().utctimetuple()):
+                last_modified = None
+        return etag, last_modified
+
+    def get_not_modified_response(self, request):
+        """
+        Get a response if the client's copy is current (or a precondition
+        fails), otherwise None.
+        """
+        self.etag, self.last_modified = self.get_validators(request)
+        response = get_conditional_response(request,
+                                            etag=self.get_response_etag(),
+                                            last_modified=self.last_modified)
+        if response is not None:
+            self.set_validators(response)
+        return response
+
+    def get_response_etag(self):
+        """Get the ETag of the content sent in response."""
+        return self.etag
+
+    def set_validators(self, response):
+        """Add the ETag and Last-Modified headers to a response."""
+        response['ETag'] = quote_etag(self.get_response_etag())
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(request)
+        if response is not None:
+            return response
+        return self.get_modified_response(request, *args, **kwargs)
+
+    def get_modified_response(self, request, *args, **kwargs):
+        """Get the whole response, the client's copy not being current."""
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.set_validators(response)
+        return response
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """
+    Serve GET responses from the API response cache (see api_v1.cache),
+    once the versions of what they show have been checked.
+
+    Cached responses are compressed when they're stored, and sent in the
+    preferred encoding the client accepts (see api_v1.compression).
+    """
+    cacheable = False
+    response_key = None
+    content_encoding = None
+    encoded_content = None
+
+    def get_response_etag(self):
+        return compression.get_etag(self.etag, self.content_encoding)
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if self.encoded_content is not None:
+            response.content = self.encoded_content
+            response['Content-Encoding'] = self.content_encoding
+        if self.response_key is not None:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def get(self, request, *args, **kwargs):
+        self.cacheable = cache.is_cacheable(request)
+        if self.cacheable:
+            self.content_encoding = compression.get_encoding(request)
+        return super().get(request, *args, **kwargs)
+
+    def get_modified_response(self, request, *args, **kwargs):
+        if self.cacheable:
+            self.response_key = cache.get_response_key(self.etag)
+            entry = cache.get_cache().get(self.response_key)
+            if entry is not None:
+                content, content_type, encodings = entry
+                response = HttpResponse(content, content_type=content_type)
+                self.encoded_content = encodings.get(self.content_encoding)
+                return self.set_validators(response)
+        return super().get_modified_response(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args,
+                                             **kwargs)
+        if (self.response_key is not None
+                and isinstance(response, Response)
+                and response.status_code == status.HTTP_200_OK):
+            response.render()
+            encodings = compression.compress(response.content)
+            cache.get_cache().set(self.response_key, (
+                response.content, response['Content-Type'], encodings))
+            # The content is swapped for its encoded form once the response
+            # is otherwise finished with, in dispatch.
+            self.encoded_content = encodings.get(self.content_encoding)
+        return response
+
+
+class PrerenderedSeasonMixin:
+    """
+    Serve responses for finalised seasons from files pre-rendered to disk
+    (see api_v1.prerender).
+    """
+
+    def get(self, request, *args, **kwargs):
+        path = prerender.get_path(request, kwargs['season_id'])
+        if path is not None:
+            try:
+                response = FileResponse(open(path, 'rb'),
+                                        content_type=prerender.MEDIA_TYPE)
+            except FileNotFoundError:
+                pass
+            else:
+                return prerender.patch_response(response)
+        return super().get(request, *args, **kwargs)
+
+
+class RepresentationViewMixin:
+    """
+    Read lists and details through a fast representation (see
+    api_v1.representations) rather than the serializer.
+    """
+    representation_class = None
+
+    def get_representation_class(self):
+        return self.representation_class
+
+    def get_representation(self):
+        return self.get_representation_class()(self.request,
+                                               format=self.format_kwarg)
+
+    def list(self, request, *args, **kwargs):
+        representation = self.get_representation()
+        rows = representation.get_rows(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(representation.represent(page))
+        return Response(representation.represent(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        representation = self.get_representation()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        rows = representation.get_rows(queryset)[:1]
+        data = representation.represent(rows)
+        if not data:
+            raise Http404
+        return Response(data[0])
 
 
-class LeagueList(generics.ListCreateAPIView):
+class LeagueList(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = models.League.objects.all()
     serializer_class = serializers.LeagueSerializer
     filter_fields = ('name',)
+    version_keys = (versions.LEAGUES,)
 
 
-class LeagueDetail(generics.RetrieveUpdateDestroyAPIView):
+class LeagueDetail(ConditionalGetMixin,
+                   generics.RetrieveUpdateDestroyAPIView):
     queryset = models.League.objects.all()
     serializer_class = serializers.LeagueSerializer
+    version_keys = (versions.LEAGUES,)
 
 
 class TeamList(generics.ListCreateAPIView):
@@ -21,20 +244,68 @@ class TeamList(generics.ListCreateAPIView):
     filter_fields = ('name', 'alternative_names__name')
 
 
-class LeagueRelatedViewMixin:
+class AlternativeNamesViewMixin:
+    """Load alternative names in one query for the whole queryset."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if serializers.include_field(self.request, 'alternative_names'):
+            queryset = queryset.prefetch_related('alternative_names')
+        return queryset
+
+
+def get_lookups(lookups, kwargs):
+    """Fill in lookups from the URL keyword arguments naming their values."""
+    return {lookup: kwargs[kwarg] for lookup, kwarg in lookups.items()}
+
+
+class NestedViewMixin:
+    """
+    Base for views nested under parent objects in the URL.
+
+    Querysets are scoped to their parents within the main query, so a
+    missing parent or one from elsewhere simply finds nothing. The parent is
+    only looked up separately when a list comes back empty, to tell an empty
+    list apart from a missing parent.
+    """
+    parent_model = None
+    # Lookups which find the parent object, by the URL keyword argument
+    # giving each one's value.
+    parent_lookups = None
+
+    def get_parent_lookups(self):
+        """Lookups which find the parent object named in the URL."""
+        return get_lookups(self.parent_lookups, self.kwargs)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not (queryset if page is None else page):
+            parents = self.parent_model.objects.filter(
+                **self.get_parent_lookups())
+            if not parents.exists():
+                raise Http404
+        return page
+
+
+class LeagueRelatedViewMixin(NestedViewMixin):
+    parent_model = models.League
+    parent_lookups = {'pk': 'league_id'}
+
     def get_queryset(self):
-        league_id = self.kwargs['league_id']
-        try:
-            league = models.League.objects.get(pk=league_id)
-        except models.League.DoesNotExist:
-            raise Http404
         model = self.get_serializer_class().Meta.model
-        return model.objects.filter(league=league)
+        return model.objects.filter(league_id=self.kwargs['league_id'])
 
 
-class TeamList(LeagueRelatedViewMixin, generics.ListCreateAPIView):
+class TeamList(CachedResponseMixin,
+               RepresentationViewMixin,
+               AlternativeNamesViewMixin,
+               LeagueRelatedViewMixin,
+               generics.ListCreateAPIView):
     serializer_class = serializers.TeamSerializer
+    representation_class = representations.TeamRepresentation
     filter_fields = ('name', 'alternative_names__name')
+    version_keys = (versions.LEAGUE_TEAMS,)
+    expanded_version_keys = {'league': versions.LEAGUES}
 
     def create(self, request, *args, **kwargs):
         request.data['league'] = kwargs['league_id']
@@ -42,8 +313,15 @@ class TeamList(LeagueRelatedViewMixin, generics.ListCreateAPIView):
 
 
 
-class TeamDetail(LeagueRelatedViewMixin, generics.RetrieveUpdateDestroyAPIView):
+class TeamDetail(ConditionalGetMixin,
+                 RepresentationViewMixin,
+                 AlternativeNamesViewMixin,
+                 LeagueRelatedViewMixin,
+                 generics.RetrieveUpdateDestroyAPIView):
     serializer_class = serializers.TeamSerializer
+    representation_class = representations.TeamRepresentation
+    version_keys = (versions.LEAGUE_TEAMS,)
+    expanded_version_keys = {'league': versions.LEAGUES}
 
     def update(self, request, *args, **kwargs):
         request.data['league'] = kwargs['league_id']
@@ -51,19 +329,19 @@ class TeamDetail(LeagueRelatedViewMixin, generics.RetrieveUpdateDestroyAPIView):
 
 
 
-class TeamAlternativeNameView:
+class TeamAlternativeNameView(ConditionalGetMixin, NestedViewMixin):
+    parent_model = models.Team
+    parent_lookups = {'pk': 'team_id', 'league_id': 'league_id'}
+    version_keys = (versions.LEAGUE_TEAMS,)
+
     def get_queryset(self):
-        league_id = self.kwargs['league_id']
-        team_id = self.kwargs['team_id']
-        try:
-            league = models.League.objects.get(pk=league_id)
-        except models.League.DoesNotExist:
-            raise Http404
-        try:
-            team = models.Team.objects.get(pk=team_id, league=league)
-        except models.Team.DoesNotExist:
-            raise Http404
-        return models.TeamAlternativeName.objects.filter(team=team)
+        queryset = models.TeamAlternativeName.objects.filter(
+            team_id=self.kwargs['team_id'],
+            team__league_id=self.kwargs['league_id'])
+        if serializers.include_field(self.request, 'url'):
+            # URLs of alternative names include their team's league.
+            queryset = queryset.select_related('team')
+        return queryset
 
 
 class TeamAlternativeNameList(TeamAlternativeNameView,
@@ -87,9 +365,12 @@ class TeamAlternativeNameDetail(TeamAlternativeNameView,
 
 
 
-class SeasonList(LeagueRelatedViewMixin, generics.ListCreateAPIView):
+class SeasonList(CachedResponseMixin,
+                 LeagueRelatedViewMixin,
+                 generics.ListCreateAPIView):
     serializer_class = serializers.SeasonSerializer
     filter_fields = ('name',)
+    version_keys = (versions.LEAGUE_SEASONS,)
 
     def create(self, request, *args, **kwargs):
         request.data['league'] = kwargs['league_id']
@@ -97,9 +378,11 @@ class SeasonList(LeagueRelatedViewMixin, generics.ListCreateAPIView):
 
 
 
-class SeasonDetail(LeagueRelatedViewMixin,
+class SeasonDetail(ConditionalGetMixin,
+                   LeagueRelatedViewMixin,
                    generics.RetrieveUpdateDestroyAPIView):
     serializer_class = serializers.SeasonSerializer
+    version_keys = (versions.LEAGUE_SEASONS,)
 
     def update(self, request, *args, **kwargs):
         request.data['league'] = kwargs['league_id']
@@ -107,51 +390,298 @@ class SeasonDetail(LeagueRelatedViewMixin,
 
 
 
-class GameView:
+class GameView(ConditionalGetMixin, NestedViewMixin):
+    parent_model = models.Season
+    parent_lookups = {'pk': 'season_id', 'league_id': 'league_id'}
+    version_keys = (versions.SEASON_GAMES, versions.LEAGUE_TEAMS,
+                    versions.LEAGUE_SEASONS)
+    expanded_version_keys = {'venue': versions.VENUES}
+
     def get_queryset(self):
-        league_id = self.kwargs['league_id']
-        season_id = self.kwargs['season_id']
-        try:
-            league = models.League.objects.get(pk=league_id)
-        except models.League.DoesNotExist:
-            raise Http404
-        try:
-            season = models.Season.objects.get(pk=season_id, league=league)
-        except models.Season.DoesNotExist:
-            raise Http404
-        return models.Game.objects.filter(season=season)
+        return models.Game.objects.filter(
+            season_id=self.kwargs['season_id'],
+            season__league_id=self.kwargs['league_id']).select_related(
+                'season', 'team_1', 'team_2')
 
 
-class GameList(GameView, generics.ListCreateAPIView):
+class GameListMixin(RepresentationViewMixin):
+    """Ordering, filtering and pagination shared by lists of games."""
     serializer_class = serializers.GameSerializer
-    ordering = ('start',)
-    filter_fields = ('team_1', 'team_2')
-
+    representation_class = representations.GameRepresentation
+    ordering = ('start', 'id')
+    filter_class = filters.GameFilter
+    renderer_classes = (tuple(api_settings.DEFAULT_RENDERER_CLASSES)
+                        + (renderers.CompactJSONRenderer,))
+
+    def get_representation_class(self):
+        if (self.request.accepted_renderer.format
+                == renderers.CompactJSONRenderer.format):
+            return representations.CompactGameRepresentation
+        return super().get_representation_class()
+
+    @property
+    def paginator(self):
+        """
+        Use cursor pagination if requested with ?pagination=cursor, otherwise
+        fall back to the default pagination.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = pagination.GameCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+
+class GameList(PrerenderedSeasonMixin,
+               CachedResponseMixin,
+               GameListMixin,
+               GameView,
+               generics.ListCreateAPIView):
     def create(self, request, *args, **kwargs):
         request.data['season'] = kwargs['season_id']
         return super().create(request, *args, **kwargs)
 
 
 
-class GameDetail(GameView, generics.RetrieveUpdateDestroyAPIView):
+class GameBatchCreate(generics.GenericAPIView):
+    """Create a list of games in a season in one request."""
     serializer_class = serializers.GameSerializer
 
+    def post(self, request, *args, **kwargs):
+        try:
+            season = models.Season.objects.get(
+                pk=kwargs['season_id'], league_id=kwargs['league_id'])
+        except models.Season.DoesNotExist:
+            raise Http404
+        batch = serializers.GameBatchSerializer(season, request.data)
+        if not batch.is_valid():
+            return Response(batch.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            games = batch.save()
+        except IntegrityError:
+            # Another request created one of the games since they were
+            # checked for duplicates.
+            return Response({'non_field_errors': [batch.duplicate]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(games, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class GameDetail(PrerenderedSeasonMixin,
+                 RepresentationViewMixin,
+                 GameView,
+                 generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = serializers.GameSerializer
+    representation_class = representations.GameRepresentation
+
     def update(self, request, *args, **kwargs):
         request.data['league'] = kwargs['league_id']
         request.data['season'] = kwargs['season_id']
         return super().update(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        if instance.season.finalised:
+            raise ValidationError(serializers.FINALISED_SEASON)
+        super().perform_destroy(instance)
+
+
+
+class GameScore(generics.GenericAPIView):
+    """
+    Add goals or behinds to one team's score in a game, returning the game's
+    new totals. The change is applied as an increment in one UPDATE, without
+    loading or validating the rest of the game, so scorers don't overwrite
+    each other's changes (see models.scoring).
+    """
+    serializer_class = serializers.ScoreSerializer
+    negative_score = 'Scores can\'t be negative.'
+
+    def get_queryset(self):
+        return models.Game.objects.filter(
+            pk=self.kwargs['pk'],
+            season_id=self.kwargs['season_id'],
+            season__league_id=self.kwargs['league_id'])
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        games = self.get_queryset()
+        values = scoring.add_score(games, **serializer.validated_data)
+        if values is None:
+            finalised = games.values_list('season__finalised',
+                                          flat=True).first()
+            if finalised is None:
+                raise Http404
+            raise ValidationError(serializers.FINALISED_SEASON if finalised
+                                  else self.negative_score)
+        data = OrderedDict([('id', values['id'])])
+        for team in scoring.TEAMS:
+            goals = values['team_{}_goals'.format(team)]
+            behinds = values['team_{}_behinds'.format(team)]
+            data['team_{}_goals'.format(team)] = goals
+            data['team_{}_behinds'.format(team)] = behinds
+            data['team_{}_score'.format(team)] = goals * 6 + behinds
+        return Response(data)
+
+
+class SeasonLadder(PrerenderedSeasonMixin,
+                   CachedResponseMixin,
+                   NestedViewMixin,
+                   generics.ListAPIView):
+    """A season's ladder, in order of premiership points then percentage."""
+    serializer_class = serializers.LadderEntrySerializer
+    pagination_class = None
+    parent_model = models.Season
+    parent_lookups = {'pk': 'season_id', 'league_id': 'league_id'}
+    version_keys = (versions.SEASON_GAMES, versions.LEAGUE_TEAMS,
+                    versions.LEAGUE_SEASONS)
+
+    def get_queryset(self):
+        return models.LadderEntry.objects.filter(
+            season_id=self.kwargs['season_id'],
+            season__league_id=self.kwargs['league_id']).select_related('team')
+
+    def filter_queryset(self, queryset):
+        def position(entry):
+            percentage = entry.percentage
+            if percentage is None:
+                percentage = float('inf')
+            return (-entry.premiership_points, -percentage, entry.team.name)
+        return sorted(queryset, key=position)
+
+
+class LeagueGameVersionMixin:
+    """
+    Check the versions of the games in each of a league's seasons, which
+    scores added to games in progress bump instead of the league's.
+    """
+
+    def get_version_key_querysets(self):
+        return [versions.get_league_season_games_keys(
+            self.kwargs['league_id'])]
+
+
+class TeamGameList(LeagueGameVersionMixin,
+                   ConditionalGetMixin,
+                   GameListMixin,
+                   NestedViewMixin,
+                   generics.ListAPIView):
+    """Games across all seasons where a team is on either side."""
+    parent_model = models.Team
+    parent_lookups = {'pk': 'team_id', 'league_id': 'league_id'}
+    version_keys = (versions.LEAGUE_GAMES, versions.LEAGUE_TEAMS,
+                    versions.LEAGUE_SEASONS)
+    expanded_version_keys = {'venue': versions.VENUES}
+
+    def get_queryset(self):
+        return models.Game.objects.involving_team(
+            self.kwargs['team_id']).filter(
+                season__league_id=self.kwargs['league_id']).select_related(
+                    'season', 'team_1', 'team_2')
 
 
-class VenueList(generics.ListCreateAPIView):
+class LeagueGameExport(LeagueGameVersionMixin, ConditionalGetMixin, View):
+    """Stream every game in a league as NDJSON, CSV or compact columns."""
+    version_keys = (versions.LEAGUE_GAMES, versions.LEAGUE_SEASONS)
+
+    def get(self, request, league_id, export_format, **kwargs):
+        response = self.get_not_modified_response(request)
+        if response is not None:
+            return response
+        if not models.League.objects.filter(pk=league_id).exists():
+            raise Http404
+        iter_lines, content_type = export.FORMATS[export_format]
+        response = StreamingHttpResponse(
+            iter_lines(export.iter_game_values(league_id)),
+            content_type=content_type)
+        response['Content-Disposition'] = \
+            'attachment; filename="{}.{}"'.format(league_id, export_format)
+        return self.set_validators(response)
+
+
+class LiveStreamView(View):
+    """
+    Base for streams of live updates to games as server-sent events (see
+    api_v1.live), starting with their current scores.
+
+    With no games, a stream is only found if it has a parent model and the
+    parent object exists.
+    """
+    # Lookups which find the games streamed, and the parent object, by the
+    # URL keyword argument giving each one's value.
+    game_lookups = None
+    parent_model = None
+    parent_lookups = None
+    # The channel of the stream (see api_v1.live), and the URL keyword
+    # argument filling in each of its fields.
+    channel = None
+    channel_kwargs = None
+
+    def get_games(self):
+        """Get the games streamed, or raise Http404 if there are none."""
+        games = models.Game.objects.filter(
+            **get_lookups(self.game_lookups, self.kwargs)).order_by(
+                'start', 'id')
+        if not games.exists() and (
+                self.parent_model is None
+                or not self.parent_model.objects.filter(**get_lookups(
+                    self.parent_lookups, self.kwargs)).exists()):
+            raise Http404
+        return games
+
+    def get_channel(self):
+        return self.channel.format(**get_lookups(self.channel_kwargs,
+                                                 self.kwargs))
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            live.stream(self.get_channel(), self.get_games()),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop proxies such as nginx holding back events.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class SeasonGameStream(LiveStreamView):
+    """Live updates to every game in a season."""
+    game_lookups = {'season_id': 'season_id',
+                    'season__league_id': 'league_id'}
+    parent_model = models.Season
+    parent_lookups = {'pk': 'season_id', 'league_id': 'league_id'}
+    channel = live.SEASON_CHANNEL
+    channel_kwargs = {'season_id': 'season_id'}
+
+
+class GameStream(LiveStreamView):
+    """Live updates to a game."""
+    game_lookups = {'pk': 'pk',
+                    'season_id': 'season_id',
+                    'season__league_id': 'league_id'}
+    channel = live.GAME_CHANNEL
+    channel_kwargs = {'game_id': 'pk'}
+
+
+class VenueList(CachedResponseMixin,
+                RepresentationViewMixin,
+                AlternativeNamesViewMixin,
+                generics.ListCreateAPIView):
     queryset = models.Venue.objects.all()
     serializer_class = serializers.VenueSerializer
+    representation_class = representations.VenueRepresentation
     filter_fields = ('name', 'alternative_names__name',)
+    version_keys = (versions.VENUES,)
 
 
-class VenueDetail(generics.RetrieveUpdateDestroyAPIView):
+class VenueDetail(ConditionalGetMixin,
+                  RepresentationViewMixin,
+                  AlternativeNamesViewMixin,
+                  generics.RetrieveUpdateDestroyAPIView):
     queryset = models.Venue.objects.all()
     serializer_class = serializers.VenueSerializer
+    representation_class = representations.VenueRepresentation
+    version_keys = (versions.VENUES,)
 
 
 class VenueAlternativeNameList(generics.ListCreateAPIView):
@@ -159,14 +689,14 @@ class VenueAlternativeNameList(generics.ListCreateAPIView):
     filter_fields = ('name',)
 
 
-class VenueAlternativeNameView:
+class VenueAlternativeNameView(ConditionalGetMixin, NestedViewMixin):
+    parent_model = models.Venue
+    parent_lookups = {'pk': 'venue_id'}
+    version_keys = (versions.VENUES,)
+
     def get_queryset(self):
-        venue_id = self.kwargs['venue_id']
-        try:
-            venue = models.Venue.objects.get(pk=venue_id)
-        except models.Venue.DoesNotExist:
-            raise Http404
-        return models.VenueAlternativeName.objects.filter(venue=venue)
+        return models.VenueAlternativeName.objects.filter(
+            venue_id=self.kwargs['venue_id'])
 
 
 class VenueAlternativeNameList(VenueAlternativeNameView,
@@ -187,3 +717,43 @@ class VenueAlternativeNameDetail(VenueAlternativeNameView,
     def update(self, request, *args, **kwargs):
         request.data['venue'] = kwargs['venue_id']
         return super().update(request, *args, **kwargs)
+
+
+class ChangeList(generics.GenericAPIView):
+    """
+    Changes to leagues, teams, seasons, venues, games and alternative names
+    after the cursor given with ?since=, oldest first (see models.changes).
+    The response's cursor is the one to read on from next time.
+    """
+    # Changes aren't a queryset, and are paged by cursor rather than by the
+    # usual pagination or filters.
+    filter_backends = ()
+    pagination_class = None
+    max_limit = 1000
+
+    def get_int_param(self, name, default, max_value=None):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: ['A whole number is required.']})
+        if value < 0:
+            raise ValidationError({name: ['Must not be negative.']})
+        if max_value is not None:
+            value = min(value, max_value)
+        return value
+
+    def get(self, request, *args, **kwargs):
+        since = self.get_int_param('since', 0)
+        limit = self.get_int_param('limit', api_settings.PAGE_SIZE,
+                                   self.max_limit)
+        rows = changes.get_changes(since, limit=limit)
+        cursor = rows[-1]['id'] if rows else since
+        representation = representations.ChangeRepresentation(
+            request, format=self.format_kwarg)
+        return Response(OrderedDict((
+            ('cursor', cursor),
+            ('next', replace_query_param(request.build_absolute_uri(),
+                                         'since', cursor)),
+            ('results', representation.represent(rows)),
+        )))
@@ -0,0 +1 @@
+default_app_config = 'models.apps.ModelsConfig'
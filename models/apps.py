@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ModelsConfig(AppConfig):
+    name = 'models'
+
+    def ready(self):
+        from . import signals  # noqa: F401 (connects signal receivers)
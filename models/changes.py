@@ -0,0 +1,122 @@
+"""
+Log of changes to leagues, teams, seasons, venues, games and alternative
+names.
+
+A change is recorded whenever one of these is created, updated or deleted,
+so that clients keeping copies of them can pick up just what has changed
+since they last looked: the ID of each change is a cursor to read on from.
+Saves and deletes are recorded by signal receivers (see models.signals);
+anything which writes in bulk, bypassing signals, records its changes
+itself.
+
+Change IDs are handed out in order, but transactions can commit out of
+order, so changes are only read up to the lowest ID which may still be
+committed. On Postgres, each transaction recording changes holds an advisory
+lock keyed on the next change ID from before it recorded any (see migration
+0020), so the lowest of these locks, and the sequence of IDs as it was
+before they were looked up, bound the IDs still in flight. IDs left behind
+by transactions rolled back are skipped as soon as the locks go. Other
+databases are taken to commit changes in the order of their IDs, as SQLite
+does by serialising writes.
+"""
+from django.db import connection
+from django.db.models import Max
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import (Change, Game, League, Season, Team, TeamAlternativeName,
+                     Venue, VenueAlternativeName)
+
+CREATED = Change.CREATED
+UPDATED = Change.UPDATED
+DELETED = Change.DELETED
+
+# Key of the advisory locks taken on change IDs (see migration 0020).
+LOCK_KEY = 1701
+
+# The highest change ID which can no longer be committed, on Postgres. The
+# lookup of locks refers to the sequence, so runs after it's read: IDs handed
+# out since then are only to transactions which hadn't yet taken their lock.
+# Transactions which had either hold it still, or have ended before the
+# changes are read. The reader's own changes are visible to it, so aren't
+# waited on.
+FINAL_ID_SQL = """
+SELECT LEAST(
+    ids.last_value - CASE WHEN ids.is_called THEN 0 ELSE 1 END,
+    (SELECT min(objid::bigint) - 1 FROM pg_locks
+     WHERE locktype = 'advisory' AND classid = %s AND objsubid = 2
+         AND pid <> pg_backend_pid() AND ids.is_called IS NOT NULL))
+FROM models_change_id_seq AS ids
+"""
+
+# Types of object recorded, by model.
+OBJECT_TYPES = {
+    League: 'league',
+    Team: 'team',
+    TeamAlternativeName: 'team_alternative_name',
+    Season: 'season',
+    Venue: 'venue',
+    VenueAlternativeName: 'venue_alternative_name',
+    Game: 'game',
+}
+
+# Sent by the model of objects whose changes have been recorded, with their
+# IDs, what happened to them and any details the recorder had to hand (such
+# as the seasons of games, before and after).
+recorded = Signal(providing_args=['object_ids', 'action'])
+
+# Models, by type of object.
+MODELS = {object_type: model for model, object_type in OBJECT_TYPES.items()}
+
+
+def record(model, object_ids, action, **details):
+    """
+    Record that the given objects of a model have been changed, sending any
+    details on with the recorded signal.
+    """
+    object_ids = list(object_ids)
+    if not object_ids:
+        return
+    now = timezone.now()
+    Change.objects.bulk_create(
+        Change(object_type=OBJECT_TYPES[model],
+               object_id=str(object_id),
+               action=action,
+               changed_at=now)
+        for object_id in object_ids)
+    recorded.send(sender=model, object_ids=object_ids, action=action,
+                  **details)
+
+
+def get_final_id():
+    """
+    Get the highest change ID which can no longer be committed, or None if
+    changes are committed in the order of their IDs.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(FINAL_ID_SQL, [LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+def get_committed():
+    """Get the changes which can be read without missing any before them."""
+    final_id = get_final_id()
+    if final_id is None:
+        return Change.objects.all()
+    return Change.objects.filter(pk__lte=final_id)
+
+
+def get_latest_cursor():
+    """Get the cursor after the latest change which can be read."""
+    return get_committed().aggregate(cursor=Max('id'))['cursor'] or 0
+
+
+def get_changes(since=0, limit=100):
+    """
+    Get the values of up to limit changes after the given cursor, oldest
+    first, stopping before any which could still be committed.
+    """
+    return list(get_committed().filter(pk__gt=since).order_by('pk').values(
+        'id', 'object_type', 'object_id', 'action', 'changed_at')[:limit])
@@ -0,0 +1,145 @@
+"""
+Streaming export of games.
+
+Games are read in chunks of CHUNK_SIZE, each chunk picking up after the last
+game ID of the one before, and written out row by row as they are read. Only
+one chunk of rows is held in memory at a time. The compact format writes
+each chunk as a block of columns rather than row by row.
+"""
+from collections import OrderedDict
+from itertools import islice
+import calendar
+import csv
+import json
+
+from .models import Game
+
+CHUNK_SIZE = 2000
+
+FIELDS = ('id', 'season', 'start', 'venue', 'team_1', 'team_1_goals',
+          'team_1_behinds', 'team_1_score', 'team_2', 'team_2_goals',
+          'team_2_behinds', 'team_2_score')
+
+VALUE_FIELDS = ('id', 'season_id', 'start', 'venue_id', 'team_1_id',
+                'team_1_goals', 'team_1_behinds', 'team_2_id', 'team_2_goals',
+                'team_2_behinds')
+
+# Columns of the compact format, in the same order as VALUE_FIELDS.
+COMPACT_FIELDS = ('id', 'season', 'start', 'venue', 'team_1', 'team_1_goals',
+                  'team_1_behinds', 'team_2', 'team_2_goals', 'team_2_behinds')
+
+# Lookup tables of the compact format, by the columns which refer to them.
+COMPACT_TABLES = OrderedDict((
+    ('season', 'seasons'),
+    ('venue', 'venues'),
+    ('team_1', 'teams'),
+    ('team_2', 'teams'),
+))
+
+
+def iter_game_values(league_id, chunk_size=CHUNK_SIZE):
+    """
+    Generate tuples of VALUE_FIELDS for every game in the given league, in
+    ID order.
+    """
+    games = Game.objects.filter(season__league_id=league_id).order_by('id')
+    games = games.values_list(*VALUE_FIELDS)
+    last_id = None
+    while True:
+        chunk = games if last_id is None else games.filter(id__gt=last_id)
+        chunk = list(chunk[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+def get_row(values):
+    """Get the export row of a game's tuple of VALUE_FIELDS."""
+    (game_id, season_id, start, venue_id,
+     team_1_id, team_1_goals, team_1_behinds,
+     team_2_id, team_2_goals, team_2_behinds) = values
+    return {'id': game_id,
+            'season': season_id,
+            'start': start.isoformat(),
+            'venue': venue_id,
+            'team_1': team_1_id,
+            'team_1_goals': team_1_goals,
+            'team_1_behinds': team_1_behinds,
+            'team_1_score': team_1_goals * 6 + team_1_behinds,
+            'team_2': team_2_id,
+            'team_2_goals': team_2_goals,
+            'team_2_behinds': team_2_behinds,
+            'team_2_score': team_2_goals * 6 + team_2_behinds}
+
+
+def iter_games(league_id, chunk_size=CHUNK_SIZE):
+    """Generate export rows for every game in the given league."""
+    return map(get_row, iter_game_values(league_id, chunk_size=chunk_size))
+
+
+def get_compact(games):
+    """
+    Arrange a list of games' tuples of VALUE_FIELDS as columns, one list of
+    values per field. Start times are given in seconds since the epoch.
+    Seasons, venues and teams are given by their position in the lookup
+    tables of their IDs which follow the columns.
+    """
+    columns = OrderedDict((field, []) for field in COMPACT_FIELDS)
+    tables = OrderedDict((table, OrderedDict())
+                         for table in COMPACT_TABLES.values())
+    for field, values in zip(COMPACT_FIELDS, zip(*games)):
+        if field == 'start':
+            values = [calendar.timegm(start.utctimetuple())
+                      for start in values]
+        elif field in COMPACT_TABLES:
+            table = tables[COMPACT_TABLES[field]]
+            values = [None if value is None
+                      else table.setdefault(value, len(table))
+                      for value in values]
+        columns[field] = list(values)
+    compact = OrderedDict((('columns', columns),))
+    for table, ids in tables.items():
+        compact[table] = list(ids)
+    return compact
+
+
+def iter_ndjson(games):
+    """Generate newline delimited JSON lines for the given games."""
+    for values in games:
+        yield json.dumps(get_row(values)) + '\n'
+
+
+def iter_compact(games, chunk_size=CHUNK_SIZE):
+    """
+    Generate newline delimited JSON lines for the given games, each a block
+    of up to chunk_size games arranged as columns (see get_compact).
+    """
+    games = iter(games)
+    while True:
+        chunk = list(islice(games, chunk_size))
+        if not chunk:
+            return
+        yield json.dumps(get_compact(chunk), separators=(',', ':')) + '\n'
+
+
+class _Line:
+    """A file-like object whose write() returns what was written."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(games):
+    """Generate CSV lines, starting with a header, for the given games."""
+    writer = csv.DictWriter(_Line(), fieldnames=FIELDS)
+    yield writer.writerow(dict(zip(FIELDS, FIELDS)))
+    for values in games:
+        yield writer.writerow(get_row(values))
+
+
+FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+    'csv': (iter_csv, 'text/csv'),
+    'compact': (iter_compact, 'application/x-ndjson'),
+}
@@ -0,0 +1,246 @@
+"""
+Streaming import of leagues, seasons, teams, venues and games.
+
+Records are read one at a time from newline delimited JSON or CSV. Each
+record has a "type" of league, season, team, venue or game; records without
+one are games. Games refer to their teams and venue by ID, name or
+alternative name, and are upserted on (start, season, team_1, team_2) in
+batches, each in its own transaction. After each batch the number of records
+imported so far is written to a checkpoint file, so an interrupted import can
+pick up where it left off.
+"""
+import csv
+import json
+import os
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+import dateutil.parser
+
+from . import changes, ladder, versions
+from .models import (Game, League, Season, Team, TeamAlternativeName, Venue,
+                     VenueAlternativeName, check_seasons_open)
+
+BATCH_SIZE = 1000
+
+GAME_SCORE_FIELDS = ('team_1_goals', 'team_1_behinds', 'team_2_goals',
+                     'team_2_behinds')
+
+
+class RecordError(Exception):
+    """Raised when a record can't be imported."""
+
+
+def read_records(path, file_format):
+    """Generate records from the given NDJSON or CSV file."""
+    with open(path, newline='') as records_file:
+        if file_format == 'csv':
+            for record in csv.DictReader(records_file):
+                yield {key: value for key, value in record.items()
+                       if value != ''}
+        else:
+            for line in records_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_checkpoint(path):
+    """Get the number of records imported by a previous run."""
+    try:
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)['records']
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path, num_records):
+    """Record the number of records imported so far."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as checkpoint_file:
+        json.dump({'records': num_records}, checkpoint_file)
+    os.replace(temp_path, path)
+
+
+class Importer:
+    """Imports a stream of records, upserting games in batches."""
+
+    def __init__(self, batch_size=BATCH_SIZE, checkpoint_path=None):
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.num_records = 0
+        self.num_created = 0
+        self.num_updated = 0
+        self._games = {}
+        self._team_ids = {}
+        self._venue_ids = None
+
+    def run(self, records, skip=0):
+        """Import the given records, skipping the first few."""
+        self.num_records = skip
+        for number, record in enumerate(records, start=1):
+            if number <= skip:
+                continue
+            try:
+                self.import_record(record)
+            except (KeyError, ValueError, RecordError) as e:
+                raise RecordError(
+                    'Record {}: {}: {}'.format(number, type(e).__name__, e))
+            self.num_records = number
+            if len(self._games) >= self.batch_size:
+                self.flush()
+        self.flush()
+
+    def import_record(self, record):
+        """Import one record of any type."""
+        record_type = record.get('type', 'game')
+        importer = getattr(self, 'import_' + record_type, None)
+        if importer is None:
+            raise RecordError('Unknown record type {}'.format(record_type))
+        importer(record)
+
+    def import_league(self, record):
+        League.objects.update_or_create(id=record['id'],
+                                        defaults={'name': record['name']})
+
+    def import_season(self, record):
+        Season.objects.update_or_create(
+            id=record['id'],
+            defaults={'league_id': record['league'], 'name': record['name']})
+
+    def import_team(self, record):
+        defaults = {'league_id': record['league'], 'name': record['name']}
+        for field in ('primary_colour', 'secondary_colour',
+                      'tertiary_colour'):
+            if field in record:
+                defaults[field] = record[field]
+        team, created = Team.objects.update_or_create(id=record['id'],
+                                                      defaults=defaults)
+        for name in record.get('alternative_names', ()):
+            TeamAlternativeName.objects.get_or_create(team=team, name=name)
+        self._team_ids.pop(team.league_id, None)
+
+    def import_venue(self, record):
+        venue, created = Venue.objects.update_or_create(
+            id=record['id'],
+            defaults={'name': record['name'],
+                      'latitude': record['latitude'],
+                      'longitude': record['longitude']})
+        for name in record.get('alternative_names', ()):
+            VenueAlternativeName.objects.get_or_create(venue=venue, name=name)
+        self._venue_ids = None
+
+    def import_game(self, record):
+        start = dateutil.parser.parse(record['start'])
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start, timezone.utc)
+        game = {'start': start,
+                'season_id': record['season'],
+                'team_1_id': self.get_team_id(record['league'],
+                                              record['team_1']),
+                'team_2_id': self.get_team_id(record['league'],
+                                              record['team_2']),
+                'venue_id': None}
+        if record.get('venue'):
+            game['venue_id'] = self.get_venue_id(record['venue'])
+        for field in GAME_SCORE_FIELDS:
+            game[field] = int(record.get(field, 0))
+        key = (game['season_id'], start, game['team_1_id'],
+               game['team_2_id'])
+        self._games[key] = game
+
+    def get_team_id(self, league_id, reference):
+        """Get the ID of a team in a league by its ID or any of its names."""
+        if league_id not in self._team_ids:
+            team_ids = {}
+            for team_id, name in TeamAlternativeName.objects.filter(
+                    team__league_id=league_id).values_list('team_id', 'name'):
+                team_ids[name] = team_id
+            for team_id, name in Team.objects.filter(
+                    league_id=league_id).values_list('id', 'name'):
+                team_ids[name] = team_id
+                team_ids[team_id] = team_id
+            self._team_ids[league_id] = team_ids
+        try:
+            return self._team_ids[league_id][reference]
+        except KeyError:
+            raise RecordError('No team {} in league {}'.format(reference,
+                                                               league_id))
+
+    def get_venue_id(self, reference):
+        """Get the ID of a venue by its ID or any of its names."""
+        if self._venue_ids is None:
+            self._venue_ids = {}
+            for venue_id, name in VenueAlternativeName.objects.values_list(
+                    'venue_id', 'name'):
+                self._venue_ids[name] = venue_id
+            for venue_id, name in Venue.objects.values_list('id', 'name'):
+                self._venue_ids[name] = venue_id
+                self._venue_ids[venue_id] = venue_id
+        try:
+            return self._venue_ids[reference]
+        except KeyError:
+            raise RecordError('No venue {}'.format(reference))
+
+    def flush(self):
+        """Upsert the pending batch of games and record a checkpoint."""
+        games = self._games
+        self._games = {}
+        if games:
+            with transaction.atomic():
+                self.upsert_games(games)
+        if self.checkpoint_path:
+            write_checkpoint(self.checkpoint_path, self.num_records)
+
+    def upsert_games(self, games):
+        """
+        Create or update the given games, keyed on (season ID, start,
+        team_1 ID, team_2 ID), then rebuild the affected ladders. Games
+        which haven't changed are left alone, even in finalised seasons, but
+        changing any game in a finalised season fails the whole batch.
+        """
+        starts = {}
+        for season_id, start, team_1_id, team_2_id in games:
+            starts.setdefault(season_id, set()).add(start)
+        query = Q()
+        for season_id, season_starts in starts.items():
+            query |= Q(season_id=season_id, start__in=season_starts)
+        fields = ('venue_id',) + GAME_SCORE_FIELDS
+        existing = {}
+        for values in Game.objects.filter(query).values(
+                'id', 'season_id', 'start', 'team_1_id', 'team_2_id',
+                *fields):
+            key = (values['season_id'], values['start'],
+                   values['team_1_id'], values['team_2_id'])
+            existing[key] = values
+        new_games = []
+        updates = {}
+        changed_season_ids = set()
+        for key, game in games.items():
+            if key not in existing:
+                new_games.append(Game(**game))
+                changed_season_ids.add(game['season_id'])
+                continue
+            changed = {field: game[field] for field in fields
+                       if game[field] != existing[key][field]}
+            if changed:
+                updates[existing[key]['id']] = changed
+                changed_season_ids.add(game['season_id'])
+        check_seasons_open(changed_season_ids)
+        for game_id, changed in updates.items():
+            Game.objects.filter(pk=game_id).update(**changed)
+        updated_ids = list(updates)
+        self.num_updated += len(updated_ids)
+        Game.objects.bulk_create(new_games)
+        self.num_created += len(new_games)
+        if new_games:
+            created_ids = [
+                values[0] for values in Game.objects.filter(query).values_list(
+                    'id', 'season_id', 'start', 'team_1_id', 'team_2_id')
+                if values[1:] not in existing]
+            changes.record(Game, created_ids, changes.CREATED)
+        changes.record(Game, updated_ids, changes.UPDATED)
+        for season_id in changed_season_ids:
+            ladder.rebuild(season_id)
+        if changed_season_ids:
+            versions.bump_games(changed_season_ids)
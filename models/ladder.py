@@ -0,0 +1,184 @@
+"""
+Incremental maintenance of season ladders.
+
+Each game contributes to the ladder entries of both of its teams. When a game
+is saved its previous contribution is taken away and its new contribution
+added, so a ladder never has to be recalculated from every game in its
+season. Games without any score haven't been played yet, and don't count.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, When
+
+from .models import Game, LadderEntry, check_seasons_open
+
+GAME_FIELDS = ('season_id', 'team_1_id', 'team_1_goals', 'team_1_behinds',
+               'team_2_id', 'team_2_goals', 'team_2_behinds')
+
+
+def get_game_values(game):
+    """Get the values of a game which contribute to the ladder."""
+    return {field: getattr(game, field) for field in GAME_FIELDS}
+
+
+def get_saved_game_values(game):
+    """
+    Get the values of a game as currently saved in the database, locking its
+    row until the end of the transaction so that they can't change before
+    the game is saved or deleted.
+    """
+    if game._state.adding or game.pk is None:
+        return None
+    return Game.objects.select_for_update().filter(pk=game.pk).values(
+        *GAME_FIELDS).first()
+
+
+def get_contributions(values):
+    """
+    Get the changes a game makes to ladder entries, as a list of
+    (season ID, team ID, changes) tuples.
+    """
+    if values is None:
+        return []
+    score_1 = values['team_1_goals'] * 6 + values['team_1_behinds']
+    score_2 = values['team_2_goals'] * 6 + values['team_2_behinds']
+    if not (values['team_1_goals'] or values['team_1_behinds']
+            or values['team_2_goals'] or values['team_2_behinds']):
+        return []
+    contributions = []
+    for team_id, score_for, score_against in (
+            (values['team_1_id'], score_1, score_2),
+            (values['team_2_id'], score_2, score_1)):
+        contributions.append((values['season_id'], team_id, {
+            'played': 1,
+            'wins': int(score_for > score_against),
+            'losses': int(score_for < score_against),
+            'draws': int(score_for == score_against),
+            'points_for': score_for,
+            'points_against': score_against}))
+    return contributions
+
+
+def get_entry_ids(contributions):
+    """Get the IDs of existing ladder entries, by season and team IDs."""
+    season_ids = {season_id for season_id, team_id, changes in contributions}
+    team_ids = {team_id for season_id, team_id, changes in contributions}
+    return {(season_id, team_id): pk for pk, season_id, team_id
+            in LadderEntry.objects.filter(
+                season_id__in=season_ids, team_id__in=team_ids).values_list(
+                    'pk', 'season_id', 'team_id')}
+
+
+def get_new_entries(contributions, entry_ids):
+    """
+    Make the ladder entries missing from entry_ids with the given
+    contributions, leaving out any which would have no games played.
+    """
+    return [LadderEntry(season_id=season_id, team_id=team_id, **changes)
+            for season_id, team_id, changes in contributions
+            if (season_id, team_id) not in entry_ids
+            and changes.get('played', 0) >= 0]
+
+
+def create_entries(contributions):
+    """
+    Create the ladder entries which don't exist yet with the given
+    contributions, in one insert, returning the contributions left to add
+    to existing entries, by entry ID.
+    """
+    entry_ids = get_entry_ids(contributions)
+    new_entries = get_new_entries(contributions, entry_ids)
+    if new_entries:
+        try:
+            with transaction.atomic():
+                LadderEntry.objects.bulk_create(new_entries)
+        except IntegrityError:
+            # Another transaction created some of the same entries first.
+            entry_ids = get_entry_ids(contributions)
+            LadderEntry.objects.bulk_create(
+                get_new_entries(contributions, entry_ids))
+    return [(entry_ids[season_id, team_id], changes)
+            for season_id, team_id, changes in contributions
+            if (season_id, team_id) in entry_ids]
+
+
+def apply_contributions(contributions, sign=1):
+    """
+    Add (sign 1) or remove (sign -1) contributions to ladder entries,
+    deleting entries left without any games played. Missing entries are
+    created in one insert, and existing ones changed in one update.
+    """
+    contributions = [
+        (season_id, team_id, {field: sign * value
+                              for field, value in changes.items() if value})
+        for season_id, team_id, changes in contributions]
+    contributions = [contribution for contribution in contributions
+                     if contribution[2]]
+    if not contributions:
+        return
+    updates = create_entries(contributions)
+    if not updates:
+        return
+    fields = {field for entry_id, changes in updates for field in changes}
+    entries = LadderEntry.objects.filter(
+        pk__in=[entry_id for entry_id, changes in updates])
+    entries.update(**{field: Case(
+        *[When(pk=entry_id, then=F(field) + changes[field])
+          for entry_id, changes in updates if field in changes],
+        default=F(field)) for field in fields})
+    if any(changes.get('played', 0) < 0 for entry_id, changes in updates):
+        entries.filter(played__lte=0).delete()
+
+
+def combine_contributions(values_list, previous_values_list=()):
+    """
+    Combine the contributions of many games, less those of any previous
+    values they replace, returning a list with one set of changes per ladder
+    entry.
+    """
+    combined = {}
+    for sign, games in ((1, values_list), (-1, previous_values_list)):
+        for values in games:
+            for season_id, team_id, changes in get_contributions(values):
+                totals = combined.setdefault((season_id, team_id), {})
+                for field, value in changes.items():
+                    totals[field] = totals.get(field, 0) + sign * value
+    return [(season_id, team_id, changes)
+            for (season_id, team_id), changes in combined.items()]
+
+
+def add_games(values_list):
+    """
+    Add the contributions of many new games, combining them so that each
+    ladder entry is only updated once.
+    """
+    contributions = combine_contributions(values_list)
+    if not contributions:
+        return
+    with transaction.atomic(savepoint=False):
+        apply_contributions(contributions, 1)
+
+
+def update_game(previous_values, values):
+    """
+    Move a game's contribution from its previous values to its new ones,
+    updating each ladder entry once with the difference.
+    """
+    contributions = combine_contributions([values], [previous_values])
+    if not contributions:
+        return
+    with transaction.atomic(savepoint=False):
+        apply_contributions(contributions)
+
+
+def rebuild(season):
+    """
+    Recalculate the ladder of the given season from all of its games, unless
+    it's finalised.
+    """
+    check_seasons_open([getattr(season, 'pk', season)])
+    games = Game.objects.filter(season=season).values(*GAME_FIELDS)
+    with transaction.atomic():
+        LadderEntry.objects.filter(season=season).delete()
+        LadderEntry.objects.bulk_create(
+            LadderEntry(season_id=season_id, team_id=team_id, **changes)
+            for season_id, team_id, changes in combine_contributions(games))
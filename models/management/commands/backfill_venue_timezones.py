@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from models import changes, versions
+from models.models import Venue
+
+
+class Command(BaseCommand):
+    help = 'Look up and store the timezone of venues which lack one.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Number of venues to update per transaction.')
+        parser.add_argument('--all', action='store_true',
+                            help='Update every venue, not just those without '
+                                 'a timezone.')
+
+    def handle(self, *args, **options):
+        venues = Venue.objects.only('id', 'latitude', 'longitude')
+        venues = venues.order_by('pk')
+        if not options['all']:
+            venues = venues.filter(timezone__isnull=True)
+        num_updated = 0
+        last_pk = None
+        while True:
+            batch = venues
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(batch[:options['batch_size']])
+            if not batch:
+                break
+            with transaction.atomic():
+                for venue in batch:
+                    venue.update_timezone()
+                    Venue.objects.filter(pk=venue.pk).update(
+                        timezone=venue.timezone)
+                versions.bump(versions.VENUES)
+                changes.record(Venue, [venue.pk for venue in batch],
+                               changes.UPDATED)
+            num_updated += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write('Updated {} venues'.format(num_updated))
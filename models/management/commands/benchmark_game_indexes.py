@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+import pytz
+
+from models.models import Game, League, Season, Team, Venue
+
+
+# Games per page, as served by the API.
+PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = ('Show the query plans of the API\'s pages of games with and '
+            'without the game indexes, using generated data which is rolled '
+            'back afterwards. Requires PostgreSQL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=20000,
+                            help='Number of games to generate.')
+        parser.add_argument('--seasons', type=int, default=120,
+                            help='Number of seasons to spread games over.')
+        parser.add_argument('--teams', type=int, default=18,
+                            help='Number of teams to generate.')
+        parser.add_argument('--venues', type=int, default=40,
+                            help='Number of venues to generate.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans can only be shown on PostgreSQL.')
+        with transaction.atomic():
+            season, team = self.generate_data(options)
+            season_games = Game.objects.filter(season=season).order_by(
+                'start', 'id')
+            team_games = Game.objects.involving_team(team.pk).filter(
+                season__league_id=season.league_id).select_related(
+                    'season', 'team_1', 'team_2').order_by('start', 'id')
+            querysets = (
+                ('First page of games in a season',
+                 season_games[:PAGE_SIZE]),
+                ('Page of games in a season from a cursor',
+                 self.after_middle(season_games)[:PAGE_SIZE]),
+                ('First page of games of a team',
+                 team_games[:PAGE_SIZE]),
+                ('Page of games of a team from a cursor',
+                 self.after_middle(team_games)[:PAGE_SIZE]),
+            )
+            self.stdout.write('With game indexes:')
+            self.explain(querysets)
+            with connection.cursor() as cursor:
+                for name in self.get_index_names(cursor):
+                    cursor.execute('DROP INDEX {}'.format(
+                        connection.ops.quote_name(name)))
+            self.stdout.write('Without game indexes:')
+            self.explain(querysets)
+            transaction.set_rollback(True)
+
+    def after_middle(self, games):
+        """Filter games to those after the middle one, as a cursor would."""
+        middle = games[games.count() // 2]
+        return games.from_position(middle.start, middle.id)
+
+    def generate_data(self, options):
+        """
+        Generate leagues, seasons, teams, venues and games, returning a
+        season and team to query.
+        """
+        league = League.objects.create(id='benchmark', name='Benchmark')
+        seasons = Season.objects.bulk_create(
+            Season(id='benchmark_{}'.format(i), league=league, name=str(i))
+            for i in range(0, options['seasons']))
+        teams = Team.objects.bulk_create(
+            Team(id='benchmark_{}'.format(i), league=league, name=str(i))
+            for i in range(0, options['teams']))
+        venues = Venue.objects.bulk_create(
+            Venue(id='benchmark_{}'.format(i), name=str(i), latitude=0,
+                  longitude=0)
+            for i in range(0, options['venues']))
+        first_start = datetime(1897, 5, 8, 14, 30, tzinfo=pytz.utc)
+        games_per_season = max(1, options['games'] // len(seasons))
+        games = []
+        for i in range(0, options['games']):
+            team_1, team_2 = random.sample(teams, 2)
+            games.append(Game(
+                start=first_start + timedelta(days=i // 9, minutes=i % 9),
+                season=seasons[min(i // games_per_season, len(seasons) - 1)],
+                venue=random.choice(venues),
+                team_1=team_1,
+                team_2=team_2))
+        Game.objects.bulk_create(games, batch_size=1000)
+        with connection.cursor() as cursor:
+            for model in (Season, Team, Venue, Game):
+                cursor.execute('ANALYZE {}'.format(
+                    connection.ops.quote_name(model._meta.db_table)))
+        return seasons[len(seasons) // 2], teams[0]
+
+    def get_index_names(self, cursor):
+        """Get the names of the indexes created for Game.index_together."""
+        columns = [[Game._meta.get_field(name).column for name in fields]
+                   for fields in Game._meta.index_together]
+        constraints = connection.introspection.get_constraints(
+            cursor, Game._meta.db_table)
+        return [name for name, constraint in constraints.items()
+                if constraint['index'] and constraint['columns'] in columns]
+
+    def explain(self, querysets):
+        """Write out the query plan and timing of each queryset."""
+        with connection.cursor() as cursor:
+            for description, queryset in querysets:
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute('EXPLAIN ANALYZE ' + sql, params)
+                self.stdout.write('  {}:'.format(description))
+                for row in cursor.fetchall():
+                    self.stdout.write('    ' + row[0])
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from models import export
+from models.models import League
+
+
+class Command(BaseCommand):
+    help = ('Export every game in a league as NDJSON, CSV or compact '
+            'columnar NDJSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('league_id')
+        parser.add_argument('--format', choices=sorted(export.FORMATS),
+                            default='ndjson', dest='export_format',
+                            help='Format to export games in.')
+        parser.add_argument('--output',
+                            help='File to write to; defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE,
+                            help='Number of games to read per query.')
+
+    def handle(self, *args, **options):
+        if not League.objects.filter(pk=options['league_id']).exists():
+            raise CommandError(
+                'No such league: {}'.format(options['league_id']))
+        iter_lines = export.FORMATS[options['export_format']][0]
+        games = export.iter_game_values(options['league_id'],
+                                        chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(iter_lines(games))
+        else:
+            for line in iter_lines(games):
+                self.stdout.write(line, ending='')
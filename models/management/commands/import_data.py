@@ -0,0 +1,51 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from models import importer
+from models.models import FinalisedSeasonError
+
+
+class Command(BaseCommand):
+    help = ('Import leagues, seasons, teams, venues and games from an NDJSON '
+            'or CSV file, updating games which already exist.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('ndjson', 'csv'),
+                            dest='file_format',
+                            help='Format of the file; defaults to its '
+                                 'extension.')
+        parser.add_argument('--batch-size', type=int,
+                            default=importer.BATCH_SIZE,
+                            help='Number of games to upsert per transaction.')
+        parser.add_argument('--checkpoint',
+                            help='File recording progress, used to resume an '
+                                 'interrupted import; defaults to the path '
+                                 'with .checkpoint appended.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore any checkpoint and start from the '
+                                 'first record.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format']
+        if file_format is None:
+            file_format = 'csv' if path.endswith('.csv') else 'ndjson'
+        checkpoint_path = options['checkpoint'] or path + '.checkpoint'
+        skip = 0 if options['restart'] else \
+            importer.read_checkpoint(checkpoint_path)
+        if skip:
+            self.stdout.write('Resuming after record {}'.format(skip))
+        data_importer = importer.Importer(batch_size=options['batch_size'],
+                                          checkpoint_path=checkpoint_path)
+        try:
+            data_importer.run(importer.read_records(path, file_format),
+                              skip=skip)
+        except (importer.RecordError, FinalisedSeasonError) as e:
+            raise CommandError(str(e))
+        os.remove(checkpoint_path)
+        self.stdout.write(
+            'Imported {} records: {} games created, {} updated'.format(
+                data_importer.num_records, data_importer.num_created,
+                data_importer.num_updated))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from models import ladder, versions
+from models.models import Season
+
+
+class Command(BaseCommand):
+    help = 'Recalculate season ladders from their games.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('season_ids', nargs='*',
+                            help='IDs of seasons to rebuild; defaults to all '
+                                 'which aren\'t finalised.')
+
+    def handle(self, *args, **options):
+        seasons = Season.objects.order_by('pk')
+        if options['season_ids']:
+            seasons = seasons.filter(pk__in=options['season_ids'])
+            finalised = [season.pk for season in seasons if season.finalised]
+            if finalised:
+                raise CommandError(
+                    'Reopen finalised seasons to rebuild their ladders: '
+                    '{}'.format(', '.join(finalised)))
+        else:
+            seasons = seasons.filter(finalised=False)
+        for season in seasons:
+            ladder.rebuild(season)
+            versions.bump_games([season.pk], [season.league_id])
+            self.stdout.write('Rebuilt ladder for {}'.format(season.pk))
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2026-10-18 09:12
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0011_create_team_alternative_name'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='game',
+            index_together=set([('season', 'start', 'id')]),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2026-10-18 09:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0012_index_game_season_start'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='timezone',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+    ]
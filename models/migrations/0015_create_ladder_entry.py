@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2026-10-18 01:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0014_index_game_team_and_venue_start'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LadderEntry',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('points_for', models.IntegerField(default=0)),
+                ('points_against', models.IntegerField(default=0)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ladder', to='models.Season')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='models.Team')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='ladderentry',
+            unique_together=set([('season', 'team')]),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2026-10-18 01:27
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0016_create_resource_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='season',
+            name='finalised',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+import timezonefinder
+
+# Migrations are frozen, so this is a copy of models.timezones.timezone_at as
+# it was when this migration was written, rather than an import of it.
+COORDINATE_PRECISION = 4
+
+
+def backfill_venue_timezones(apps, schema_editor):
+    """Look up the timezone of every venue saved before they were stored."""
+    Venue = apps.get_model('models', 'Venue')
+    venues = Venue.objects.filter(timezone__isnull=True).only(
+        'id', 'latitude', 'longitude')
+    finder = None
+    lookups = {}
+    for venue in venues.iterator():
+        coordinates = (round(float(venue.latitude), COORDINATE_PRECISION),
+                       round(float(venue.longitude), COORDINATE_PRECISION))
+        if coordinates not in lookups:
+            if finder is None:
+                finder = timezonefinder.TimezoneFinder()
+            latitude, longitude = coordinates
+            lookups[coordinates] = finder.timezone_at(lat=latitude,
+                                                      lng=longitude)
+        Venue.objects.filter(pk=venue.pk).update(
+            timezone=lookups[coordinates])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0018_create_change'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_venue_timezones,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# Before a transaction first records a change, it takes a shared advisory
+# lock keyed on the next change ID, and holds it until the transaction ends,
+# so that readers of the change log can tell the lowest ID which may yet be
+# committed (see models.changes).
+CREATE_TRIGGER = """
+CREATE FUNCTION models_change_lock_next_id() RETURNS trigger AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_locks
+                   WHERE locktype = 'advisory' AND classid = 1701
+                       AND objsubid = 2 AND pid = pg_backend_pid()) THEN
+        PERFORM pg_advisory_xact_lock_shared(
+            1701, (last_value + CASE WHEN is_called THEN 1 ELSE 0 END)::int)
+        FROM models_change_id_seq;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER models_change_lock_next_id
+    BEFORE INSERT ON models_change
+    FOR EACH STATEMENT EXECUTE PROCEDURE models_change_lock_next_id();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER models_change_lock_next_id ON models_change;
+DROP FUNCTION models_change_lock_next_id();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0019_backfill_venue_timezones'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
@@ -1,12 +1,14 @@
 from datetime import datetime
 
-from django.db import models
+from django.db import connections, models, transaction
 from django.core import validators
+from django.utils import timezone
 import pytz
-import timezonefinder
 
 from colorful.fields import RGBColorField
 
+from . import timezones
+
 
 class League(models.Model):
     id = models.CharField(max_length=200, primary_key=True, validators=[
@@ -20,7 +22,17 @@ class League(models.Model):
         return self.name
 
 
-class Team(models.Model):
+class SavedLeagueMixin:
+    """Remembers the league a model was loaded with, in _saved_league_id."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_league_id = instance.__dict__.get('league_id')
+        return instance
+
+
+class Team(SavedLeagueMixin, models.Model):
     id = models.CharField(max_length=200, primary_key=True, validators=[
         validators.MinLengthValidator(1),
         validators.RegexValidator(r'^\w+$')
@@ -48,19 +60,40 @@ class TeamAlternativeName(models.Model):
         return '{} (alternative name of {})'.format(self.name, self.team.name)
 
 
-class Season(models.Model):
+class Season(SavedLeagueMixin, models.Model):
     id = models.CharField(max_length=200, primary_key=True, validators=[
         validators.MinLengthValidator(1),
         validators.RegexValidator(r'^\w+$')
     ])
     league = models.ForeignKey(League, on_delete=models.PROTECT)
     name = models.TextField()
+    finalised = models.BooleanField(default=False)
 
     def __str__(self):
         """String representation of a season."""
         return self.name
 
 
+class FinalisedSeasonError(Exception):
+    """Raised when changing the games of a finalised season."""
+
+
+def check_seasons_open(season_ids):
+    """
+    Raise FinalisedSeasonError if any of the given seasons is finalised, as
+    their games and ladders can't change until they're reopened.
+    """
+    season_ids = set(season_ids) - {None}
+    if not season_ids:
+        return
+    finalised = sorted(Season.objects.filter(
+        pk__in=season_ids, finalised=True).values_list('pk', flat=True))
+    if finalised:
+        raise FinalisedSeasonError(
+            'Games can\'t be changed in finalised seasons: {}'.format(
+                ', '.join(finalised)))
+
+
 class Venue(models.Model):
     id = models.CharField(max_length=200, primary_key=True, validators=[
         validators.MinLengthValidator(1),
@@ -77,18 +110,38 @@ class Venue(models.Model):
                                     validators=[
                                         validators.MinValueValidator(-180),
                                         validators.MaxValueValidator(180)])
+    timezone = models.TextField(blank=True, null=True, editable=False)
 
     def __str__(self):
         """String representation of a venue."""
         return self.name
 
-    @property
-    def timezone(self):
-        """Get the timezone of this venue based on its latitude and
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the coordinates a venue was loaded with."""
+        venue = super().from_db(db, field_names, values)
+        venue._saved_coordinates = venue._get_coordinates()
+        return venue
+
+    def save(self, *args, **kwargs):
+        """Save a venue, updating its timezone if it has moved."""
+        coordinates = self._get_coordinates()
+        if coordinates != getattr(self, '_saved_coordinates', None):
+            self.update_timezone()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'timezone'}
+        super().save(*args, **kwargs)
+        self._saved_coordinates = coordinates
+
+    def update_timezone(self):
+        """Set the timezone of this venue based on its latitude and
         longitude.
         """
-        tf = timezonefinder.TimezoneFinder()
-        return tf.timezone_at(lat=self.latitude, lng=self.longitude)
+        self.timezone = timezones.timezone_at(self.latitude, self.longitude)
+
+    def _get_coordinates(self):
+        return (self.__dict__.get('latitude'), self.__dict__.get('longitude'))
 
 
 class VenueAlternativeName(models.Model):
@@ -103,6 +156,48 @@ class VenueAlternativeName(models.Model):
         return '{} (alternative name of {})'.format(self.name, self.venue.name)
 
 
+class GameQuerySet(models.QuerySet):
+    def involving_team(self, team):
+        """
+        Filter to games where the given team is on either side.
+
+        This matches game IDs from a union of one lookup per side rather
+        than ORing the two columns, so that each side can use its own index.
+        """
+        opts = self.model._meta
+        qn = connections[self.db].ops.quote_name
+        subquery = ' UNION ALL '.join(
+            'SELECT {id} FROM {table} WHERE {column} = %s'.format(
+                id=qn(opts.pk.column),
+                table=qn(opts.db_table),
+                column=qn(opts.get_field(field).column))
+            for field in ('team_1', 'team_2'))
+        team_id = getattr(team, 'pk', team)
+        return self.extra(
+            where=['{}.{} IN ({})'.format(qn(opts.db_table),
+                                          qn(opts.pk.column),
+                                          subquery)],
+            params=[team_id, team_id])
+
+    def from_position(self, start, pk, reverse=False):
+        """
+        Filter to games after the given start and ID in (start, id) order,
+        or before them if reversed, comparing the two as one row so that an
+        index on them is scanned straight from the position.
+        """
+        opts = self.model._meta
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        columns = ', '.join(
+            '{}.{}'.format(qn(opts.db_table), qn(opts.get_field(field).column))
+            for field in ('start', 'id'))
+        start = opts.get_field('start').get_db_prep_value(start, connection)
+        comparison = '<' if reverse else '>'
+        return self.extra(
+            where=['({}) {} (%s, %s)'.format(columns, comparison)],
+            params=[start, pk])
+
+
 class Game(models.Model):
     id = models.AutoField(primary_key=True)
     start = models.DateTimeField()
@@ -122,8 +217,11 @@ class Game(models.Model):
     team_2_goals = models.PositiveIntegerField(default=0)
     team_2_behinds = models.PositiveIntegerField(default=0)
 
+    objects = GameQuerySet.as_manager()
+
     class Meta:
         unique_together = ('start', 'season', 'team_1', 'team_2')
+        index_together = [('season', 'start', 'id')]
 
     def __str__(self):
         """String representation of a game."""
@@ -139,6 +237,14 @@ class Game(models.Model):
                                             self.team_2,
                                             self.start.strftime('%c'))
 
+    def save(self, *args, **kwargs):
+        """
+        Save a game in one transaction with the changes made to ladders,
+        versions and the change log as it's saved (see models.signals).
+        """
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     @property
     def team_1_score(self):
         """Calculate the score for team_1."""
@@ -148,3 +254,81 @@ class Game(models.Model):
     def team_2_score(self):
         """Calculate the score for team_2."""
         return self.team_2_goals * 6 + self.team_2_behinds
+
+
+class LadderEntry(models.Model):
+    """
+    A team's record in a season, kept up to date as games are saved and
+    deleted (see models.ladder).
+    """
+    id = models.AutoField(primary_key=True)
+    season = models.ForeignKey(Season,
+                               on_delete=models.CASCADE,
+                               related_name='ladder')
+    team = models.ForeignKey(Team,
+                             on_delete=models.CASCADE,
+                             related_name='+')
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    points_for = models.IntegerField(default=0)
+    points_against = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('season', 'team')
+
+    def __str__(self):
+        """String representation of a ladder entry."""
+        return '{} in {}'.format(self.team, self.season)
+
+    @property
+    def percentage(self):
+        """Calculate points for as a percentage of points against."""
+        if not self.points_against:
+            return None
+        return self.points_for * 100 / self.points_against
+
+    @property
+    def premiership_points(self):
+        """Calculate premiership points; four for a win and two for a draw."""
+        return self.wins * 4 + self.draws * 2
+
+
+class ResourceVersion(models.Model):
+    """
+    A counter bumped whenever a group of API resources changes (see
+    models.versions).
+    """
+    key = models.CharField(max_length=200, primary_key=True)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        """String representation of a resource version."""
+        return '{} version {}'.format(self.key, self.version)
+
+
+class Change(models.Model):
+    """
+    A record of an object being created, updated or deleted, in the order
+    they happened (see models.changes).
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Created'),
+        (UPDATED, 'Updated'),
+        (DELETED, 'Deleted'),
+    )
+
+    object_type = models.CharField(max_length=50)
+    object_id = models.CharField(max_length=200)
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        """String representation of a change."""
+        return '{} {} {}'.format(self.object_type, self.object_id,
+                                 self.action)
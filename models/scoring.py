@@ -0,0 +1,49 @@
+"""
+Live scoring of games in progress.
+
+Scorers add goals and behinds as they're kicked, often from several clients
+at once. Rather than saving the whole game, which re-validates it and would
+overwrite another scorer's changes made in the meantime, each change is
+applied as an increment in one UPDATE. The ladder and change log are kept up
+to date just as when a game is saved, but only the version of the games in
+the game's season is bumped (see models.versions).
+"""
+from django.db import transaction
+from django.db.models import F
+
+from . import changes, ladder, versions
+from .models import Game
+
+TEAMS = (1, 2)
+
+# The most goals or behinds which can be added or taken away at once.
+MAX_CHANGE = 100
+
+
+def add_score(games, team, goals=0, behinds=0):
+    """
+    Add goals and behinds (or take them away, if negative) to one team's
+    score in the game in the given queryset, unless its season is finalised
+    or the score would go below zero. Returns the game's ladder values (see
+    models.ladder.GAME_FIELDS) with its ID after the change, or None if it
+    couldn't be changed.
+    """
+    increments = {field: value for field, value in (
+        ('team_{}_goals'.format(team), goals),
+        ('team_{}_behinds'.format(team), behinds)) if value}
+    with transaction.atomic():
+        if not games.filter(season__finalised=False, **{
+                field + '__gte': -value
+                for field, value in increments.items()}).update(**{
+                    field: F(field) + value
+                    for field, value in increments.items()}):
+            return None
+        values = games.values('id', *ladder.GAME_FIELDS).get()
+        previous_values = dict(values)
+        for field, value in increments.items():
+            previous_values[field] -= value
+        ladder.update_game(previous_values, values)
+        versions.bump(versions.SEASON_GAMES.format(
+            season_id=values['season_id']))
+        changes.record(Game, [values['id']], changes.UPDATED)
+    return values
@@ -0,0 +1,118 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import changes, ladder, versions
+from .models import (Game, League, Season, Team, TeamAlternativeName, Venue,
+                     VenueAlternativeName, check_seasons_open)
+
+
+def get_game_season_ids(game):
+    """Get the IDs of a game's seasons, before and after it was saved."""
+    season_ids = {game.season_id}
+    saved_values = getattr(game, '_saved_ladder_values', None)
+    if saved_values is not None:
+        season_ids.add(saved_values['season_id'])
+    return season_ids
+
+
+@receiver(pre_save, sender=Game)
+def remember_saved_game(sender, instance, raw=False, **kwargs):
+    """
+    Remember a game's saved values so its ladder changes can be undone,
+    refusing to change games in finalised seasons.
+    """
+    instance._saved_ladder_values = ladder.get_saved_game_values(instance)
+    if not raw:
+        check_seasons_open(get_game_season_ids(instance))
+
+
+@receiver(pre_delete, sender=Game)
+def remember_deleted_game(sender, instance, **kwargs):
+    """
+    Remember a game's saved values, which may have changed since it was
+    loaded, so its ladder changes can be undone, refusing to delete games in
+    finalised seasons.
+    """
+    instance._saved_ladder_values = ladder.get_saved_game_values(instance)
+    check_seasons_open(get_game_season_ids(instance))
+
+
+@receiver(post_save, sender=Game)
+def update_ladder_on_save(sender, instance, raw=False, **kwargs):
+    """Update ladders when a game is created or edited."""
+    if raw:
+        return
+    ladder.update_game(getattr(instance, '_saved_ladder_values', None),
+                       ladder.get_game_values(instance))
+
+
+@receiver(post_delete, sender=Game)
+def update_ladder_on_delete(sender, instance, **kwargs):
+    """Update ladders when a game is deleted."""
+    ladder.update_game(instance._saved_ladder_values, None)
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+def bump_game_versions(sender, instance, **kwargs):
+    """Bump the versions of the games in a game's season, before and after."""
+    versions.bump_games(get_game_season_ids(instance))
+
+
+VERSION_KEYS = {
+    League: versions.LEAGUES,
+    Team: versions.LEAGUE_TEAMS,
+    TeamAlternativeName: versions.LEAGUE_TEAMS,
+    Season: versions.LEAGUE_SEASONS,
+    Venue: versions.VENUES,
+    VenueAlternativeName: versions.VENUES,
+}
+
+
+def get_league_ids(instance):
+    """
+    Get the IDs of the leagues an object is in, before and after it was
+    saved, if it's in one.
+    """
+    if isinstance(instance, TeamAlternativeName):
+        return {instance.team.league_id}
+    return {getattr(instance, 'league_id', None),
+            getattr(instance, '_saved_league_id', None)} - {None}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_versions(sender, instance, **kwargs):
+    """Bump the version of everything else when it changes."""
+    if sender not in VERSION_KEYS:
+        return
+    key = VERSION_KEYS[sender]
+    league_ids = get_league_ids(instance)
+    if league_ids:
+        versions.bump(*(key.format(league_id=league_id)
+                        for league_id in league_ids))
+    else:
+        versions.bump(key)
+
+
+@receiver(post_save)
+def record_save(sender, instance, created=False, **kwargs):
+    """Record objects being created and updated in the change log."""
+    if sender in changes.OBJECT_TYPES:
+        details = {}
+        if sender is Game:
+            details['season_ids'] = get_game_season_ids(instance)
+        changes.record(sender, [instance.pk],
+                       changes.CREATED if created else changes.UPDATED,
+                       **details)
+
+
+@receiver(post_delete)
+def record_delete(sender, instance, **kwargs):
+    """Record objects being deleted in the change log."""
+    if sender in changes.OBJECT_TYPES:
+        details = {}
+        if sender is Game:
+            details['season_ids'] = get_game_season_ids(instance)
+        changes.record(sender, [instance.pk], changes.DELETED, **details)
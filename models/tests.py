@@ -1,11 +1,24 @@
 from random import randint, choice
+from datetime import datetime
+import json
 import string
 from decimal import Decimal
-from unittest import mock
+from importlib import import_module
+from io import StringIO
+import os
+import tempfile
+import threading
+from unittest import mock, skipUnless
 
-from django.test import TestCase
+from django.apps import apps as global_apps
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+import pytz
 
-from .models import Game, Venue
+from . import changes, ladder, scoring, timezones, versions
+from .models import (Change, FinalisedSeasonError, Game, LadderEntry, League,
+                     Season, Team, TeamAlternativeName, Venue)
 
 
 class GameScoreTest(TestCase):
@@ -36,18 +49,524 @@ class GameScoreTest(TestCase):
         self.assertEqual(game.team_2_goals * 6, game.team_2_score)
 
 
+def random_coordinate(max_degrees):
+    return Decimal('{}.{}'.format(randint(-max_degrees, max_degrees - 1),
+                                  randint(0, 999999)))
+
+
+def random_timezone():
+    return ''.join(choice(string.ascii_letters) for i in range(10))
+
+
 class VenueTimezoneTest(TestCase):
+    def setUp(self):
+        timezones.clear_cache()
+
     @mock.patch('timezonefinder.TimezoneFinder.timezone_at')
     def test_time_zone(self, mock_timezone_at):
         """Test getting a time zone based on a venue's latitude and
         longitude.
         """
-        tz = ''.join(choice(string.ascii_letters) for i in range(10))
-        lat = Decimal('{}.{}'.format(randint(-90, 90), randint(0, 999999)))
-        lon = Decimal('{}.{}'.format(randint(-180, 180), randint(0, 999999)))
+        tz = random_timezone()
+        lat = random_coordinate(90)
+        lon = random_coordinate(180)
         mock_timezone_at.return_value = tz
         venue = Venue()
         venue.latitude = lat
         venue.longitude = lon
+        venue.update_timezone()
         self.assertEqual(tz, venue.timezone)
-        mock_timezone_at.assert_called_with(lat=lat, lng=lon)
+        mock_timezone_at.assert_called_with(lat=round(float(lat), 4),
+                                            lng=round(float(lon), 4))
+
+    @mock.patch('timezonefinder.TimezoneFinder.timezone_at')
+    def test_time_zone_saved(self, mock_timezone_at):
+        """Test that a venue's time zone is only looked up when it moves."""
+        mock_timezone_at.return_value = random_timezone()
+        venue = Venue(id='venue',
+                      latitude=random_coordinate(90),
+                      longitude=random_coordinate(180))
+        venue.save()
+        self.assertEqual(1, mock_timezone_at.call_count)
+        venue = Venue.objects.get(pk='venue')
+        self.assertEqual(mock_timezone_at.return_value, venue.timezone)
+        venue.name = 'Renamed'
+        venue.save()
+        self.assertEqual(1, mock_timezone_at.call_count)
+        mock_timezone_at.return_value = random_timezone()
+        venue.longitude = random_coordinate(180)
+        venue.save(update_fields=['longitude'])
+        self.assertEqual(2, mock_timezone_at.call_count)
+        venue = Venue.objects.get(pk='venue')
+        self.assertEqual(mock_timezone_at.return_value, venue.timezone)
+
+    @mock.patch('timezonefinder.TimezoneFinder.timezone_at')
+    def test_backfill_time_zones(self, mock_timezone_at):
+        """Test backfilling missing venue time zones."""
+        mock_timezone_at.return_value = random_timezone()
+        for i in range(0, 5):
+            Venue(id='venue_{}'.format(i),
+                  latitude=random_coordinate(90),
+                  longitude=random_coordinate(180)).save()
+        Venue.objects.filter(pk__in=['venue_1', 'venue_3']).update(
+            timezone=None)
+        timezones.clear_cache()
+        mock_timezone_at.return_value = random_timezone()
+        call_command('backfill_venue_timezones', batch_size=1,
+                     stdout=StringIO())
+        self.assertEqual(7, mock_timezone_at.call_count)
+        venue_timezones = dict(Venue.objects.values_list('id', 'timezone'))
+        self.assertEqual(venue_timezones['venue_1'],
+                         mock_timezone_at.return_value)
+        self.assertEqual(venue_timezones['venue_3'],
+                         mock_timezone_at.return_value)
+        self.assertNotEqual(venue_timezones['venue_0'],
+                            mock_timezone_at.return_value)
+        self.assertEqual(
+            ['venue_1', 'venue_3'],
+            list(Change.objects.filter(
+                object_type='venue', action=changes.UPDATED).order_by(
+                    'pk').values_list('object_id', flat=True)))
+
+    @mock.patch('timezonefinder.TimezoneFinder.timezone_at')
+    def test_migration(self, mock_timezone_at):
+        """Test the migration filling in venues' missing time zones."""
+        mock_timezone_at.return_value = random_timezone()
+        venue = Venue(id='venue', latitude=random_coordinate(90),
+                      longitude=random_coordinate(180))
+        venue.save()
+        Venue.objects.update(timezone=None)
+        mock_timezone_at.return_value = random_timezone()
+        migration = import_module(
+            'models.migrations.0019_backfill_venue_timezones')
+        with mock.patch('models.timezones.timezone_at') as mock_lookup:
+            migration.backfill_venue_timezones(global_apps, None)
+        mock_lookup.assert_not_called()
+        mock_timezone_at.assert_called_with(
+            lat=round(float(venue.latitude), 4),
+            lng=round(float(venue.longitude), 4))
+        self.assertEqual(mock_timezone_at.return_value,
+                         Venue.objects.get().timezone)
+
+
+class TimezoneLookupTest(TestCase):
+    def setUp(self):
+        timezones.clear_cache()
+
+    def test_shared_finder(self):
+        """Test that one TimezoneFinder is shared by all lookups."""
+        self.assertIs(timezones.get_finder(), timezones.get_finder())
+
+    def test_forked(self):
+        """Test that forked processes load their own TimezoneFinder."""
+        finder = timezones.get_finder()
+        with mock.patch('os.getpid', return_value=os.getpid() + 1):
+            forked_finder = timezones.get_finder()
+            self.assertIsNot(forked_finder, finder)
+            self.assertIs(timezones.get_finder(), forked_finder)
+
+    @mock.patch('timezonefinder.TimezoneFinder.timezone_at')
+    def test_cached_lookup(self, mock_timezone_at):
+        """Test that lookups are cached on rounded coordinates."""
+        mock_timezone_at.return_value = random_timezone()
+        tz = timezones.timezone_at(Decimal('-37.819967'),
+                                   Decimal('144.983449'))
+        self.assertEqual(mock_timezone_at.return_value, tz)
+        mock_timezone_at.assert_called_once_with(lat=-37.82, lng=144.9834)
+        tz = timezones.timezone_at(Decimal('-37.820012'),
+                                   Decimal('144.983401'))
+        self.assertEqual(mock_timezone_at.return_value, tz)
+        self.assertEqual(1, mock_timezone_at.call_count)
+        timezones.timezone_at(Decimal('-37.8'), Decimal('144.98'))
+        self.assertEqual(2, mock_timezone_at.call_count)
+
+
+class LadderTest(TestCase):
+    def setUp(self):
+        league = League.objects.create(id='league', name='League')
+        self.seasons = [Season.objects.create(id='season_{}'.format(i),
+                                              league=league,
+                                              name=str(i))
+                        for i in range(0, 2)]
+        self.teams = [Team.objects.create(id='team_{}'.format(i),
+                                          league=league,
+                                          name=str(i))
+                      for i in range(0, 2)]
+
+    def create_game(self, season, team_1_goals, team_2_goals):
+        return Game.objects.create(start=datetime.now(pytz.utc),
+                                   season=season,
+                                   team_1=self.teams[0],
+                                   team_1_goals=team_1_goals,
+                                   team_2=self.teams[1],
+                                   team_2_goals=team_2_goals)
+
+    def get_ladder(self, season):
+        """Get a season's ladder as a dictionary of team ID to record."""
+        return {entry.team_id: (entry.played, entry.wins, entry.losses,
+                                entry.draws, entry.points_for,
+                                entry.points_against)
+                for entry in LadderEntry.objects.filter(season=season)}
+
+    def test_unplayed_game(self):
+        """Test that games without scores don't affect the ladder."""
+        self.create_game(self.seasons[0], 0, 0)
+        self.assertEqual({}, self.get_ladder(self.seasons[0]))
+
+    def test_create_edit_and_delete(self):
+        """Test that the ladder follows games as they change."""
+        game = self.create_game(self.seasons[0], 2, 1)
+        self.assertEqual({'team_0': (1, 1, 0, 0, 12, 6),
+                          'team_1': (1, 0, 1, 0, 6, 12)},
+                         self.get_ladder(self.seasons[0]))
+        game = Game.objects.get(pk=game.pk)
+        game.team_2_goals = 3
+        game.save()
+        self.assertEqual({'team_0': (1, 0, 1, 0, 12, 18),
+                          'team_1': (1, 1, 0, 0, 18, 12)},
+                         self.get_ladder(self.seasons[0]))
+        game.season = self.seasons[1]
+        game.save()
+        self.assertEqual({}, self.get_ladder(self.seasons[0]))
+        self.assertEqual({'team_0': (1, 0, 1, 0, 12, 18),
+                          'team_1': (1, 1, 0, 0, 18, 12)},
+                         self.get_ladder(self.seasons[1]))
+        game.delete()
+        self.assertEqual({}, self.get_ladder(self.seasons[1]))
+
+    def test_rebuild(self):
+        """Test recalculating a ladder from scratch."""
+        self.create_game(self.seasons[0], 2, 2)
+        self.create_game(self.seasons[0], 1, 0)
+        expected = {'team_0': (2, 1, 0, 1, 18, 12),
+                    'team_1': (2, 0, 1, 1, 12, 18)}
+        self.assertEqual(expected, self.get_ladder(self.seasons[0]))
+        LadderEntry.objects.all().update(wins=100)
+        ladder.rebuild(self.seasons[0])
+        self.assertEqual(expected, self.get_ladder(self.seasons[0]))
+
+    def test_delete_scored_game(self):
+        """Test deleting a game scored since it was loaded."""
+        self.create_game(self.seasons[0], 1, 0)
+        game = self.create_game(self.seasons[0], 2, 1)
+        scoring.add_score(Game.objects.filter(pk=game.pk), 2, goals=1)
+        game.delete()
+        self.assertEqual({'team_0': (1, 1, 0, 0, 6, 0),
+                          'team_1': (1, 0, 1, 0, 0, 6)},
+                         self.get_ladder(self.seasons[0]))
+
+    def test_entry_created_elsewhere(self):
+        """Test adding to an entry created since entries were looked up."""
+        self.create_game(self.seasons[0], 2, 1)
+        entry_ids = {(entry.season_id, entry.team_id): entry.pk
+                     for entry in LadderEntry.objects.all()}
+        with mock.patch('models.ladder.get_entry_ids',
+                        side_effect=[{}, entry_ids]):
+            self.create_game(self.seasons[0], 0, 1)
+        self.assertEqual({'team_0': (2, 1, 1, 0, 12, 12),
+                          'team_1': (2, 1, 1, 0, 12, 12)},
+                         self.get_ladder(self.seasons[0]))
+
+    def test_add_score(self):
+        """Test that the ladder follows scores as they're added."""
+        game = self.create_game(self.seasons[0], 0, 0)
+        season_key = versions.SEASON_GAMES.format(season_id=game.season_id)
+        league_key = versions.LEAGUE_GAMES.format(league_id='league')
+
+        def get_versions():
+            return {key: version for key, version, updated_at
+                    in versions.get_versions([season_key, league_key])}
+        previous_versions = get_versions()
+        games = Game.objects.filter(pk=game.pk)
+        values = scoring.add_score(games, 2, behinds=1)
+        self.assertEqual((values['team_2_goals'], values['team_2_behinds']),
+                         (0, 1))
+        self.assertEqual({'team_0': (1, 0, 1, 0, 0, 1),
+                          'team_1': (1, 1, 0, 0, 1, 0)},
+                         self.get_ladder(self.seasons[0]))
+        scoring.add_score(games, 1, goals=1)
+        self.assertEqual({'team_0': (1, 1, 0, 0, 6, 1),
+                          'team_1': (1, 0, 1, 0, 1, 6)},
+                         self.get_ladder(self.seasons[0]))
+        self.assertIsNone(scoring.add_score(games, 1, goals=-2))
+        scoring.add_score(games, 1, goals=-1)
+        scoring.add_score(games, 2, behinds=-1)
+        self.assertEqual({}, self.get_ladder(self.seasons[0]))
+        self.assertEqual(Change.objects.filter(
+            object_type='game', object_id=str(game.pk),
+            action=Change.UPDATED).count(), 4)
+        # Only the season's games are bumped, not the whole league's.
+        self.assertEqual({season_key: 4, league_key: 0},
+                         {key: version - previous_versions[key]
+                          for key, version in get_versions().items()})
+        self.seasons[0].finalised = True
+        self.seasons[0].save()
+        self.assertIsNone(scoring.add_score(games, 1, goals=1))
+
+
+class FinalisedSeasonTest(TestCase):
+    def setUp(self):
+        league = League.objects.create(id='afl', name='AFL')
+        self.seasons = [Season.objects.create(id='season_{}'.format(i),
+                                              league=league,
+                                              name=str(i))
+                        for i in range(0, 2)]
+        for team_id in ('richmond', 'carlton'):
+            Team.objects.create(id=team_id, league=league, name=team_id)
+        self.game = Game.objects.create(start=datetime.now(pytz.utc),
+                                        season=self.seasons[0],
+                                        team_1_id='richmond',
+                                        team_1_goals=1,
+                                        team_2_id='carlton')
+        self.seasons[0].finalised = True
+        self.seasons[0].save()
+
+    def assertUnchanged(self):
+        self.assertEqual(
+            [(self.seasons[0].pk, 1)],
+            list(Game.objects.values_list('season_id', 'team_1_goals')))
+        self.assertEqual(2, LadderEntry.objects.filter(
+            season=self.seasons[0]).count())
+
+    def test_save_and_delete(self):
+        """Test that games in finalised seasons can't be changed."""
+        # Saving and deleting fail part way through a transaction, so it's
+        # rolled back.
+        game = Game.objects.get(pk=self.game.pk)
+        game.team_1_goals = 2
+        with self.assertRaises(FinalisedSeasonError), transaction.atomic():
+            game.save()
+        game = Game.objects.get(pk=self.game.pk)
+        game.season = self.seasons[1]
+        with self.assertRaises(FinalisedSeasonError), transaction.atomic():
+            game.save()
+        with self.assertRaises(FinalisedSeasonError), transaction.atomic():
+            Game.objects.create(start=datetime.now(pytz.utc),
+                                season=self.seasons[0],
+                                team_1_id='carlton',
+                                team_2_id='richmond')
+        with self.assertRaises(FinalisedSeasonError), transaction.atomic():
+            self.game.delete()
+        with self.assertRaises(FinalisedSeasonError), transaction.atomic():
+            Game.objects.all().delete()
+        self.assertUnchanged()
+
+    def test_rebuild(self):
+        """Test that finalised seasons' ladders aren't rebuilt."""
+        with self.assertRaises(FinalisedSeasonError):
+            ladder.rebuild(self.seasons[0])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_ladders', self.seasons[0].pk,
+                         stdout=StringIO())
+        output = StringIO()
+        call_command('rebuild_ladders', stdout=output)
+        self.assertEqual('Rebuilt ladder for season_1\n', output.getvalue())
+        self.assertUnchanged()
+
+    def test_import(self):
+        """Test that importing doesn't change finalised seasons' games."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'games.ndjson')
+        record = {'league': 'afl', 'season': self.seasons[0].pk,
+                  'start': self.game.start.isoformat(),
+                  'team_1': 'richmond', 'team_1_goals': 1,
+                  'team_2': 'carlton'}
+        with open(path, 'w') as records_file:
+            records_file.write(json.dumps(record))
+        call_command('import_data', path, stdout=StringIO())
+        with open(path, 'w') as records_file:
+            records_file.write(json.dumps(dict(record, team_1_goals=2)))
+        with self.assertRaises(CommandError):
+            call_command('import_data', path, restart=True,
+                         stdout=StringIO())
+        self.assertUnchanged()
+
+
+class ExportGamesTest(TestCase):
+    def test_export_games(self):
+        """Test exporting a league's games in chunks."""
+        league = League.objects.create(id='league', name='League')
+        season = Season.objects.create(id='season', league=league, name='')
+        teams = [Team.objects.create(id='team_{}'.format(i),
+                                     league=league,
+                                     name=str(i))
+                 for i in range(0, 2)]
+        games = [Game.objects.create(start=datetime.now(pytz.utc),
+                                     season=season,
+                                     team_1=teams[0],
+                                     team_2=teams[1])
+                 for i in range(0, 5)]
+        output = StringIO()
+        with self.assertNumQueries(4):
+            call_command('export_games', 'league', chunk_size=2,
+                         stdout=output)
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([game.id for game in games],
+                         [row['id'] for row in rows])
+
+
+class ChangeLogTest(TestCase):
+    def test_record(self):
+        """Test that saves and deletes are recorded."""
+        league = League.objects.create(id='afl', name='AFL')
+        league.name = 'Australian Football League'
+        league.save()
+        team = Team.objects.create(id='richmond', league=league,
+                                   name='Richmond')
+        alternative_name = team.alternative_names.create(name='Tigers')
+        team.delete()
+        self.assertEqual(
+            [('league', 'afl', changes.CREATED),
+             ('league', 'afl', changes.UPDATED),
+             ('team', 'richmond', changes.CREATED),
+             ('team_alternative_name', str(alternative_name.id),
+              changes.CREATED),
+             ('team_alternative_name', str(alternative_name.id),
+              changes.DELETED),
+             ('team', 'richmond', changes.DELETED)],
+            [(change['object_type'], change['object_id'], change['action'])
+             for change in changes.get_changes()])
+
+    def test_rolled_back(self):
+        """Test that changes rolled back don't hold up those after them."""
+        cursor = changes.get_latest_cursor()
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                changes.record(League, ['a'], changes.CREATED)
+                raise ValueError('Rolled back')
+        changes.record(League, ['b'], changes.CREATED)
+        self.assertEqual(['b'], [change['object_id'] for change
+                                 in changes.get_changes(cursor)])
+        self.assertEqual(changes.get_changes(cursor)[-1]['id'],
+                         changes.get_latest_cursor())
+
+
+@skipUnless(connection.vendor == 'postgresql',
+            'Only Postgres commits changes out of the order of their IDs.')
+class ChangeLogInFlightTest(TransactionTestCase):
+    def test_in_flight(self):
+        """Test holding back changes while earlier ones could be committed."""
+        cursor = changes.get_latest_cursor()
+        recorded, committing = threading.Event(), threading.Event()
+
+        def record_in_flight():
+            try:
+                with transaction.atomic():
+                    changes.record(League, ['a'], changes.CREATED)
+                    recorded.set()
+                    committing.wait(5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=record_in_flight)
+        thread.start()
+        self.assertTrue(recorded.wait(5))
+        changes.record(League, ['b'], changes.CREATED)
+        self.assertEqual([], changes.get_changes(cursor))
+        self.assertEqual(cursor, changes.get_latest_cursor())
+        committing.set()
+        thread.join()
+        self.assertEqual(['a', 'b'], [change['object_id'] for change
+                                      in changes.get_changes(cursor)])
+
+
+class ImportDataTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_records(self, records, name='records.ndjson'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as records_file:
+            for record in records:
+                records_file.write(json.dumps(record) + '\n')
+        return path
+
+    def import_data(self, path, **kwargs):
+        call_command('import_data', path, stdout=StringIO(), **kwargs)
+
+    def game_record(self, day, team_1, team_2, team_1_goals=0):
+        return {'league': 'afl',
+                'season': '2016',
+                'start': '2016-04-{:02d}T09:00:00Z'.format(day),
+                'venue': 'The G',
+                'team_1': team_1,
+                'team_1_goals': team_1_goals,
+                'team_2': team_2,
+                'team_2_goals': 5}
+
+    @mock.patch('timezonefinder.TimezoneFinder.timezone_at')
+    def test_import(self, mock_timezone_at):
+        """Test importing records and then updating them."""
+        mock_timezone_at.return_value = 'Australia/Melbourne'
+        timezones.clear_cache()
+        records = [
+            {'type': 'league', 'id': 'afl', 'name': 'AFL'},
+            {'type': 'season', 'id': '2016', 'league': 'afl', 'name': '2016'},
+            {'type': 'team', 'id': 'richmond', 'league': 'afl',
+             'name': 'Richmond', 'alternative_names': ['Tigers']},
+            {'type': 'team', 'id': 'carlton', 'league': 'afl',
+             'name': 'Carlton'},
+            {'type': 'venue', 'id': 'mcg', 'name': 'MCG',
+             'latitude': '-37.819967', 'longitude': '144.983449',
+             'alternative_names': ['The G']},
+            self.game_record(1, 'Tigers', 'carlton', 10),
+            self.game_record(8, 'Carlton', 'richmond', 10),
+        ]
+        self.import_data(self.write_records(records), batch_size=1)
+        self.assertEqual(['Tigers'],
+                         [n.name for n in TeamAlternativeName.objects.all()])
+        games = Game.objects.order_by('start')
+        self.assertEqual(2, games.count())
+        self.assertEqual('richmond', games[0].team_1_id)
+        self.assertEqual('mcg', games[0].venue_id)
+        self.assertEqual(10, games[0].team_1_goals)
+        self.assertEqual('carlton', games[1].team_1_id)
+        self.assertEqual(1, LadderEntry.objects.get(team_id='richmond').wins)
+        records = [self.game_record(1, 'Richmond', 'Carlton', 4),
+                   self.game_record(15, 'Carlton', 'Tigers')]
+        self.import_data(self.write_records(records, 'update.ndjson'))
+        games = Game.objects.order_by('start')
+        self.assertEqual(3, games.count())
+        self.assertEqual(4, games[0].team_1_goals)
+        richmond = LadderEntry.objects.get(team_id='richmond')
+        self.assertEqual((3, 1, 2), (richmond.played, richmond.wins,
+                                     richmond.losses))
+        game_changes = Change.objects.filter(
+            object_type='game').order_by('pk')
+        self.assertEqual(
+            [(str(games[0].id), changes.CREATED),
+             (str(games[1].id), changes.CREATED),
+             (str(games[2].id), changes.CREATED),
+             (str(games[0].id), changes.UPDATED)],
+            sorted(game_changes.values_list('object_id', 'action'),
+                   key=lambda change: change[1]))
+
+    def test_resume(self):
+        """Test resuming an import from a checkpoint."""
+        League.objects.create(id='afl', name='AFL')
+        Season.objects.create(id='2016', league_id='afl', name='2016')
+        for team_id in ('richmond', 'carlton'):
+            Team.objects.create(id=team_id, league_id='afl', name=team_id)
+        records = [dict(self.game_record(day, 'richmond', 'carlton'),
+                        venue=None)
+                   for day in range(1, 5)]
+        path = self.write_records(records)
+        with open(path + '.checkpoint', 'w') as checkpoint_file:
+            json.dump({'records': 2}, checkpoint_file)
+        self.import_data(path)
+        self.assertEqual([3, 4], [game.start.day for game
+                                  in Game.objects.order_by('start')])
+        self.assertFalse(os.path.exists(path + '.checkpoint'))
+        self.assertEqual(
+            ['league:afl:games', 'season:2016:games'],
+            [key for key, version, updated_at in versions.get_versions(
+                ['league:afl:games', 'season:2016:games'])])
+
+    def test_unknown_team(self):
+        """Test importing a game with a team which doesn't exist."""
+        League.objects.create(id='afl', name='AFL')
+        path = self.write_records([self.game_record(1, 'richmond', 'nobody')])
+        with self.assertRaises(CommandError):
+            self.import_data(path)
@@ -0,0 +1,53 @@
+"""
+A process-wide timezone lookup service.
+
+Loading timezone polygon data is expensive, so a single TimezoneFinder is
+shared by everything in the process and lookups are cached on coordinates
+rounded to COORDINATE_PRECISION decimal places (roughly 10 metres). The
+finder reads from open files, whose offsets would be shared by processes
+forked after it was loaded, so each process loads its own on first use.
+"""
+from functools import lru_cache
+import os
+from threading import Lock
+
+import timezonefinder
+
+COORDINATE_PRECISION = 4
+CACHE_SIZE = 4096
+
+_finder = None
+_finder_pid = None
+_lock = Lock()
+
+
+def get_finder():
+    """
+    Get the shared TimezoneFinder, loading it if necessary or if it was
+    loaded before this process was forked.
+    """
+    global _finder, _finder_pid
+    with _lock:
+        if _finder is None or _finder_pid != os.getpid():
+            _finder = timezonefinder.TimezoneFinder()
+            _finder_pid = os.getpid()
+        return _finder
+
+
+def timezone_at(latitude, longitude):
+    """Get the name of the timezone at the given latitude and longitude."""
+    return _cached_timezone_at(round(float(latitude), COORDINATE_PRECISION),
+                               round(float(longitude), COORDINATE_PRECISION))
+
+
+def clear_cache():
+    """Forget all cached lookups."""
+    _cached_timezone_at.cache_clear()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_timezone_at(latitude, longitude):
+    finder = get_finder()
+    # TimezoneFinder reads polygon data from shared file handles.
+    with _lock:
+        return finder.timezone_at(lat=latitude, lng=longitude)
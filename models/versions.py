@@ -0,0 +1,84 @@
+"""
+Version counters for groups of API resources.
+
+Each key names a group of resources which the API serves together, such as
+the games in a season. Whenever anything in a group is created, changed or
+deleted its counter is bumped, so whether a client's copy of a response is
+still current can be told from one small query, without loading or
+serializing anything.
+
+Games change often, so they're counted per season and per league, and teams
+and seasons are counted per league. Leagues and venues change rarely, and are
+counted as a whole. Scores added to games in progress only bump their season's
+version, so that scorers across a league don't queue on one counter; views of
+a league's games check the versions of its seasons' games too.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import CharField, F, Q, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .models import ResourceVersion, Season
+
+LEAGUES = 'leagues'
+LEAGUE_TEAMS = 'league:{league_id}:teams'
+LEAGUE_SEASONS = 'league:{league_id}:seasons'
+VENUES = 'venues'
+SEASON_GAMES = 'season:{season_id}:games'
+LEAGUE_GAMES = 'league:{league_id}:games'
+
+
+def bump(*keys):
+    """Bump the version of each of the given keys."""
+    keys = set(keys)
+    now = timezone.now()
+    for key in keys:
+        versions = ResourceVersion.objects.filter(key=key)
+        if versions.update(version=F('version') + 1, updated_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                ResourceVersion.objects.create(key=key, version=1,
+                                               updated_at=now)
+        except IntegrityError:
+            versions.update(version=F('version') + 1, updated_at=now)
+
+
+def bump_games(season_ids, league_ids=None):
+    """
+    Bump the versions of the games in the given seasons and their leagues,
+    looking up the leagues if they aren't given.
+    """
+    season_ids = set(season_ids)
+    if league_ids is None:
+        league_ids = Season.objects.filter(pk__in=season_ids).values_list(
+            'league_id', flat=True)
+    keys = [SEASON_GAMES.format(season_id=season_id)
+            for season_id in season_ids]
+    keys.extend(LEAGUE_GAMES.format(league_id=league_id)
+                for league_id in set(league_ids))
+    bump(*keys)
+
+
+def get_league_season_games_keys(league_id):
+    """
+    Get a queryset of the keys of the games in each of a league's seasons, to
+    be looked up with get_versions.
+    """
+    prefix, suffix = SEASON_GAMES.split('{season_id}')
+    return Season.objects.filter(league_id=league_id).annotate(
+        key=Concat(Value(prefix), 'id', Value(suffix),
+                   output_field=CharField())).values('key')
+
+
+def get_versions(keys, key_querysets=()):
+    """
+    Get the version and last update time of each of the given keys, and of
+    the keys in the given querysets, as a list of (key, version, updated_at)
+    tuples. Keys which have never been bumped are left out.
+    """
+    condition = Q(key__in=keys)
+    for key_queryset in key_querysets:
+        condition |= Q(key__in=key_queryset)
+    return list(ResourceVersion.objects.filter(condition).order_by(
+        'key').values_list('key', 'version', 'updated_at'))
@@ -90,6 +90,38 @@ DATABASES = {
     }
 }
 
+# Caches
+# https://docs.djangoproject.com/en/1.10/topics/cache/
+#
+# Rendered API responses are cached in the api_v1 cache, and checked against
+# the current resource versions before they're served, so each process can
+# keep its own. Set API_V1_CACHE_BACKEND to
+# django.core.cache.backends.filebased.FileBasedCache and
+# API_V1_CACHE_LOCATION to a directory to share it between processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api_v1': {
+        'BACKEND': os.environ.get(
+            'API_V1_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('API_V1_CACHE_LOCATION', 'api_v1'),
+        'TIMEOUT': int(os.environ.get('API_V1_CACHE_TIMEOUT', 3600)),
+    },
+}
+
+# Responses for finalised seasons are pre-rendered to this directory.
+
+API_V1_PRERENDER_ROOT = os.environ.get('API_V1_PRERENDER_ROOT',
+                                       os.path.join(BASE_DIR, 'prerendered'))
+
+# The base URL responses are pre-rendered for, such as https://example.com,
+# unless another is given to the finalise_season command.
+
+API_V1_PRERENDER_BASE_URL = os.environ.get('API_V1_PRERENDER_BASE_URL')
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.8/topics/i18n/
 
@@ -113,6 +145,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 100,
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api_v1.renderers.MessagePackRenderer',
+    ),
     'DEFAULT_FILTER_BACKENDS': (
         'rest_framework.filters.DjangoFilterBackend',
         'rest_framework.filters.OrderingFilter',